@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for `covid19_sfbayarea.news.utils.parse_datetime()`.
+
+The corpus is built from the date formats each county's news page actually
+uses, with a realistic amount of repetition (many items on a listing share a
+date). Run from the root of the project with:
+
+    $ python3 -m benchmarks.parse_datetime
+"""
+
+from datetime import datetime, timedelta
+import dateutil.parser
+from email.utils import format_datetime
+import timeit
+from typing import Callable, Dict, List
+from covid19_sfbayarea.news import utils
+
+
+def us_short(date: datetime) -> str:
+    return f'{date.month}/{date.day}/{date.year}'
+
+
+def us_padded(date: datetime) -> str:
+    return date.strftime('%m/%d/%Y')
+
+
+def us_with_time(date: datetime) -> str:
+    hour = date.hour % 12 or 12
+    meridiem = 'PM' if date.hour >= 12 else 'AM'
+    return f'{us_padded(date)} at {hour}:{date.minute:02} {meridiem}'
+
+
+def long_form(date: datetime) -> str:
+    months = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+              'August', 'September', 'October', 'November', 'December')
+    return f'{months[date.month - 1]} {date.day}, {date.year}'
+
+
+def iso(date: datetime) -> str:
+    return date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def rfc_2822(date: datetime) -> str:
+    return format_datetime(date.astimezone())
+
+
+# County name -> function that formats a date the way that county does.
+COUNTY_FORMATS: Dict[str, Callable[[datetime], str]] = {
+    'alameda': us_short,
+    'contra_costa': us_short,
+    'marin': us_padded,
+    'napa': long_form,
+    'san_francisco': iso,
+    'san_mateo': rfc_2822,
+    'santa_clara': us_padded,
+    'solano': us_short,
+    'sonoma': us_with_time,
+}
+
+
+def build_corpus(days: int = 60, items_per_day: int = 3) -> List[str]:
+    now = datetime.now().replace(hour=16, minute=30, second=0, microsecond=0)
+    corpus: List[str] = []
+    for formatter in COUNTY_FORMATS.values():
+        for day in range(days):
+            date = now - timedelta(days=day)
+            corpus.extend(formatter(date) for _ in range(items_per_day))
+    return corpus
+
+
+def parse_with_dateutil(corpus: List[str]) -> None:
+    for date_string in corpus:
+        dateutil.parser.parse(date_string)
+
+
+def parse_cold(corpus: List[str]) -> None:
+    utils._parse_datetime_string.cache_clear()
+    for date_string in corpus:
+        utils.parse_datetime(date_string)
+
+
+def parse_warm(corpus: List[str]) -> None:
+    for date_string in corpus:
+        utils.parse_datetime(date_string)
+
+
+def main() -> None:
+    corpus = build_corpus()
+    candidates = {
+        'dateutil.parser.parse': parse_with_dateutil,
+        'parse_datetime (cold cache)': parse_cold,
+        'parse_datetime (warm cache)': parse_warm,
+    }
+
+    print(f'Parsing {len(corpus)} date strings '
+          f'({len(set(corpus))} unique)\n')
+    baseline = None
+    for name, candidate in candidates.items():
+        best = min(timeit.repeat(lambda: candidate(corpus), number=1, repeat=5))
+        per_item = best / len(corpus) * 1e6
+        baseline = baseline or best
+        print(f'{name:<30} {best * 1000:8.2f} ms  '
+              f'{per_item:6.2f} µs/item  {baseline / best:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for every news and data scraper, run offline against recorded
+responses (see `covid19_sfbayarea.transport`).
+
+For each county, this measures how long a scrape takes when the network is
+free (so, mostly parsing), the peak memory allocated while scraping, and how
+long it takes to serialize the output. Run from the root of the project with:
+
+    $ python3 -m benchmarks.run
+
+Recordings live in ``benchmarks/fixtures/<news|data>/<county>.json``. The
+ones in the repository are synthetic (see `benchmarks.synthetic`), so results
+don't depend on what county sites happen to have up. To record real responses
+instead (this *does* hit county servers, and needs Firefox for some scrapers):
+
+    $ python3 -m benchmarks.run --record news.napa data.alameda
+
+Results are compared to ``benchmarks/baseline.json``, and the command fails
+if any measurement is worse than the baseline by more than ``--threshold``.
+Use ``--save-baseline`` to update the baseline after an intentional change.
+Times in the baseline are stored relative to a calibration loop that is run
+after each benchmark, so a baseline saved on one machine can be checked
+on another.
+"""
+
+import click
+from datetime import datetime, timedelta
+from io import BytesIO
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+from covid19_sfbayarea import data, news, serialization
+from covid19_sfbayarea.news.feed import WRITERS
+from covid19_sfbayarea.news import utils as news_utils
+from covid19_sfbayarea.transport import Cassette, use_cassette
+
+
+ROOT = Path(__file__).parent
+FIXTURES = ROOT / 'fixtures'
+BASELINE = ROOT / 'baseline.json'
+
+# How far back news scrapers look when recording (the same as the default for
+# `scraper_news.py`).
+NEWS_DAYS = 31
+
+# How many iterations the calibration loop does (see `calibrate()`).
+CALIBRATION_LOOPS = 100_000
+
+Measurements = Dict[str, float]
+# A scrape function takes the cassette it's being run with and returns some
+# output. A serialize function turns that output into bytes.
+Benchmark = Tuple[Callable[[Cassette], Any], Callable[[Any], bytes]]
+
+
+def scrape_news(county: str) -> Callable[[Cassette], Any]:
+    def scrape(cassette: Cassette) -> Any:
+        if 'from_date' not in cassette.options:
+            now = datetime.now().astimezone()
+            cassette.options.update(
+                from_date=(now - timedelta(days=NEWS_DAYS)).isoformat(),
+                to_date=now.isoformat())
+        from_date = datetime.fromisoformat(cassette.options['from_date'])
+        to_date = datetime.fromisoformat(cassette.options['to_date'])
+        return news.scrapers[county].get_news(from_date, to_date)
+    return scrape
+
+
+def serialize_news(feed: Any) -> bytes:
+    streams = {name: BytesIO() for name in WRITERS}
+    feed.write(streams)
+    return b''.join(stream.getvalue() for stream in streams.values())
+
+
+def scrape_data(county: str) -> Callable[[Cassette], Any]:
+    def scrape(cassette: Cassette) -> Any:
+        return data.scrapers[county].get_county()
+    return scrape
+
+
+def serialize_data(out: Any) -> bytes:
+    return serialization.dumps(out)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    **{f'news.{county}': (scrape_news(county), serialize_news)
+       for county in news.scrapers},
+    **{f'data.{county}': (scrape_data(county), serialize_data)
+       for county in data.scrapers},
+}
+
+
+def cassette_path(name: str) -> Path:
+    kind, county = name.split('.', 1)
+    return FIXTURES / kind / f'{county}.json'
+
+
+def reset_caches() -> None:
+    """
+    Clear module-level caches so every run does the same work a fresh process
+    would.
+    """
+    news_utils._parse_datetime_string.cache_clear()
+    news_utils.DETECTED_ENCODINGS.clear()
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        reset_caches()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def calibration_work() -> None:
+    # Splitting and formatting strings and filling dicts, like the scrapers do
+    # while parsing.
+    counts: Dict[str, int] = {}
+    for index in range(CALIBRATION_LOOPS):
+        month, day, year = f'{index % 12 + 1}/{index % 28 + 1}/2020'.split('/')
+        key = f'{year}-{month:0>2}-{day:0>2}'
+        counts[key] = counts.get(key, 0) + 1
+
+
+def calibrate(repeat: int) -> float:
+    """
+    Time a fixed amount of pure-Python work. Benchmark times are divided by
+    this before being compared to the baseline, so that the comparison doesn't
+    depend on how fast the machine is. Every benchmark is compared to this,
+    so it always runs at least 5 times to keep it steady.
+    """
+    return best_time(calibration_work, max(repeat, 5))
+
+
+def relative_times(measurements: Measurements, calibration: float) -> Measurements:
+    """
+    Replace each ``*_seconds`` measurement with a ``*_time`` measurement in
+    units of the calibration loop's time (see `calibrate()`).
+    """
+    relative = {}
+    for metric, value in measurements.items():
+        if metric.endswith('_seconds'):
+            metric = metric[:-len('_seconds')] + '_time'
+            value /= calibration
+        relative[metric] = value
+    return relative
+
+
+def measure(name: str, repeat: int) -> Measurements:
+    scrape, serialize = BENCHMARKS[name]
+    with use_cassette(cassette_path(name), 'replay') as cassette:
+        reset_caches()
+        tracemalloc.start()
+        try:
+            output = scrape(cassette)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'scrape_seconds': best_time(lambda: scrape(cassette), repeat),
+            'serialize_seconds': best_time(lambda: serialize(output), repeat),
+            'peak_kib': peak / 1024,
+            'output_kib': len(serialize(output)) / 1024,
+        }
+
+
+def record_fixture(name: str) -> None:
+    scrape, _ = BENCHMARKS[name]
+    with use_cassette(cassette_path(name), 'record') as cassette:
+        scrape(cassette)
+
+
+def find_regressions(results: Dict[str, Measurements],
+                     baseline: Dict[str, Measurements],
+                     threshold: float) -> List[str]:
+    regressions = []
+    for name, measurements in results.items():
+        for metric, value in measurements.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected and value > expected * (1 + threshold):
+                regressions.append(f'{name} {metric}: {value:.4f} '
+                                   f'(baseline {expected:.4f}, '
+                                   f'+{value / expected - 1:.0%})')
+    return regressions
+
+
+def print_table(results: Dict[str, Measurements]) -> None:
+    print(f'{"benchmark":<22} {"scrape":>10} {"serialize":>10} '
+          f'{"peak mem":>10} {"output":>10}')
+    for name, result in results.items():
+        print(f'{name:<22} '
+              f'{result["scrape_seconds"] * 1000:>7.1f} ms '
+              f'{result["serialize_seconds"] * 1000:>7.1f} ms '
+              f'{result["peak_kib"]:>6.0f} KiB '
+              f'{result["output_kib"]:>6.0f} KiB')
+
+
+def select(targets: Tuple[str, ...]) -> List[str]:
+    if not targets:
+        return list(BENCHMARKS)
+    names = []
+    for target in targets:
+        matching = [name for name in BENCHMARKS
+                    if name == target or name.startswith(f'{target}.')]
+        if not matching:
+            raise click.BadParameter(f'"{target}" is not a benchmark. Choose '
+                                     f'from: {", ".join(BENCHMARKS)}')
+        names.extend(matching)
+    return names
+
+
+@click.command(help='Benchmark scrapers against recorded responses. TARGET '
+                    'can be "news", "data", or a single scraper, like '
+                    '"news.napa".')
+@click.argument('targets', metavar='[TARGET]...', nargs=-1)
+@click.option('--record', is_flag=True,
+              help='record new fixtures from live servers instead of '
+                   'running benchmarks')
+@click.option('--repeat', default=5, show_default=True,
+              help='number of times to run each benchmark (the best time is '
+                   'reported)')
+@click.option('--threshold', default=0.25, show_default=True,
+              help='fail if a measurement is worse than the baseline by '
+                   'more than this fraction')
+@click.option('--baseline', 'baseline_path', default=str(BASELINE),
+              show_default=True, help='baseline results to compare against')
+@click.option('--save-baseline', is_flag=True,
+              help='save these results as the new baseline')
+def main(targets: Tuple[str, ...], record: bool, repeat: int, threshold: float,
+         baseline_path: str, save_baseline: bool) -> None:
+    names = select(targets)
+    if record:
+        for name in names:
+            click.echo(f'Recording {name}...')
+            record_fixture(name)
+        return
+
+    results: Dict[str, Measurements] = {}
+    relative: Dict[str, Measurements] = {}
+    for name in names:
+        path = cassette_path(name)
+        if not path.exists():
+            click.echo(f'Skipping {name}: no fixture at {path}', err=True)
+            continue
+        results[name] = measure(name, repeat)
+        # Calibrate right after each benchmark, so both run under the same
+        # conditions (CPU frequency, other load on the machine, etc.).
+        relative[name] = relative_times(results[name], calibrate(repeat))
+
+    if not results:
+        raise click.ClickException('No fixtures to benchmark. Record some '
+                                   'with --record.')
+    print_table(results)
+
+    baseline_file = Path(baseline_path)
+    baseline: Dict[str, Measurements] = {}
+    if baseline_file.exists():
+        baseline = json.loads(baseline_file.read_text())
+
+    if save_baseline:
+        baseline.update(relative)
+        baseline_file.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        return
+
+    regressions = find_regressions(relative, baseline, threshold)
+    if regressions:
+        raise click.ClickException('Performance regressions:\n  ' +
+                                   '\n  '.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Synthetic fixtures for the scraper benchmarks in `benchmarks.run`.
+
+Recording fixtures from live servers needs network access (and Firefox for
+some scrapers), and county sites change or disappear over time. Instead, this
+builds a cassette for each benchmark with responses shaped like the ones each
+county actually sends, and with a realistic amount of data (a few pages of
+news, most of a year of daily data). Run from the root of the project with:
+
+    $ python3 -m benchmarks.synthetic
+
+That writes ``benchmarks/fixtures/<news|data>/<county>.json`` for every
+benchmark; pass targets (like ``news`` or ``data.alameda``) to only write some
+of them. Dates are relative to today, since news scrapers reject dates that
+are years off. Update ``benchmarks/baseline.json`` after regenerating
+fixtures, since the results will shift a little:
+
+    $ python3 -m benchmarks.run --save-baseline
+"""
+
+import click
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from http import HTTPStatus
+import json
+import random
+import requests
+from typing import Any, Callable, Dict, List, Tuple
+from xml.sax.saxutils import escape
+from covid19_sfbayarea.data import alameda, san_francisco, solano
+from covid19_sfbayarea.data.demographics import DEMOGRAPHICS
+from covid19_sfbayarea.data.utils import SocrataApi
+from covid19_sfbayarea.news import scrapers as news_scrapers
+from covid19_sfbayarea.news.base import NewsScraper
+from covid19_sfbayarea.transport import Cassette
+from .run import NEWS_DAYS, cassette_path, select
+
+
+# Items per page of news, and how many days of news there are in total. There
+# is more news than the benchmarks ask for, so paginated scrapers have to
+# stop partway through (as they do in real life).
+NEWS_PER_PAGE = 20
+NEWS_TOTAL_DAYS = 2 * NEWS_DAYS
+
+# Days of data in each data scraper's timeseries.
+SERIES_DAYS = 300
+
+# Half of these are about COVID-19, so filtering by key terms has some work
+# to do.
+NEWS_TITLES = (
+    'COVID-19 testing expands to {place}',
+    'Board of Supervisors approves {place} road repairs',
+    'Health Officer amends shelter in place order for {place}',
+    'Library hours change at {place} branch',
+    'New coronavirus cases reported in {place}',
+    'Parks department opens trail near {place}',
+    'Face coverings required at {place} businesses',
+    'Fire season preparation meeting in {place}',
+)
+PLACES = ('Oakland', 'Napa', 'Fairfield', 'Redwood City', 'San Jose',
+          'Santa Rosa', 'San Rafael', 'Martinez', 'the Mission District')
+SUMMARY = ('The county announced updates today, including details on '
+           'eligibility, locations, and hours. Residents can find more '
+           'information and resources on the county website.')
+
+
+def add_response(cassette: Cassette, url: str, body: Any,
+                 params: Dict[str, str] = None, status: int = 200,
+                 content_type: str = None) -> None:
+    """
+    Add a response for ``GET url`` to a cassette. ``body`` is encoded as JSON
+    unless it is a string.
+    """
+    if not isinstance(body, str):
+        body = json.dumps(body)
+        content_type = content_type or 'application/json'
+    # Build the URL exactly the way requests will when the scraper runs.
+    url = requests.Request('GET', url, params=params).prepare().url
+    cassette.responses[cassette.request_key('GET', url)] = {
+        'method': 'GET',
+        'url': url,
+        'status': status,
+        'reason': HTTPStatus(status).phrase,
+        'headers': {'Content-Type': content_type or 'text/html; charset=utf-8'},
+        'elapsed': 0.2,
+        'body': body,
+    }
+
+
+class SyntheticNews:
+    """
+    Fake news items for a news scraper, newest first, one or two a day. Each
+    has an ``index`` (which is unique), ``title``, ``date``, and ``path``.
+    """
+
+    def __init__(self, now: datetime, seed: str) -> None:
+        randomizer = random.Random(seed)
+        self.items = []
+        for index in range(NEWS_TOTAL_DAYS * 3 // 2):
+            published = now - timedelta(days=index * 2 // 3,
+                                        hours=randomizer.randrange(8))
+            title = randomizer.choice(NEWS_TITLES).format(
+                place=randomizer.choice(PLACES))
+            self.items.append({'index': index, 'title': title,
+                               'date': published, 'path': f'/news/{index}'})
+
+    def pages(self) -> List[List[Dict[str, Any]]]:
+        return [self.items[start:start + NEWS_PER_PAGE]
+                for start in range(0, len(self.items), NEWS_PER_PAGE)]
+
+
+def us_date(day: date) -> str:
+    return f'{day.month}/{day.day}/{day.year}'
+
+
+def long_date(day: date) -> str:
+    return f'{day:%B} {day.day}, {day.year}'
+
+
+def html_page(body: str) -> str:
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>News</title></head><body>{body}</body></html>')
+
+
+def alameda_news(items: List[Dict[str, Any]]) -> str:
+    rows = []
+    for item in items:
+        if item['index'] % 3:
+            info = f'<a href="{item["path"]}.pdf">{escape(item["title"])}</a>'
+        else:
+            info = (f'{escape(item["title"])}: '
+                    f'<a href="{item["path"]}.pdf">English</a> | '
+                    f'<a href="{item["path"]}-es.pdf">Spanish</a>')
+        rows.append(f'<tr><td>{us_date(item["date"])}</td><td>{info}</td></tr>')
+    return html_page(f'<div class="content"><table class="board">'
+                     f'{"".join(rows)}</table></div>')
+
+
+def contra_costa_news(items: List[Dict[str, Any]]) -> str:
+    months: Dict[str, List[str]] = {}
+    for item in items:
+        months.setdefault(f'{item["date"]:%B %Y}', []).append(
+            f'<li><a href="{item["path"]}">{escape(item["title"])}</a> - '
+            f'{item["date"]:%m/%d/%Y}</li>')
+    return html_page(''.join(f'<div><h3>{month}</h3><ul>{"".join(entries)}'
+                             f'</ul></div>'
+                             for month, entries in months.items()))
+
+
+def marin_news(items: List[Dict[str, Any]]) -> str:
+    rows = ''.join(f'<tr><td class="pr-list-date">{us_date(item["date"])}</td>'
+                   f'<td class="pr-list-title"><a href="{item["path"]}">'
+                   f'{escape(item["title"])}</a></td></tr>'
+                   for item in items)
+    header = ('<tr><th class="pr-list-date-header">Date</th>'
+              '<th>Title</th></tr>')
+    return html_page(f'<table><caption>Public Works</caption>{header}</table>'
+                     f'<table><caption>Health &amp; Human Services</caption>'
+                     f'{header}{rows}</table>')
+
+
+def napa_news(items: List[Dict[str, Any]]) -> str:
+    entries = ''.join(
+        f'<div class="item intro"><h3><a href="{item["path"]}">'
+        f'{escape(item["title"])}</a></h3>NAPA, CA - {SUMMARY}'
+        f'<a href="/CivicAlerts.aspx?CID=1"><span class="category">'
+        f'Health</span></a><a class="more" href="{item["path"]}">Read on'
+        f'</a><div class="date">Posted on: {long_date(item["date"])}</div>'
+        f'</div>'
+        for item in items)
+    return html_page(f'<div class="contentMain"><div class="listing">'
+                     f'{entries}</div></div>')
+
+
+def san_francisco_news(items: List[Dict[str, Any]]) -> str:
+    articles = ''.join(
+        f'<article><h3><a href="{item["path"]}">{escape(item["title"])}</a>'
+        f'</h3><time datetime="{item["date"].astimezone(timezone.utc):%Y-%m-%dT%H:%M:%SZ}">'
+        f'{long_date(item["date"])}</time></article>'
+        for item in items)
+    return html_page(f'<main>{articles}</main>')
+
+
+def san_mateo_news(items: List[Dict[str, Any]]) -> str:
+    entries = ''.join(
+        f'<item><title>{escape(long_date(item["date"]))} - '
+        f'{escape(item["title"])}</title>'
+        f'<link>https://cmo.smcgov.org/press-release{item["path"]}</link>'
+        f'<description>{escape(f"<p>REDWOOD CITY, Calif. – {SUMMARY}</p>")}'
+        f'</description><pubDate>{format_datetime(item["date"])}</pubDate>'
+        f'<guid isPermaLink="false">{item["index"]} at '
+        f'https://cmo.smcgov.org</guid></item>'
+        for item in items)
+    return (f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0">'
+            f'<channel><title>Press Releases</title>{entries}</channel></rss>')
+
+
+def santa_clara_news(items: List[Dict[str, Any]]) -> str:
+    entries = ''.join(
+        f'<div class="sccgov-alerts-archive-item"><a href="{item["path"]}">'
+        f'{escape(item["title"])}</a><span class="sccgov-alerts-archive-date">'
+        f'{item["date"]:%m/%d/%Y}</span><span '
+        f'class="sccgov-alerts-archive-category">Press Release</span></div>'
+        for item in items)
+    return html_page(entries)
+
+
+def solano_news(items: List[Dict[str, Any]]) -> str:
+    cells = ''.join(
+        f'<tr><td><a class="newsheader" href="{item["path"]}">'
+        f'{escape(item["title"])}</a><div class="newsdate">'
+        f'{long_date(item["date"])}</div><div class="newsbody">SOLANO COUNTY '
+        f'- {SUMMARY} <a class="more" href="{item["path"]}">More</a></div>'
+        f'</td></tr>'
+        for item in items)
+    return html_page(f'<table>{cells}</table>')
+
+
+def sonoma_news(items: List[Dict[str, Any]]) -> str:
+    entries = ''.join(
+        f'<div class="teaserContainer"><div class="titlePrimary"><a '
+        f'href="{item["path"]}">{escape(item["title"])}</a></div>'
+        f'<div class="published"><span class="date">{us_date(item["date"])}'
+        f'</span><span class="time">{item["date"]:%I:%M %p}</span></div>'
+        f'<div class="summary">{SUMMARY}</div><div class="source">'
+        f'County Administrator\'s Office</div></div>'
+        for item in items)
+    return html_page(f'<div class="teaserContainer srchResults">{entries}'
+                     f'</div>')
+
+
+# Builds the HTML (or RSS) for a page of news for each news scraper.
+NEWS_PAGES: Dict[str, Callable[[List[Dict[str, Any]]], str]] = {
+    'alameda': alameda_news,
+    'contra_costa': contra_costa_news,
+    'marin': marin_news,
+    'napa': napa_news,
+    'san_francisco': san_francisco_news,
+    'san_mateo': san_mateo_news,
+    'santa_clara': santa_clara_news,
+    'solano': solano_news,
+    'sonoma': sonoma_news,
+}
+
+# News scrapers that load pages in Firefox rather than with requests.
+BROWSER_NEWS = {'alameda', 'santa_clara'}
+
+
+def add_news(cassette: Cassette, county: str, now: datetime) -> None:
+    scraper: NewsScraper = news_scrapers[county]()
+    news = SyntheticNews(now, county)
+    render = NEWS_PAGES[county]
+    cassette.options.update(
+        from_date=(now - timedelta(days=NEWS_DAYS)).isoformat(),
+        to_date=now.isoformat())
+
+    if scraper.MAX_PAGES < 2:
+        if county in BROWSER_NEWS:
+            cassette.pages[scraper.URL] = render(news.items)
+        else:
+            content_type = ('application/rss+xml; charset=utf-8'
+                            if county == 'san_mateo' else None)
+            add_response(cassette, scraper.URL, render(news.items),
+                         content_type=content_type)
+        return
+
+    pages = news.pages()
+    # Pages are loaded in batches, so the scraper asks for pages past the
+    # last one it needs. Like a real site, pages past the end are not found.
+    page_count = len(pages) + scraper.PAGE_CONCURRENCY
+    for page in range(1, page_count + 1):
+        url = scraper.page_url(page)
+        if url:
+            if page <= len(pages):
+                add_response(cassette, url, render(pages[page - 1]))
+            else:
+                add_response(cassette, url, html_page('<h1>Not Found</h1>'),
+                             status=404)
+
+
+def days(now: datetime) -> List[date]:
+    """Get the days of a timeseries, oldest first."""
+    today = now.date()
+    return [today - timedelta(days=offset)
+            for offset in range(SERIES_DAYS - 1, -1, -1)]
+
+
+def epoch_ms(day: date) -> int:
+    noon = datetime(day.year, day.month, day.day, 19, tzinfo=timezone.utc)
+    return int(noon.timestamp() * 1000)
+
+
+def add_alameda(cassette: Cassette, now: datetime) -> None:
+    randomizer = random.Random('alameda')
+    add_response(cassette, alameda.cases_meta, {
+        'currentVersion': 10.7,
+        'name': 'AC_dates',
+        'editingInfo': {'lastEditDate': epoch_ms(now.date())},
+    })
+
+    features = []
+    cumul_cases = cumul_deaths = 0
+    for day in days(now):
+        cases = randomizer.randrange(20, 200)
+        deaths = randomizer.randrange(0, 4)
+        cumul_cases += cases
+        cumul_deaths += deaths
+        features.append({'attributes': {
+            'Date': us_date(day), 'AC_Cases': cases,
+            'AC_CumulCases': cumul_cases, 'AC_Deaths': deaths,
+            'AC_CumulDeaths': cumul_deaths,
+        }})
+    add_response(cassette, alameda.cases_deaths, {'features': features},
+                 params={'where': '0=0', 'resultType': 'none',
+                         'outFields': 'Date,AC_Cases,AC_CumulCases,'
+                                      'AC_Deaths,AC_CumulDeaths',
+                         'outSR': '4326', 'orderByField': 'Date',
+                         'f': 'json'})
+
+    labels = DEMOGRAPHICS['alameda']
+    demographic_cases: Dict[str, Any] = {'Geography': 'Alameda County'}
+    demographic_deaths: Dict[str, Any] = {'Geography': 'Alameda County'}
+    for category, label_map in labels.items():
+        for label in label_map.labels:
+            demographic_cases[label] = randomizer.randrange(10, 5000)
+            # The deaths table has no trans genders.
+            if label not in ('MTF', 'FTM'):
+                demographic_deaths[f'Deaths_{label}'] = randomizer.randrange(10, 100)
+    params = {'where': "Geography='Alameda County'", 'outFields': '*',
+              'outSR': '4326', 'f': 'json'}
+    add_response(cassette, alameda.demographics_cases,
+                 {'features': [{'attributes': demographic_cases}]}, params=params)
+    add_response(cassette, alameda.demographics_deaths,
+                 {'features': [{'attributes': demographic_deaths}]}, params=params)
+
+    for url in alameda.dashboards:
+        cassette.pages[url] = html_page(
+            '<div class="dashboard"><p>Notes: Data are updated daily. Cases '
+            'are reported by date of test result. Counts under 10 are '
+            'suppressed.</p></div>')
+
+
+def add_san_francisco(cassette: Cassette, now: datetime) -> None:
+    randomizer = random.Random('san_francisco')
+    api = SocrataApi(san_francisco.API_URL)
+    ids = san_francisco.RESOURCE_IDS
+    updated = (now - timedelta(hours=6)).astimezone(timezone.utc)
+    for resource_id in ids.values():
+        add_response(cassette, f'{api.metadata_url}{resource_id}.json', {
+            'id': resource_id,
+            'description': f'Data for {resource_id}. {SUMMARY}',
+            'dataUpdatedAt': f'{updated:%Y-%m-%dT%H:%M:%S}+0000',
+        })
+
+    def resource(name: str, body: Any, params: Dict[str, str]) -> None:
+        add_response(cassette, f'{api.resource_url}{ids[name]}', body,
+                     params=params)
+
+    timestamps = [f'{day.isoformat()}T00:00:00.000' for day in days(now)]
+    for disposition, field, low, high in (('Confirmed', 'cases', 10, 150),
+                                          ('Death', 'deaths', 0, 3)):
+        resource('cases_deaths_transmission',
+                 [{'date': timestamp, field: str(randomizer.randrange(low, high))}
+                  for timestamp in timestamps],
+                 {'case_disposition': disposition,
+                  '$select': f'specimen_collection_date as date, '
+                             f'sum(case_count) as {field}',
+                  '$group': 'specimen_collection_date',
+                  '$order': 'specimen_collection_date'})
+    resource('cases_deaths_transmission',
+             [{'transmission_category': label,
+               'sum_case_count': str(randomizer.randrange(100, 5000))}
+              for label in DEMOGRAPHICS['san_francisco']['transmission_cat'].labels],
+             {'$select': 'transmission_category, sum(case_count)',
+              '$group': 'transmission_category'})
+
+    tests = []
+    for timestamp in timestamps:
+        positive = randomizer.randrange(10, 150)
+        negative = randomizer.randrange(1000, 4000)
+        tests.append({'specimen_collection_date': timestamp,
+                      'tests': f'{positive + negative}.0',
+                      'pos': str(positive), 'neg': f'{negative}.0'})
+    resource('tests', tests, {'$order': 'specimen_collection_date'})
+
+    latest = timestamps[-1]
+    for name, field, order in (('age', 'age_group', True),
+                               ('gender', 'gender', False),
+                               ('race_eth', 'race_ethnicity', False)):
+        resource(name, [{'date': latest}],
+                 {'$select': 'max(specimen_collection_date) as date'})
+        params = {'$select': f'{field}, cumulative_confirmed_cases as cases',
+                  '$where': f'specimen_collection_date="{latest}"'}
+        if order:
+            params['$order'] = field
+        label_map = DEMOGRAPHICS['san_francisco'][name.replace('age', 'age_group')]
+        resource(name, [{field: label, 'cases': str(randomizer.randrange(10, 5000))}
+                        for label in label_map.labels], params)
+
+
+def add_solano(cassette: Cassette, now: datetime) -> None:
+    randomizer = random.Random('solano')
+    add_response(cassette, solano.metadata_url, {
+        'currentVersion': 10.7,
+        'name': 'COVID_19_Survey_part_1_v2_new_public_view',
+        'editFieldsInfo': {'creationDateField': 'CreationDate',
+                           'editDateField': 'EditDate'},
+        'editingInfo': {'lastEditDate': epoch_ms(now.date())},
+    })
+    cassette.pages[solano.dashboard_url] = html_page(
+        '<div class="dashboard"><div>Solano County COVID-19 Dashboard</div>'
+        '<div>Disclaimers: Data updated weekdays at 4:30pm</div></div>')
+
+    features = []
+    cumul_cases = cumul_deaths = cumul_tests = 0
+    for day in days(now):
+        cases = randomizer.randrange(5, 60)
+        cumul_cases += cases
+        cumul_deaths += randomizer.randrange(0, 2)
+        cumul_tests += randomizer.randrange(200, 800)
+        # Cumulative deaths and tests are sometimes missing on days they
+        # didn't change.
+        features.append({'attributes': {
+            'date_reported': epoch_ms(day),
+            'cumulative_number_of_cases_on_t': cumul_cases,
+            'total_deaths': None if day.day % 7 == 0 else cumul_deaths,
+            'residents_tested': None if day.day % 5 == 0 else cumul_tests,
+            'new_cases_confirmed_today': None if day.day % 11 == 0 else cases,
+        }})
+    add_response(cassette, solano.data_url, {'features': features}, params={
+        'where': 'cumulative_number_of_cases_on_t>0', 'resultType': 'none',
+        'outFields': 'date_reported,cumulative_number_of_cases_on_t,'
+                     'total_deaths,residents_tested,new_cases_confirmed_today',
+        'orderByFields': 'date_reported asc', 'f': 'json'})
+
+    add_response(cassette, solano.age_group_url, {'features': [
+        {'attributes': {'Age_Group': label,
+                        'All_cases_Number': randomizer.randrange(100, 3000),
+                        'Died_Number': randomizer.randrange(0, 50)}}
+        for label in DEMOGRAPHICS['solano']['age_group'].labels
+    ]}, params={'where': '0=0',
+                'outFields': 'Age_Group, All_cases_Number, Died_Number',
+                'orderByFields': 'Age_Group ASC', 'f': 'json'})
+
+    today = epoch_ms(now.date())
+    yesterday = epoch_ms(now.date() - timedelta(days=1))
+    add_response(cassette, solano.data2_url, {'features': [
+        {'attributes': {'date_reported': reported, 'gender': gender,
+                        'number_of_cases': randomizer.randrange(1000, 5000)}}
+        for reported, gender in ((today, 'female'), (today, 'male'),
+                                 (yesterday, 'unknown'))
+    ]}, params={'where': '0=0', 'outFields': '*',
+                'orderByFields': 'date_reported DESC',
+                'resultRecordCount': '3', 'f': 'json'})
+
+    latest = {'date_reported': today, 'all_cases_total': cumul_cases}
+    for label in DEMOGRAPHICS['solano']['race_eth'].labels:
+        latest[label] = randomizer.randrange(10, 3000)
+    add_response(cassette, solano.data_url,
+                 {'features': [{'attributes': latest}]},
+                 params={'where': 'all_cases_total>0', 'outFields': '*',
+                         'orderByFields': 'date_reported DESC',
+                         'resultRecordCount': '1', 'f': 'json'})
+
+
+DATA_FIXTURES: Dict[str, Callable[[Cassette, datetime], None]] = {
+    'alameda': add_alameda,
+    'san_francisco': add_san_francisco,
+    'solano': add_solano,
+}
+
+
+def build_fixture(name: str, now: datetime) -> Cassette:
+    """Build the synthetic cassette for a benchmark, like ``news.napa``."""
+    kind, county = name.split('.', 1)
+    cassette = Cassette(cassette_path(name), 'record')
+    if kind == 'news':
+        add_news(cassette, county, now)
+    else:
+        DATA_FIXTURES[county](cassette, now)
+    return cassette
+
+
+@click.command(help='Write synthetic fixtures for benchmarks. TARGET can be '
+                    '"news", "data", or a single scraper, like "news.napa".')
+@click.argument('targets', metavar='[TARGET]...', nargs=-1)
+def main(targets: Tuple[str, ...]) -> None:
+    # Use a whole minute so regenerated fixtures don't change needlessly.
+    now = datetime.now().astimezone().replace(second=0, microsecond=0)
+    for name in select(targets):
+        click.echo(f'Writing {cassette_path(name)}')
+        build_fixture(name, now).save()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Write output files ("artifacts") atomically, along with compressed copies of
+them. Static hosts can serve the compressed copies directly instead of
+compressing files on every request:
+
+>>> with open_artifact('output/data.json', {'gz': 9, 'br': 11}) as output:
+>>>     serialization.dump(data, output)
+
+This writes ``data.json``, ``data.json.gz``, and ``data.json.br`` in a single
+pass. Each file is written to a temporary file and then moved into place, so
+anything reading them never sees a half-written file.
+
+Brotli (``.br``) compression is only available if the `brotli
+<https://pypi.org/project/Brotli/>`_ package is installed.
+"""
+
+from contextlib import contextmanager, ExitStack
+import gzip
+import io
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import (Any, BinaryIO, Callable, Dict, Iterator, List, Mapping,
+                    Union, cast)
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+
+# The default compression level for each kind of compressed copy, keyed by
+# file extension.
+DEFAULT_LEVELS = {'gz': 9, 'br': 11}
+
+# Temporary files are only readable by their owner, so finished files are
+# given the permissions `open()` would have given them. Reading the umask means
+# setting it, so only do that once.
+UMASK = os.umask(0)
+os.umask(UMASK)
+FILE_MODE = 0o666 & ~UMASK
+
+
+@contextmanager
+def atomic_open(path: Union[str, Path]) -> Iterator[BinaryIO]:
+    """
+    Open a file for writing in binary mode. Data is written to a temporary
+    file, which replaces ``path`` when the ``with`` block finishes. If the
+    block raises an exception, ``path`` is left untouched.
+    """
+    path = Path(path)
+    # A unique name means several writers can't trample each other's
+    # temporary files. The last one to finish wins.
+    temporary = tempfile.NamedTemporaryFile(dir=path.parent,
+                                            prefix=f'.{path.name}.',
+                                            suffix='.tmp', delete=False)
+    temporary_path = Path(temporary.name)
+    try:
+        with temporary:
+            yield cast(BinaryIO, temporary)
+        os.chmod(temporary_path, FILE_MODE)
+        temporary_path.replace(path)
+    except BaseException:
+        try:
+            temporary_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class GzipCompressor:
+    def __init__(self, stream: BinaryIO, level: int, name: str) -> None:
+        # Leave out the time so the output only changes if the data does.
+        self.file = gzip.GzipFile(filename=name, mode='wb', compresslevel=level,
+                                  fileobj=stream, mtime=0)
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class BrotliCompressor:
+    def __init__(self, stream: BinaryIO, level: int, name: str) -> None:
+        self.stream = stream
+        self.compressor = brotli.Compressor(quality=level)
+
+    def write(self, data: bytes) -> None:
+        self.stream.write(self.compressor.process(data))
+
+    def close(self) -> None:
+        self.stream.write(self.compressor.finish())
+
+
+# Compressors for each kind of compressed copy, keyed by file extension. Each
+# takes a stream to write to, a compression level, and the name of the
+# uncompressed file.
+COMPRESSORS: Dict[str, Callable[[BinaryIO, int, str], Any]] = {
+    'gz': GzipCompressor,
+}
+if brotli:
+    COMPRESSORS['br'] = BrotliCompressor
+
+
+def compression_levels(gzip_level: int = DEFAULT_LEVELS['gz'],
+                       brotli_level: int = None) -> Dict[str, int]:
+    """
+    Get the compression levels to pass to `open_artifact()`. A level of 0
+    means no compressed copy.
+
+    If ``brotli_level`` isn't set, Brotli copies are written at the default
+    level when the ``brotli`` package is installed, and quietly skipped when
+    it isn't. If it is set and the package isn't installed, they are skipped
+    with a warning.
+    """
+    if brotli_level is None:
+        brotli_level = DEFAULT_LEVELS['br'] if 'br' in COMPRESSORS else 0
+    levels = {'gz': gzip_level, 'br': brotli_level}
+    if levels['br'] and 'br' not in COMPRESSORS:
+        logging.warning('Not writing .br files because the brotli package '
+                        'is not installed')
+        levels['br'] = 0
+    return levels
+
+
+class ArtifactStream(io.BufferedIOBase):
+    """
+    A writable binary stream that writes to an uncompressed file and any
+    number of compressors.
+    """
+
+    def __init__(self, stream: BinaryIO, compressors: List[Any]) -> None:
+        super().__init__()
+        self.stream = stream
+        self.compressors = compressors
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self.stream.write(data)
+        for compressor in self.compressors:
+            compressor.write(data)
+        return len(data)
+
+
+@contextmanager
+def open_artifact(path: Union[str, Path],
+                  compression: Mapping[str, int] = None) -> Iterator[BinaryIO]:
+    """
+    Open a file for writing in binary mode, along with compressed copies of
+    it. All the files are written atomically (see `atomic_open()`).
+
+    Parameters
+    ----------
+    path
+        The path to write the uncompressed file to. Compressed copies are
+        written next to it, with an extra extension (e.g. ``data.json.gz``).
+    compression
+        A dict of file extension: compression level (see `COMPRESSORS` and
+        `compression_levels()`). Existing copies with a level of 0 are
+        deleted so they don't go out of date. (Default: no compressed copies)
+    """
+    path = Path(path)
+    compression = compression or {}
+    with ExitStack() as stack:
+        stream = stack.enter_context(atomic_open(path))
+        compressors = []
+        for extension, level in compression.items():
+            if level:
+                compressed = stack.enter_context(
+                    atomic_open(path.with_name(f'{path.name}.{extension}')))
+                compressors.append(
+                    COMPRESSORS[extension](compressed, level, path.name))
+        yield cast(BinaryIO, ArtifactStream(stream, compressors))
+        for compressor in compressors:
+            compressor.close()
+
+    for extension, level in compression.items():
+        if not level:
+            try:
+                path.with_name(f'{path.name}.{extension}').unlink()
+            except FileNotFoundError:
+                pass
@@ -1,16 +1,15 @@
-from typing import Dict, Any
-from . import alameda
-from . import san_francisco
-from . import solano
+from typing import Any, MutableMapping
+from ..registry import LazyRegistry
 
-scrapers: Dict[str, Any] = {
-    'alameda': alameda,
+# Scrapers are imported when they are first looked up (see `LazyRegistry`).
+scrapers: MutableMapping[str, Any] = LazyRegistry(__name__, {
+    'alameda': '.alameda',
     # 'contra_costa': None,
     # 'marin': None,
     # 'napa': None,
-    'san_francisco': san_francisco,
+    'san_francisco': '.san_francisco',
     # 'san_mateo': None,
     # 'santa_clara': None,
-    'solano': solano,
+    'solano': '.solano',
     # 'sonoma': None,
-}
+})
@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
-import requests
-from bs4 import BeautifulSoup # type: ignore
+from .. import transport
 import json
 from typing import List, Dict, Tuple
 from datetime import datetime, timezone
-from ..webdriver import get_firefox
+from .demographics import DEMOGRAPHICS, get_category
 from .utils import get_data_model
 
 # Note that we are using numbers for all of Alameda County, including Berkeley
@@ -23,6 +22,11 @@ demographics_meta = 'https://services3.arcgis.com/1iDJcsklY3l3KIjE/arcgis/rest/s
 dashboards = ['https://ac-hcsa.maps.arcgis.com/apps/opsdashboard/index.html#/1e0ac4385cbe4cc1bffe2cf7f8e7f0d9',
               'https://ac-hcsa.maps.arcgis.com/apps/opsdashboard/index.html#/332a092bbc3641bd9ec8373e7c7b5b3d']
 
+# How each demographic category is named in the list of counts under 10 in
+# "meta_from_baypd". These predate the data model's names, so race is "race",
+# not "race_eth". Labels that aren't in any category are "other".
+LT_10_CATEGORIES = {'gender': 'gender', 'race_eth': 'race', 'age_group': 'age_group'}
+
 def get_county() -> Dict:
     """Main method for populating county data .json"""
 
@@ -34,18 +38,8 @@ def get_county() -> Dict:
     out["source_url"] = landing_page
     out["meta_from_source"] = get_notes()
 
-    # fetch cases metadata, to get the timestamp
-    response = requests.get(cases_meta)
-    response.raise_for_status()
-    cases_header = response.json()
-    timestamp = cases_header["editingInfo"]["lastEditDate"]
-    # Raise an exception if a timezone is specified. If "dateFieldsTimeReference" is present, we need to edit this scrapr to handle it.
-    # See: https://developers.arcgis.com/rest/services-reference/layer-feature-service-.htm#GUID-20D36DF4-F13A-4B01-AA05-D642FA455EB6
-    if "dateFieldsTimeReference" in cases_header["editingInfo"] or "editFieldsInfo" in cases_header:
-        raise FutureWarning("A timezone may now be specified in the metadata.")
-    # convert timestamp to datetime object
-    update = datetime.fromtimestamp(timestamp/1000, tz=timezone.utc)
-    out["update_time"] = update.isoformat()
+    # The cases dataset's update time is the county's update time.
+    out["update_time"] = get_edit_time(cases_meta)
 
     # get cases, deaths, and demographics data
     out["series"] = get_timeseries()
@@ -58,6 +52,32 @@ def get_county() -> Dict:
     return out
 
 
+def get_update_time() -> Tuple[str, str]:
+    """
+    Get the times the cases and demographics data were last updated. This only
+    fetches small metadata files, so it's a cheap way to check whether the
+    county has new data.
+    """
+    return get_edit_time(cases_meta), get_edit_time(demographics_meta)
+
+
+def get_edit_time(metadata_url: str) -> str:
+    """
+    Get the time a dataset was last edited from its ArcGIS layer metadata.
+    """
+    response = transport.get(metadata_url)
+    response.raise_for_status()
+    header = response.json()
+    timestamp = header["editingInfo"]["lastEditDate"]
+    # Raise an exception if a timezone is specified. If "dateFieldsTimeReference" is present, we need to edit this scrapr to handle it.
+    # See: https://developers.arcgis.com/rest/services-reference/layer-feature-service-.htm#GUID-20D36DF4-F13A-4B01-AA05-D642FA455EB6
+    if "dateFieldsTimeReference" in header["editingInfo"] or "editFieldsInfo" in header:
+        raise FutureWarning("A timezone may now be specified in the metadata.")
+    # convert timestamp to datetime object
+    update = datetime.fromtimestamp(timestamp/1000, tz=timezone.utc)
+    return update.isoformat()
+
+
 # Confirmed Cases and Deaths
 def get_timeseries() -> Dict:
     """Fetch daily and cumulative cases and deaths by day
@@ -78,7 +98,7 @@ def get_timeseries() -> Dict:
 
     # query API
     param_list = {'where':'0=0', 'resultType': 'none', 'outFields': 'Date,AC_Cases,AC_CumulCases,AC_Deaths,AC_CumulDeaths', 'outSR': '4326','orderByField': 'Date', 'f': 'json'}
-    response = requests.get(cases_deaths, params=param_list)
+    response = transport.get(cases_deaths, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     features = [obj["attributes"] for obj in parsed['features']]
@@ -106,21 +126,26 @@ def get_timeseries() -> Dict:
 
 def get_notes() -> str:
     """Scrape notes and disclaimers from dashboards."""
+    # BeautifulSoup and Selenium are slow to import and only needed here, so
+    # don't make everything else (like `get_update_time()`) wait for them.
+    from bs4 import BeautifulSoup  # type: ignore
+    from ..webdriver import get_firefox
     notes = []
-    driver = get_firefox()
-    driver.implicitly_wait(30)
-    for url in dashboards:
-        has_notes = False
-        driver.get(url)
-        soup = BeautifulSoup(driver.page_source,'html5lib')
-        for p_tag in soup.find_all('p'):
-            if 'Notes' in p_tag.get_text():
-                notes.append(p_tag.get_text().strip())
-                has_notes = True
-        if not has_notes:
-            raise(FutureWarning("This dashboard url has changed. None of the <p> elements contain the text \'Notes\': " + url))
-        driver.get('about:blank') # loads empty page to allow loading of next page
-    driver.quit()
+    # Use `with` so the browser is quit (or returned to the browser pool) even
+    # if a dashboard has changed and we raise an error.
+    with get_firefox() as driver:
+        driver.implicitly_wait(30)
+        for url in dashboards:
+            has_notes = False
+            driver.get(url)
+            soup = BeautifulSoup(driver.page_source,'html5lib')
+            for p_tag in soup.find_all('p'):
+                if 'Notes' in p_tag.get_text():
+                    notes.append(p_tag.get_text().strip())
+                    has_notes = True
+            if not has_notes:
+                raise(FutureWarning("This dashboard url has changed. None of the <p> elements contain the text \'Notes\': " + url))
+            driver.get('about:blank') # loads empty page to allow loading of next page
     return '\n\n'.join(notes)
 
 def get_demographics(out: Dict) -> Tuple[Dict, List]:
@@ -130,25 +155,18 @@ def get_demographics(out: Dict) -> Tuple[Dict, List]:
     To create a DataFrame from the dictionary, run 'pd.DataFrame(get_demographics()[0])'
     Note that the DataFrame will convert the "<10" strings to NaN.
     """
-    # Dicts of target_label : source_label for re-keying.
-    # Note that the cases table includes MTF and FTM, but the deaths table does not.
-    GENDER_KEYS = {"female": "Female", "male": "Male",
-                   "unknown": "Unknown_Sex", "mtf": "MTF", "ftm": "FTM"}
-    RACE_KEYS = {"Latinx_or_Hispanic": "Hispanic_Latino", "Asian": "Asian", "African_Amer": "African_American_Black",
-                 "White": "White", "Pacific_Islander": "Pacific_Islander", "Native_Amer": "Native_American", "Multiple_Race": "Multirace",
-                 "Other": "Other_Race", "Unknown": "Unknown_Race"}
-    # list of ordered (target_label, source_label) tuples  for re-keying the age table
-    AGE_KEYS = { "18_and_under":"Age_LT18", "18_to_30":"Age_18_30", "31_to_40":"Age_31_40", "41_to_50":"Age_41_50", "51_to_60":"Age_51_60", "61_to_70":"Age_61_70", "71_to_80":"Age_71_80", "81_and_older":"Age_81_Up", "Unknown":"Unknown_Age" }
+    # Label maps for re-keying (see demographics.py).
+    labels = DEMOGRAPHICS['alameda']
 
     # format query to get entry for Alameda County
     param_list = {'where': "Geography='Alameda County'", 'outFields': '*', 'outSR':'4326', 'f':'json'}
     # get cases data
-    response = requests.get(demographics_cases, params=param_list)
+    response = transport.get(demographics_cases, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     cases_data = parsed['features'][0]['attributes']
     # get deaths data
-    response = requests.get(demographics_deaths, params=param_list)
+    response = transport.get(demographics_deaths, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     deaths_data = parsed['features'][0]['attributes']
@@ -162,14 +180,11 @@ def get_demographics(out: Dict) -> Tuple[Dict, List]:
     counts_lt_10 = []
     for cat, data in demo_data.items():
         for key, val in data.items():
-            if key in GENDER_KEYS.values():
-                demo = 'gender'
-            elif key in RACE_KEYS.values():
-                demo = 'race'
-            elif key in AGE_KEYS.values():
-                demo = 'age_group'
-            elif key == "Geography":
+            if key == "Geography":
                 continue # exclude the k,v pair "Geography":"Alameda County"
+            # the deaths table has the same labels as the cases table, prefixed with "Deaths_"
+            label = key[len('Deaths_'):] if key.startswith('Deaths_') else key
+            demo = LT_10_CATEGORIES.get(get_category('alameda', label) or '', 'other')
             if val == '<10':
                 counts_lt_10.append(f"{cat}.{demo}.{key}")
             elif val is None:  # proactively set None values to our default value of -1
@@ -184,25 +199,24 @@ def get_demographics(out: Dict) -> Tuple[Dict, List]:
     demo_totals = {
         "case_totals": out["case_totals"], "death_totals": out["death_totals"]}
 
+    # Check that all the labels are there before re-keying anything
+    for category in ('gender', 'race_eth'):
+        labels[category].require(cases_data)
+    labels['race_eth'].require(deaths_data, 'Deaths_')
+
     # Parse and re-key demo_totals
     # gender cases and deaths
-    for k, v in GENDER_KEYS.items():
+    for v, k in labels['gender'].items():
         demo_totals["case_totals"]["gender"][k] = cases_data[v]
         if f'Deaths_{v}' in deaths_data:  # the deaths table does not currently include MTF or FTM
             demo_totals["death_totals"]["gender"][k] = deaths_data['Deaths_' + v]
     # race cases and deaths
-    for k, v in RACE_KEYS.items():
+    for v, k in labels['race_eth'].items():
         demo_totals["case_totals"]["race_eth"][k] = cases_data[v]
         demo_totals["death_totals"]["race_eth"][k] = deaths_data['Deaths_' + v]
     # re-key and re-format age tables as a list
-    cases_age_table = []
-    deaths_age_table = []
-    for out_key, data_key in AGE_KEYS.items():
-        cases_age_table.append( {'group': out_key, 'raw_count':cases_data.get(data_key) } )
-        deaths_age_table.append( {'group': out_key, 'raw_count':deaths_data.get("Deaths_"+data_key) } )
-
-    demo_totals['case_totals']['age_group'] = cases_age_table
-    demo_totals['death_totals']['age_group'] = deaths_age_table
+    demo_totals['case_totals']['age_group'] = labels['age_group'].table(cases_data, required=False)
+    demo_totals['death_totals']['age_group'] = labels['age_group'].table(deaths_data, 'Deaths_', required=False)
 
     return demo_totals, counts_lt_10
 
@@ -0,0 +1,255 @@
+"""
+Export scraper output as typed, columnar tables (Apache Arrow IPC or Parquet
+files), so it can be loaded into pandas, DuckDB, etc. without parsing nested
+JSON every time. Requires the `pyarrow <https://arrow.apache.org/>`_ package.
+
+Tables are laid out based on the data model: every list of objects (like
+``series.cases``) and every object of counts (like ``case_totals.gender``)
+is a table, named by its path in the data (``series_cases``,
+``case_totals_gender``). Each table also gets the ``update_time`` of the
+output it came from, and the county's name for county data.
+
+Files are partitioned by the UTC date of the output's ``update_time``:
+
+    <directory>/<table>/snapshot_date=<yyyy-mm-dd>/<county>-<update time>.arrow
+
+Exporting the same output twice writes the same file, so exporting stale
+data is harmless. Arrow files can be memory-mapped, so reading a year of
+snapshots is fast and doesn't need much memory:
+
+>>> cases = read_table('tables', 'series_cases').to_pandas()
+"""
+
+from datetime import date, datetime, timezone
+from functools import lru_cache
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from ..artifacts import atomic_open
+from .validation import (DATE_PLACEHOLDER, MODELS_PATH, TIMESTAMP_PLACEHOLDER,
+                         find_list_items)
+
+
+# File extension for each format.
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+# Fields in the data model that are notes, not data.
+SKIPPED_FIELDS = {'meta_from_source'}
+
+
+class Column(NamedTuple):
+    name: str
+    # One of the keys in `CONVERTERS`.
+    kind: str
+
+
+class Table(NamedTuple):
+    # The keys to follow from the top of the data to get to the table.
+    path: Tuple[str, ...]
+    # Whether the table is a list of rows (rather than a single object).
+    is_list: bool
+    columns: Tuple[Column, ...]
+
+
+def parse_timestamp(value: str) -> datetime:
+    # `fromisoformat()` doesn't support "Z" before Python 3.11.
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def to_count(value: Any) -> Optional[int]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value) if float(value).is_integer() else None
+
+
+# Convert a JSON value to a value of each kind of column. Values that can't be
+# converted are null; use `validation.check()` to catch them first.
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'boolean': lambda value: value if isinstance(value, bool) else None,
+    'count': to_count,
+    'date': lambda value: date.fromisoformat(value) if value else None,
+    'string': lambda value: value if isinstance(value, str) else None,
+    'timestamp': lambda value: parse_timestamp(value) if value else None,
+}
+
+
+def column_kind(template: Any) -> Optional[str]:
+    """Get the kind of column for a value in a data model template."""
+    if isinstance(template, bool):
+        return 'boolean'
+    if isinstance(template, (int, float)):
+        return 'count'
+    if isinstance(template, str):
+        if template == DATE_PLACEHOLDER:
+            return 'date'
+        if template == TIMESTAMP_PLACEHOLDER:
+            return 'timestamp'
+        return 'string'
+    return None
+
+
+def template_columns(template: Dict) -> Tuple[Column, ...]:
+    columns = ((key, column_kind(value)) for key, value in template.items())
+    return tuple(Column(name, kind) for name, kind in columns if kind)
+
+
+def find_tables(template: Dict, list_items: Dict[str, Any],
+                path: Tuple[str, ...] = (),
+                tables: Dict[str, Table] = None) -> Dict[str, Table]:
+    if tables is None:
+        tables = {}
+    # The fields at the top level (name, update_time, etc.) are metadata.
+    columns = template_columns(template)
+    if path and columns:
+        tables['_'.join(path)] = Table(path, False, columns)
+
+    for key, value in template.items():
+        if key in SKIPPED_FIELDS:
+            continue
+        if isinstance(value, dict):
+            find_tables(value, list_items, path + (key,), tables)
+        elif isinstance(value, list):
+            item = value[0] if value else list_items.get(key)
+            if isinstance(item, dict):
+                tables['_'.join(path + (key,))] = Table(
+                    path + (key,), True, template_columns(item))
+    return tables
+
+
+@lru_cache(maxsize=None)
+def get_tables(model: str = 'data_model') -> Dict[str, Table]:
+    """Get the layout of every table for a data model."""
+    with (MODELS_PATH / f'{model}.json').open(encoding='utf-8') as model_file:
+        template = json.load(model_file)
+    return find_tables(template, find_list_items(template, {}))
+
+
+def get_columns(data: Dict, model: str = 'data_model',
+                county: str = None) -> Dict[str, Dict[Column, List]]:
+    """
+    Get the data for each table from a scraper's output, as a dict of
+    table name: {column: values}. Tables with no rows are left out.
+    """
+    update_time = parse_timestamp(data['update_time'])
+    result = {}
+    for name, table in get_tables(model).items():
+        value: Any = data
+        for key in table.path:
+            value = value.get(key) if isinstance(value, dict) else None
+        rows = value if table.is_list else [value]
+        rows = [row for row in rows or () if isinstance(row, dict) and row]
+        if not rows:
+            continue
+
+        columns: Dict[Column, List] = {}
+        if county:
+            columns[Column('county', 'string')] = [county] * len(rows)
+        columns[Column('update_time', 'timestamp')] = [update_time] * len(rows)
+        for column in table.columns:
+            convert = CONVERTERS[column.kind]
+            columns[column] = [convert(row.get(column.name)) for row in rows]
+        result[name] = columns
+    return result
+
+
+def import_pyarrow() -> Any:
+    # pyarrow is optional and slow to import, so only import it when needed.
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.ipc  # type: ignore
+        import pyarrow.parquet  # type: ignore
+    except ImportError as error:
+        raise ImportError('Exporting tables requires the pyarrow package '
+                          '(pip install pyarrow)') from error
+    return pyarrow
+
+
+def to_arrow(columns: Dict[Column, List]) -> Any:
+    """Make a ``pyarrow.Table`` from the output of `get_columns()`."""
+    pyarrow = import_pyarrow()
+    types = {
+        'boolean': pyarrow.bool_(),
+        'count': pyarrow.int64(),
+        'date': pyarrow.date32(),
+        'string': pyarrow.string(),
+        'timestamp': pyarrow.timestamp('us', tz='UTC'),
+    }
+    return pyarrow.table({
+        column.name: pyarrow.array(values, type=types[column.kind])
+        for column, values in columns.items()
+    })
+
+
+def write_table(table: Any, path: Path, format: str = 'arrow') -> None:
+    pyarrow = import_pyarrow()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_open(path) as stream:
+        if format == 'parquet':
+            pyarrow.parquet.write_table(table, stream)
+        else:
+            with pyarrow.ipc.new_file(stream, table.schema) as writer:
+                writer.write_table(table)
+
+
+def export_tables(data: Dict, directory: Union[str, Path],
+                  format: str = 'arrow', model: str = 'data_model',
+                  county: str = None, name: str = None) -> List[Path]:
+    """
+    Write a scraper's output as a file for each table in its data model.
+
+    Parameters
+    ----------
+    data
+        The output of a scraper, e.g. ``alameda.get_county()``.
+    directory
+        The directory to write tables to.
+    format
+        ``arrow`` (Arrow IPC) or ``parquet``.
+    model
+        The data model of ``data`` (``data_model`` or ``hospitals_data_model``).
+    county
+        If set, every table gets a ``county`` column with this value.
+    name
+        The first part of each file's name. Defaults to ``county`` or "all".
+
+    Returns
+    -------
+    list of Path
+        The paths of the files that were written.
+    """
+    if format not in FORMATS:
+        raise ValueError(f'Unknown table format "{format}"')
+    update_time = parse_timestamp(data['update_time'])
+    filename = (f'{name or county or "all"}-{update_time:%Y%m%dT%H%M%SZ}'
+                f'{FORMATS[format]}')
+    # Use the same UTC time for the partition and the file name, so that an
+    # update late in the day local time is named and filed consistently.
+    partition = f'snapshot_date={update_time:%Y-%m-%d}'
+
+    paths = []
+    for table_name, columns in get_columns(data, model, county).items():
+        path = Path(directory, table_name, partition, filename)
+        write_table(to_arrow(columns), path, format)
+        paths.append(path)
+    return paths
+
+
+def read_table(directory: Union[str, Path], table: str,
+               format: str = 'arrow') -> Any:
+    """
+    Read every snapshot of a table written by `export_tables()` into a
+    ``pyarrow.Table``, with a ``snapshot_date`` column for the partition.
+    Arrow files are memory-mapped instead of being read into memory.
+    """
+    pyarrow = import_pyarrow()
+    import pyarrow.dataset  # type: ignore
+    import pyarrow.fs  # type: ignore
+    partitioning = pyarrow.dataset.partitioning(
+        pyarrow.schema([('snapshot_date', pyarrow.date32())]), flavor='hive')
+    dataset = pyarrow.dataset.dataset(
+        str(Path(directory, table)), partitioning=partitioning,
+        format='parquet' if format == 'parquet' else 'ipc',
+        filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True))
+    return dataset.to_table()
@@ -0,0 +1,191 @@
+"""
+How each county labels demographic categories (gender, age group, etc.) and
+what those labels should be re-keyed to in our data model. Keeping all the
+mappings here means they are built once, not every time a scraper runs, and
+that unexpected labels are caught up front, all at once:
+
+>>> genders = DEMOGRAPHICS['san_francisco']['gender']
+>>> genders.rekey([('Female', 10), ('Trans Female', 1), ('Male', 12)])
+{'female': 11, 'male': 12}
+>>> genders.check(['Female', 'Nonbinary', 'Agender'])
+FormatError: Unknown gender labels: "Nonbinary", "Agender"
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from ..errors import FormatError
+
+
+class LabelMap:
+    """
+    Maps the labels a county uses for one demographic category to the labels
+    in our data model. Several source labels can map to the same target label
+    (e.g. when a county breaks out categories we don't).
+
+    Parameters
+    ----------
+    category
+        The data model category, like ``gender`` or ``age_group``.
+    labels
+        A dict of source label: target label. Its order is the order of the
+        output of `table()`.
+    default
+        The target label for source labels that are not in ``labels``. If not
+        set, unknown labels are an error.
+    """
+
+    def __init__(self, category: str, labels: Dict[str, str],
+                 default: str = None) -> None:
+        self.category = category
+        self.labels = labels
+        self.default = default
+        # The target labels, in order and without duplicates.
+        self.targets = list(dict.fromkeys(labels.values()))
+
+    def __getitem__(self, label: str) -> str:
+        target = self.labels.get(label, self.default)
+        if target is None:
+            raise FormatError(f'Unknown {self.category} label: "{label}"')
+        return target
+
+    def items(self) -> Iterable[Tuple[str, str]]:
+        """Get (source label, target label) pairs."""
+        return self.labels.items()
+
+    def unknown(self, labels: Iterable[str]) -> List[str]:
+        return [label for label in dict.fromkeys(labels)
+                if label not in self.labels]
+
+    def check(self, labels: Iterable[str]) -> None:
+        """
+        Raise a `FormatError` listing every label that isn't mapped (unless
+        there is a default for unknown labels).
+        """
+        if self.default is None:
+            unknown = self.unknown(labels)
+            if unknown:
+                raise FormatError(f'Unknown {self.category} labels: '
+                                  + ', '.join(f'"{label}"' for label in unknown))
+
+    def require(self, data: Mapping[str, Any], prefix: str = '') -> None:
+        """
+        Raise a `FormatError` listing every source label (with ``prefix``)
+        that is missing from ``data``.
+        """
+        missing = [prefix + label for label in self.labels
+                   if prefix + label not in data]
+        if missing:
+            raise FormatError(f'Missing {self.category} labels: '
+                              + ', '.join(f'"{label}"' for label in missing))
+
+    def rekey(self, counts: Iterable[Tuple[str, int]],
+              initial: int = None) -> Dict[str, int]:
+        """
+        Re-key (source label, count) pairs, adding up counts for labels that
+        map to the same target. If ``initial`` is set, every target label is
+        included, starting at that value.
+        """
+        counts = list(counts)
+        self.check(label for label, _ in counts)
+        result = {} if initial is None else dict.fromkeys(self.targets, initial)
+        for label, count in counts:
+            target = self[label]
+            result[target] = result.get(target, 0) + count
+        return result
+
+    def table(self, data: Mapping[str, Any], prefix: str = '',
+              required: bool = True) -> List[Dict[str, Any]]:
+        """
+        Build a table like ``[{"group": target, "raw_count": count}, ...]``
+        from a dict of ``prefix + source label: count``. If ``required``,
+        every source label must be in ``data``; otherwise, missing counts are
+        ``None``.
+        """
+        if required:
+            self.require(data, prefix)
+        return [{'group': target, 'raw_count': data.get(prefix + source)}
+                for source, target in self.labels.items()]
+
+
+# The labels each county uses for each demographic category.
+DEMOGRAPHICS: Dict[str, Dict[str, LabelMap]] = {
+    'alameda': {
+        # Note that the cases table includes MTF and FTM, but the deaths table does not.
+        'gender': LabelMap('gender', {
+            'Female': 'female', 'Male': 'male', 'Unknown_Sex': 'unknown',
+            'MTF': 'mtf', 'FTM': 'ftm',
+        }),
+        'race_eth': LabelMap('race_eth', {
+            'Hispanic_Latino': 'Latinx_or_Hispanic', 'Asian': 'Asian',
+            'African_American_Black': 'African_Amer', 'White': 'White',
+            'Pacific_Islander': 'Pacific_Islander',
+            'Native_American': 'Native_Amer', 'Multirace': 'Multiple_Race',
+            'Other_Race': 'Other', 'Unknown_Race': 'Unknown',
+        }),
+        'age_group': LabelMap('age_group', {
+            'Age_LT18': '18_and_under', 'Age_18_30': '18_to_30',
+            'Age_31_40': '31_to_40', 'Age_41_50': '41_to_50',
+            'Age_51_60': '51_to_60', 'Age_61_70': '61_to_70',
+            'Age_71_80': '71_to_80', 'Age_81_Up': '81_and_older',
+            'Unknown_Age': 'Unknown',
+        }),
+    },
+    'san_francisco': {
+        # Note: non cis genders not currently reported
+        'gender': LabelMap('gender', {
+            'Female': 'female', 'Male': 'male', 'Unknown': 'unknown',
+            'Trans Female': 'female', 'Trans Male': 'male',
+        }),
+        'race_eth': LabelMap('race_eth', {
+            'Hispanic or Latino/a, all races': 'Latinx_or_Hispanic',
+            'Asian': 'Asian', 'Black or African American': 'African_Amer',
+            'White': 'White',
+            'Native Hawaiian or Other Pacific Islander': 'Pacific_Islander',
+            'Native American': 'Native_Amer', 'Multi-racial': 'Multiple_Race',
+            'Other': 'Other', 'Unknown': 'Unknown',
+        }),
+        'age_group': LabelMap('age_group', {
+            'under 18': '18_and_under', '18-30': '18_to_30',
+            '31-40': '31_to_40', '41-50': '41_to_50', '51-60': '51_to_60',
+            '61-70': '61_to_70', '71-80': '71_to_80', '81+': '81_and_older',
+        }),
+        'transmission_cat': LabelMap('transmission_cat', {
+            'Community': 'community', 'From Contact': 'from_contact',
+            'Unknown': 'unknown',
+        }),
+    },
+    'solano': {
+        # For entries where gender is not reported, assume unknown.
+        'gender': LabelMap('gender', {
+            'female': 'female', 'male': 'male', 'unknown': 'unknown',
+        }, default='unknown'),
+        # Multiple race and other race individuals are counted in the same
+        # category, which we map to Multiple_Race.
+        'race_eth': LabelMap('race_eth', {
+            'all_cases_hispanic': 'Latinx_or_Hispanic',
+            'all_cases_asian': 'Asian', 'all_cases_black': 'African_Amer',
+            'all_cases_white': 'White',
+            'all_cases_pacificIslander': 'Pacific_Islander',
+            'all_cases_ai_an': 'Native_Amer',
+            'all_cases_multi_o': 'Multiple_Race', 'unknown_all': 'Unknown',
+        }),
+        'age_group': LabelMap('age_group', {
+            '0-17 yrs': '0_to_17', '18-49 yrs': '18_to_49',
+            '50-64 yrs': '50_to_64', '65+ yrs': '65_and_older',
+        }),
+    },
+}
+
+
+# For each county, the category of every source label, so data that mixes
+# categories (like Alameda's) can be sorted out with one lookup per label.
+CATEGORIES: Dict[str, Dict[str, str]] = {
+    county: {label: category
+             for category, label_map in categories.items()
+             for label in label_map.labels}
+    for county, categories in DEMOGRAPHICS.items()
+}
+
+
+def get_category(county: str, label: str) -> Optional[str]:
+    """Get the demographic category of a county's source label, if any."""
+    return CATEGORIES[county].get(label)
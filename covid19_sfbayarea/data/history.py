@@ -0,0 +1,223 @@
+"""
+A local SQLite database of every value our scrapers have collected, so
+questions about the past ("ICU beds in Marin over the last 90 days") can be
+answered without re-scraping anything or digging through old output files:
+
+>>> with HistoryStore('history.db') as history:
+>>>     history.upsert(county_records('alameda', alameda.get_county()))
+>>>     rows = history.query(county='marin', series='hospitals',
+>>>                          field='icu_available_beds', since='2020-06-01')
+
+Every value is stored as a row of (county, series, date, field, value),
+keyed and indexed by (county, series, date, field). Storing the same value
+again replaces it, so re-running a scraper only updates what has changed.
+Series are:
+
+- ``cases``, ``deaths``, and ``tests`` from county data (``get_county()``).
+  Demographic totals are stored for the UTC date of the output's
+  ``update_time``, with a series like ``case_totals.gender`` and a field for
+  each group (``female``, ``male``, etc.).
+- ``hospitals`` from `hospitals.get_timeseries()`.
+- ``cds`` from the legacy Corona Data Scraper (``scraper.py``).
+
+Counties are named like the keys in ``data.scrapers`` (e.g.
+``san_francisco``). Values that are missing (``-1`` in our data model) or
+not numbers are stored as ``NULL``.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import sqlite3
+from types import TracebackType
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Type, Union)
+from .columnar import parse_timestamp
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS observations (
+    county TEXT NOT NULL,
+    series TEXT NOT NULL,
+    date TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value NUMERIC,
+    update_time TEXT NOT NULL,
+    PRIMARY KEY (county, series, date, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_by_series
+    ON observations (series, field, date);
+'''
+
+# Don't let values from older output (e.g. stale data from a CountyStore)
+# replace values from newer output.
+UPSERT = '''
+INSERT INTO observations (county, series, date, field, value, update_time)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (county, series, date, field) DO UPDATE
+SET value = excluded.value, update_time = excluded.update_time
+WHERE excluded.update_time >= observations.update_time
+'''
+
+TOTALS = ('case_totals', 'death_totals', 'population_totals')
+
+
+class Record(NamedTuple):
+    county: str
+    series: str
+    date: str
+    field: str
+    value: Optional[float]
+    update_time: str
+
+
+def county_key(name: str) -> str:
+    """Turn a county name like "San Francisco County" into "san_francisco"."""
+    name = name.strip()
+    if name.lower().endswith(' county'):
+        name = name[:-len(' county')]
+    return name.lower().replace(' ', '_')
+
+
+def to_value(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return None if value == -1 else value
+
+
+def utc_time(update_time: str) -> str:
+    # Times are compared as strings, so they all need the same time zone.
+    return parse_timestamp(update_time).isoformat()
+
+
+def county_records(county: str, data: Dict) -> Iterator[Record]:
+    """Get records from the output of a county's ``get_county()``."""
+    update_time = utc_time(data['update_time'])
+    for series, rows in (data.get('series') or {}).items():
+        for row in rows:
+            for field, value in row.items():
+                if field != 'date':
+                    yield Record(county, series, row['date'], field,
+                                 to_value(value), update_time)
+
+    # The UTC date, like the partitions from `columnar.export_tables()`.
+    date = update_time[:10]
+    for totals in TOTALS:
+        for category, values in (data.get(totals) or {}).items():
+            if isinstance(values, dict):
+                series = f'{totals}.{category}'
+                items = list(values.items())
+            elif isinstance(values, list):
+                series = f'{totals}.{category}'
+                items = [(row.get('group'), row.get('raw_count'))
+                         for row in values]
+            else:
+                # A single number, like population_totals.total_pop.
+                series = totals
+                items = [(category, values)]
+            for field, value in items:
+                if field:
+                    yield Record(county, series, date, field, to_value(value),
+                                 update_time)
+
+
+def hospital_records(data: Dict) -> Iterator[Record]:
+    """Get records from the output of `hospitals.get_timeseries()`."""
+    update_time = utc_time(data['update_time'])
+    for row in data.get('series') or ():
+        county = county_key(row['county'])
+        for field, value in row.items():
+            if field not in ('county', 'report_date', '_id'):
+                yield Record(county, 'hospitals', row['report_date'], field,
+                             to_value(value), update_time)
+
+
+def cds_records(data: Dict[str, Dict], update_time: str = None) -> Iterator[Record]:
+    """
+    Get records from the output of ``scraper.pipeline()`` (the legacy Corona
+    Data Scraper). Its output doesn't say when it was updated, so
+    ``update_time`` defaults to now.
+    """
+    update_time = utc_time(update_time
+                           or datetime.now(timezone.utc).isoformat())
+    for name, county_data in data.items():
+        county = county_key(name)
+        for row in county_data.get('cases') or ():
+            for field, value in row.items():
+                if field != 'date':
+                    yield Record(county, 'cds', row['date'], field,
+                                 to_value(value), update_time)
+
+
+class HistoryStore:
+    """
+    A SQLite database of scraped values (see the module docs). The database
+    uses write-ahead logging, so it can be queried while a scraper is writing
+    to it.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        # With WAL, this is still safe from corruption, and much faster.
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, error_type: Optional[Type[BaseException]],
+                 error: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def upsert(self, records: Iterable[Record]) -> int:
+        """
+        Add or update records in a single transaction. Returns the number of
+        records that were given.
+        """
+        records = list(records)
+        with self.connection:
+            self.connection.executemany(UPSERT, records)
+        return len(records)
+
+    def query(self, county: str = None, series: str = None,
+              field: str = None, since: str = None,
+              until: str = None) -> List[Dict[str, Any]]:
+        """
+        Get records, ordered by county, series, date, and field. Every
+        argument is optional and narrows down the results. ``since`` and
+        ``until`` are dates (``yyyy-mm-dd``) and are inclusive.
+        """
+        conditions = []
+        parameters = []
+        for column, operator, value in (('county', '=', county),
+                                        ('series', '=', series),
+                                        ('field', '=', field),
+                                        ('date', '>=', since),
+                                        ('date', '<=', until)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                parameters.append(value)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self.connection.execute(
+            f'SELECT county, series, date, field, value, update_time '
+            f'FROM observations {where} '
+            f'ORDER BY county, series, date, field', parameters)
+        return [dict(row) for row in rows]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        List every county, series, and field in the database, with how many
+        values and which dates it has.
+        """
+        rows = self.connection.execute(
+            'SELECT county, series, field, COUNT(*) AS count, '
+            'MIN(date) AS first_date, MAX(date) AS last_date '
+            'FROM observations GROUP BY county, series, field '
+            'ORDER BY county, series, field')
+        return [dict(row) for row in rows]
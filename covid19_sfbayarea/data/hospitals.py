@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
-import json
+import click
 import logging
+from pathlib import Path
 import requests
+import sys
+from .. import serialization, transport
+from . import columnar
+from .history import HistoryStore, hospital_records
 from datetime import datetime
 from dateutil import tz
 from dateutil.parser import parse
@@ -71,10 +76,10 @@ def get_timeseries(county: str = "all") -> Dict:
         while True:
             # pass params if we don't have timeseries data yet
             if not timeseries:
-                r = requests.get(url, params=params)
+                r = transport.get(url, params=params)
 
             else:
-                r = requests.get(url)
+                r = transport.get(url)
 
             r.raise_for_status()
             results = r.json().get("result")
@@ -181,6 +186,34 @@ def floats_to_ints(record: Dict) -> Dict:
     return record
 
 
+@click.command(help="Print hospital data from data.ca.gov as JSON.")
+@click.option("--county", default="all", show_default=True,
+              help="only get data for this county")
+@click.option("--tables", "tables_path", metavar="PATH",
+              help="instead of printing JSON, write the data as a typed "
+                   "table in PATH/hospitals, partitioned by date. Requires "
+                   "the pyarrow package")
+@click.option("--tables-format", type=click.Choice(tuple(columnar.FORMATS)),
+              default="arrow", show_default=True,
+              help="file format for --tables: Arrow IPC or Parquet")
+@click.option("--history", "history_path", metavar="PATH",
+              help="instead of printing JSON, add the data to this SQLite "
+                   "database (see query_history.py)")
+def main(county: str, tables_path: str, tables_format: str,
+         history_path: str) -> None:
+    data = get_timeseries(county)
+    if history_path:
+        with HistoryStore(history_path) as history:
+            history.upsert(hospital_records(data))
+    if tables_path:
+        columnar.export_tables(data, Path(tables_path, "hospitals"),
+                               tables_format, model="hospitals_data_model",
+                               name=county.lower())
+    if not tables_path and not history_path:
+        serialization.dump(data, sys.stdout.buffer)
+        sys.stdout.buffer.write(b"\n")
+
+
 if __name__ == "__main__":
     """When run as a script, prints all data to stdout"""
-    print(json.dumps(get_timeseries(), indent=4))
+    main()
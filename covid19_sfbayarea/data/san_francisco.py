@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 import json
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from collections import Counter
+from .demographics import DEMOGRAPHICS
 from .utils import get_data_model, SocrataApi
 
+API_URL = 'https://data.sfgov.org/'
+RESOURCE_IDS = {'cases_deaths_transmission': 'tvq9-ec9w', 'gender': 'nhy6-gqam', 'age': 'sunc-2t3k',
+                'race_eth': 'vqqm-nsqg', 'tests': 'nfpa-mg4g'}
+
 def get_county() -> Dict:
     """ Main method for populating county data.json """
 
@@ -11,10 +16,7 @@ def get_county() -> Dict:
     # Load data model template into a local dictionary called 'out'.
     out = get_data_model()
     # create a SocrataApi instance
-    RESOURCE_IDS = {'cases_deaths_transmission': 'tvq9-ec9w', 'gender': 'nhy6-gqam', 'age': 'sunc-2t3k',
-                     'race_eth': 'vqqm-nsqg', 'tests': 'nfpa-mg4g'}
-
-    session = SocrataApi('https://data.sfgov.org/')
+    session = SocrataApi(API_URL)
 
     # fetch metadata
     meta_from_source = get_notes(session, RESOURCE_IDS)
@@ -34,6 +36,15 @@ def get_county() -> Dict:
 
     return out
 
+def get_update_time() -> Tuple[str, ...]:
+    """
+    Get the update time of each resource we use. (The earliest of them is the
+    county's ``update_time``, but it doesn't change when other resources are
+    updated.) This only fetches metadata, so it's a cheap way to check whether
+    the county has new data.
+    """
+    return tuple(get_update_times(SocrataApi(API_URL), RESOURCE_IDS))
+
 def get_notes(session: SocrataApi, resource_ids: Dict[str, str]) -> str:
     """
     Get 'description' field of metadata for all resources. Collect into one string,
@@ -149,10 +160,6 @@ def get_tests_series(session : SocrataApi, resource_ids: Dict[str, str]) -> List
 def get_age_table(session : SocrataApi, resource_ids: Dict[str, str]) -> List[Dict]:
     """Get cases by age"""
     resource_id = resource_ids['age']
-    # Dict of target_label:source_label for lookups
-    AGE_KEYS = {"18_and_under": "under 18", "18_to_30": "18-30", "31_to_40": "31-40", "41_to_50": "41-50",
-                "51_to_60": "51-60", "61_to_70": "61-70", "71_to_80": "71-80", "81_and_older": "81+",}
-
     # find the latest date of data collection
     params = {'$select': 'max(specimen_collection_date) as date'}
     latest_date = session.resource(resource_id, params=params)[0]
@@ -163,20 +170,13 @@ def get_age_table(session : SocrataApi, resource_ids: Dict[str, str]) -> List[Di
 
     # flatten data into a dictionary of age_group:cases
     data = { item["age_group"] : int(item["cases"]) for item in data }
-    age_table = []
     # fill in values in age table
-    for target_key, source_key in AGE_KEYS.items():
-        age_table.append( { "group": target_key, "raw_count": data[source_key] })
-
-    return age_table
+    return DEMOGRAPHICS['san_francisco']['age_group'].table(data)
 
 def get_gender_table(session : SocrataApi, resource_ids: Dict[str, str]) -> Dict:
     """Get cases by gender"""
 
-    # Dict of source_label:target_label for re-keying.
-    # Note: non cis genders not currently reported
     resource_id = resource_ids['gender']
-    GENDER_KEYS = {"Female": "female", "Male": "male", "Unknown": "unknown", "Trans Female": "female", "Trans Male": "male"}
     # find the latest date of data collection
     params = {'$select': 'max(specimen_collection_date) as date'}
     latest_date = session.resource(resource_id, params=params)[0]
@@ -186,11 +186,8 @@ def get_gender_table(session : SocrataApi, resource_ids: Dict[str, str]) -> Dict
     data = session.resource(resource_id, params=params)
 
     # re-key
-    table : Dict[str, int]= dict()
-    for entry in data:
-        rekey = GENDER_KEYS[entry['gender']]
-        table[rekey] = table.get(rekey,0) + int(entry["cases"])
-    return table
+    return DEMOGRAPHICS['san_francisco']['gender'].rekey(
+        (entry['gender'], int(entry["cases"])) for entry in data)
 
 # Confirmed cases by race and ethnicity
 def get_race_eth_table(session: SocrataApi, resource_ids: Dict[str, str]) -> Dict:
@@ -198,9 +195,6 @@ def get_race_eth_table(session: SocrataApi, resource_ids: Dict[str, str]) -> Dic
     Fetch race x ethnicity data. Individuals are assigned to one race/eth category.
     """
     resource_id = resource_ids['race_eth']
-    # Dict of source_label:target_label for re-keying.
-    RACE_ETH_KEYS = {'Hispanic or Latino/a, all races': 'Latinx_or_Hispanic', 'Asian': 'Asian', 'Black or African American': 'African_Amer', 'White': 'White',
-                    'Native Hawaiian or Other Pacific Islander': 'Pacific_Islander', 'Native American': 'Native_Amer', 'Multi-racial': 'Multiple_Race', 'Other': 'Other', 'Unknown': 'Unknown'}
     # find the latest date of data collection
     params = {'$select': 'max(specimen_collection_date) as date'}
     latest_date = session.resource(resource_id, params=params)[0]
@@ -210,27 +204,18 @@ def get_race_eth_table(session: SocrataApi, resource_ids: Dict[str, str]) -> Dic
     data = session.resource(resource_id, params=params)
     # re-key and aggregate to flatten race x ethnicity
     # initalize all categories to 0 for aggregating
-    race_eth_data: Dict[str, int] = {v: 0 for v in RACE_ETH_KEYS.values()}
-
-    for item in data:  # iterate through all race x ethnicity objects
-        cases = int(item["cases"])
-        race_eth = item["race_ethnicity"]
-        re_key = RACE_ETH_KEYS[race_eth] # look up this item's re-key
-        race_eth_data[re_key] += cases
-
-    return race_eth_data
+    return DEMOGRAPHICS['san_francisco']['race_eth'].rekey(
+        ((item["race_ethnicity"], int(item["cases"])) for item in data),
+        initial=0)
 
 def get_transmission_table(session : SocrataApi, resource_ids: Dict[str, str]) -> Dict:
     """Get cases by transmission category"""
     resource_id = resource_ids['cases_deaths_transmission']
-    # Dict of source_label:target_label for re-keying
-    TRANSMISSION_KEYS = {"Community": "community",
-                        "From Contact": "from_contact", "Unknown": "unknown"}
     params = { '$select': 'transmission_category, sum(case_count)', '$group': 'transmission_category'}
     data = session.resource(resource_id, params=params)
     # re-key
-    transmission_data = { TRANSMISSION_KEYS[ entry["transmission_category"] ]: int(entry["sum_case_count"]) for entry in data}
-    return transmission_data
+    return DEMOGRAPHICS['san_francisco']['transmission_cat'].rekey(
+        (entry["transmission_category"], int(entry["sum_case_count"])) for entry in data)
 
 if __name__ == '__main__':
     """ When run as a script, logs data to console"""
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
-import requests
+from .. import transport
 import re
-from bs4 import BeautifulSoup  # type: ignore
 import json
 from typing import List, Dict
 from datetime import datetime, timezone
 import dateutil.tz
-from ..webdriver import get_firefox
+from .demographics import DEMOGRAPHICS
 from .utils import get_data_model
 from collections import defaultdict
 from ..errors import FormatError
@@ -40,8 +39,24 @@ def get_county() -> Dict:
         "Multiple race and other race individuals are reported in the same category, which Bay PD is reporting as Multiple_Race.",
         "Cases by gender are ambiguous datapoints in the source data, and have not been confirmed by dashboards and reports released by the County to the public."])
 
+    out["update_time"] = get_update_time()
+
+    # get cases, deaths, and demographics data
+    get_timeseries(out)
+    get_age_table(out)
+    get_gender_table(out)
+    get_race_eth(out)
+
+    return out
+
+
+def get_update_time() -> str:
+    """
+    Get the time the source data was last updated. This only fetches a small
+    metadata file, so it's a cheap way to check whether the county has new data.
+    """
     # fetch cases metadata, to get the timestamp
-    response = requests.get(metadata_url)
+    response = transport.get(metadata_url)
     response.raise_for_status()
     metadata = response.json()
     timestamp = metadata["editingInfo"]["lastEditDate"]
@@ -51,15 +66,7 @@ def get_county() -> Dict:
         raise FormatError("A timezone may now be specified in the metadata.")
     # convert timestamp to datetime object
     update = datetime.fromtimestamp(timestamp/1000, tz=timezone.utc)
-    out["update_time"] = update.isoformat()
-
-    # get cases, deaths, and demographics data
-    get_timeseries(out)
-    get_age_table(out)
-    get_gender_table(out)
-    get_race_eth(out)
-
-    return out
+    return update.isoformat()
 
 
 # Confirmed Cases and Deaths
@@ -89,7 +96,7 @@ def get_timeseries(out: Dict) -> None:
                     'resultType': 'none',
                     'outFields': 'date_reported,cumulative_number_of_cases_on_t,total_deaths,residents_tested,new_cases_confirmed_today',
                     'orderByFields': 'date_reported asc', 'f': 'json'}
-    response = requests.get(data_url, params=param_list)
+    response = transport.get(data_url, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     features = [obj["attributes"] for obj in parsed['features']]
@@ -143,6 +150,10 @@ def get_timeseries(out: Dict) -> None:
 
 def get_notes() -> str:
     """Scrape notes and disclaimers from dashboard."""
+    # BeautifulSoup and Selenium are slow to import and only needed here, so
+    # don't make everything else (like `get_update_time()`) wait for them.
+    from bs4 import BeautifulSoup  # type: ignore
+    from ..webdriver import get_firefox
     # As of 6/5/20, the only disclaimer is "Data update weekdays at 4:30pm"
     with get_firefox() as driver:
         notes = []
@@ -171,19 +182,17 @@ def get_race_eth (out: Dict)-> None :
     # Link to map item: https://www.arcgis.com/home/webmap/viewer.html?url=https://services2.arcgis.com/SCn6czzcqKAFwdGU/ArcGIS/rest/services/COVID_19_Survey_part_1_v2_new_public_view/FeatureServer/0&source=sd
     # The table view of the map item is a helpful reference.
 
-    RACE_KEYS = {"Latinx_or_Hispanic": "all_cases_hispanic", "Asian": "all_cases_asian", "African_Amer": "all_cases_black",
-                 "White": "all_cases_white", "Pacific_Islander": "all_cases_pacificIslander", "Native_Amer": "all_cases_ai_an", "Multiple_Race": "all_cases_multi_o",
-                 "Unknown": "unknown_all"}
-
     # format query to get entry for latest date
     # check for the 'all_cases_total', which is the first total cases column before the race/eth columns
     param_list = {'where': 'all_cases_total>0','outFields': '*', 'orderByFields':'date_reported DESC', 'resultRecordCount': '1', 'f': 'json'}
-    response = requests.get(data_url, params=param_list)
+    response = transport.get(data_url, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     latest_day = parsed['features'][0]['attributes']
 
-    race_eth_table = { target_key: latest_day[source_key] for target_key, source_key in RACE_KEYS.items() }
+    race_keys = DEMOGRAPHICS['solano']['race_eth']
+    race_keys.require(latest_day)
+    race_eth_table = { target_key: latest_day[source_key] for source_key, target_key in race_keys.items() }
     out["case_totals"]["race_eth"].update(race_eth_table)
 
 def get_age_table(out: Dict) -> None:
@@ -193,7 +202,7 @@ def get_age_table(out: Dict) -> None:
     """
     param_list = {'where': '0=0', 'outFields': 'Age_Group, All_cases_Number, Died_Number',
                   'orderByFields': 'Age_Group ASC', 'f': 'json'}
-    response = requests.get(age_group_url, params=param_list)
+    response = transport.get(age_group_url, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     # surface data from nested attributes dict
@@ -203,15 +212,14 @@ def get_age_table(out: Dict) -> None:
         raise FormatError(
             f"The source data structure has changed. Query did not return four age groups. Results: {entries}")
 
-    # Dict of source_label: target_label for re-keying.
-    AGE_KEYS = {"0-17 yrs": "0_to_17",
-                "18-49 yrs": "18_to_49", "50-64 yrs": "50_to_64", "65+ yrs": "65_and_older" }
+    age_keys = DEMOGRAPHICS['solano']['age_group']
+    age_keys.check(entry["Age_Group"] for entry in entries)
     age_table_cases = []
     age_table_deaths = []
 
     # parse output
     for entry in entries:
-        age_key = AGE_KEYS[entry["Age_Group"]]
+        age_key = age_keys[entry["Age_Group"]]
         age_group_cases = entry["All_cases_Number"] or 0 # explicitly set 0 for null values
         age_group_deaths = entry["Died_Number"] or 0
         age_table_cases.append(
@@ -239,7 +247,7 @@ def get_gender_table(out: Dict) -> None:
     # an Unknown gender engry for the day
     param_list = {'where': '0=0', 'outFields': '*',
                   'orderByFields': 'date_reported DESC', 'resultRecordCount': '3', 'f': 'json'}
-    response = requests.get(data2_url, params=param_list)
+    response = transport.get(data2_url, params=param_list)
     response.raise_for_status()
     parsed = response.json()
     entries = [ attr["attributes"] for attr in parsed['features'] ] # surface data from nested attributes dict
@@ -269,14 +277,12 @@ def get_gender_table(out: Dict) -> None:
     # include all entries with date equal to the complete day
     gender_cols = [ entry for entry in entries if entry["date_reported"] in complete_days ]
 
-    # Dicts of source_label: target_label for re-keying.
-    GENDER_KEYS = {"female": "female", "male": "male",
-                   "unknown": "unknown"}
+    gender_keys = DEMOGRAPHICS['solano']['gender']
     gender_table_cases = dict()
 
     # parse output
     for entry in gender_cols:
-        gender_key = GENDER_KEYS.get(entry["gender"], "unknown") # for entries where gender not reported, assume unknown
+        gender_key = gender_keys[entry["gender"]] # for entries where gender not reported, assume unknown
         gender_cases = entry["number_of_cases"] or 0 # explicitly set 0 for null values
         gender_table_cases[gender_key] = gender_cases
 
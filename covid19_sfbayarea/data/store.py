@@ -0,0 +1,213 @@
+"""
+A local store of each county's last successful output, so a run can still
+produce data for every county when one of the county scrapers fails.
+
+>>> store = CountyStore('data_store')
+>>> data = scrape_county('solano', store)
+>>> data.get('stale')  # True if the scrape failed and this is the stored data
+
+Counties whose scrapers have a ``get_update_time()`` function are only
+scraped when their upstream data has changed since the stored output. The
+function can return a single timestamp, or a tuple of timestamps for counties
+that draw on several datasets that are updated separately.
+"""
+
+import json
+import logging
+from pathlib import Path
+from threading import Thread
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Union
+from .. import instrumentation, serialization
+from ..artifacts import atomic_open
+from . import scrapers, validation
+
+
+# How long to wait before each background retry of a failed county.
+RETRY_DELAYS = (60, 300, 900)
+
+
+class CountyStore:
+    """
+    Stores the output of each county's scraper as a JSON file in a directory.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+
+    def county_path(self, county: str) -> Path:
+        return self.path / f'{county}.json'
+
+    def update_time_path(self, county: str) -> Path:
+        return self.path / f'{county}.update_time.json'
+
+    def load(self, county: str) -> Optional[Dict]:
+        """Get the last saved output for a county, or ``None``."""
+        try:
+            with self.county_path(county).open(encoding='utf-8') as county_file:
+                return json.load(county_file)
+        except FileNotFoundError:
+            return None
+
+    def load_update_time(self, county: str) -> Any:
+        """
+        Get the result of the county's ``get_update_time()`` from when its
+        output was saved, or ``None`` if it wasn't recorded. Tuples are loaded
+        as lists.
+        """
+        try:
+            with self.update_time_path(county).open(encoding='utf-8') as time_file:
+                return json.load(time_file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, county: str, data: Dict, update_time: Any = None) -> None:
+        """
+        Save a county's output, along with the result of its scraper's
+        ``get_update_time()`` from before it was scraped, if there is one.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Write atomically so a crash can never leave a half-written file
+        # behind.
+        with atomic_open(self.county_path(county)) as county_file:
+            serialization.dump(data, county_file)
+        if update_time is None:
+            # An old update time would no longer match this output.
+            try:
+                self.update_time_path(county).unlink()
+            except FileNotFoundError:
+                pass
+        else:
+            with atomic_open(self.update_time_path(county)) as time_file:
+                serialization.dump(update_time, time_file)
+
+
+def mark_stale(data: Dict) -> Dict:
+    """
+    Mark a county's output as stale: it is from an earlier run because the
+    latest scrape failed. The ``update_time`` is left as-is, so it still says
+    how old the data is.
+    """
+    return {**data, 'stale': True}
+
+
+def get_update_time(county: str) -> Any:
+    """
+    Cheaply check when a county's upstream data was updated, using its
+    scraper's ``get_update_time()`` function. Returns ``None`` if the scraper
+    doesn't have one or it fails.
+    """
+    get_update_time = getattr(scrapers[county], 'get_update_time', None)
+    if not get_update_time:
+        return None
+    try:
+        return get_update_time()
+    except Exception:
+        # The full scrape will either work or fall back to the stored data.
+        logging.exception(f'Checking whether {county} has been updated failed')
+        return None
+
+
+def get_unchanged(county: str, store: CountyStore,
+                  update_time: Any) -> Optional[Dict]:
+    """
+    Get the stored output for a county if the county's upstream data hasn't
+    been updated since it was scraped. ``update_time`` is the current result
+    of the county's ``get_update_time()`` (see `get_update_time()`). It's
+    compared to the result that was saved with the stored output or, if none
+    was saved, to the stored ``update_time``.
+    """
+    stored = store.load(county)
+    if update_time is None or not stored:
+        return None
+
+    recorded = store.load_update_time(county)
+    if recorded is None:
+        recorded = stored.get('update_time')
+    # Compare the JSON form, since tuples are saved as lists.
+    if json.loads(serialization.dumps(update_time)) != recorded:
+        return None
+    logging.info(f'{county} has not been updated since {update_time}; '
+                 'using stored data')
+    return stored
+
+
+def scrape_county(county: str, store: CountyStore = None,
+                  force: bool = False, validate: bool = False) -> Dict:
+    """
+    Run a county's scraper and save its output to ``store``. If the scraper
+    fails, return the stored output for the county, marked as stale (see
+    `mark_stale()`). If there is no stored output, the error is raised.
+
+    If the county's upstream data hasn't changed since the stored output was
+    scraped, the stored output is returned without running the full scraper
+    (see `get_unchanged()`). Set ``force`` to always run the scraper.
+
+    If ``validate`` is set, output that doesn't match the data model (see
+    `validation.check()`) is treated like a failed scrape, so it is never
+    saved to ``store``.
+    """
+    update_time = None
+    if store:
+        # Check even when forced, so the update time is saved with the output.
+        update_time = get_update_time(county)
+        if not force:
+            unchanged = get_unchanged(county, store, update_time)
+            if unchanged:
+                return unchanged
+
+    try:
+        data = scrapers[county].get_county()
+        if validate:
+            with instrumentation.span('validate'):
+                validation.check(data)
+    except Exception:
+        stored = store and store.load(county)
+        if not stored:
+            raise
+        logging.exception(f'Scraping {county} failed; using stored data from '
+                          f'{stored.get("update_time")}')
+        return mark_stale(stored)
+
+    if store:
+        store.save(county, data, update_time)
+    return data
+
+
+def retry_in_background(counties: Iterable[str], store: CountyStore,
+                        on_success: Callable[[str, Dict], None],
+                        delays: Sequence[float] = RETRY_DELAYS,
+                        validate: bool = False) -> Thread:
+    """
+    Retry scraping failed counties in a background thread, waiting each of
+    ``delays`` seconds before trying again. When a county succeeds, its output
+    is saved to ``store`` and ``on_success(county, data)`` is called. If
+    ``validate`` is set, output that doesn't match the data model counts as
+    a failure.
+
+    The thread is a daemon, so it doesn't keep the process running once
+    everything else is done. Call ``join()`` on it to wait for the retries.
+    """
+    def retry() -> None:
+        remaining = list(counties)
+        for delay in delays:
+            if not remaining:
+                break
+            time.sleep(delay)
+            for county in list(remaining):
+                try:
+                    data = scrapers[county].get_county()
+                    if validate:
+                        validation.check(data)
+                except Exception:
+                    logging.exception(f'Retrying {county} failed')
+                    continue
+                store.save(county, data)
+                remaining.remove(county)
+                on_success(county, data)
+        if remaining:
+            logging.error(f'Giving up on retrying {", ".join(remaining)}')
+
+    thread = Thread(target=retry, name='county-retries', daemon=True)
+    thread.start()
+    return thread
@@ -3,7 +3,8 @@ import json
 from typing import Dict, Any
 import requests
 from urllib.parse import urljoin
-from cachecontrol import CacheControl  # type: ignore
+from cachecontrol import CacheControl, CacheControlAdapter  # type: ignore
+from ..transport import TransportAdapter, get_session
 from .errors import BadRequest
 
 def get_data_model() -> Dict:
@@ -14,13 +15,22 @@ def get_data_model() -> Dict:
         out = json.load(template)
     return out
 
+class CachingTransportAdapter(CacheControlAdapter, TransportAdapter):  # type: ignore
+    """
+    A CacheControl adapter that can also record and replay responses (see
+    `covid19_sfbayarea.transport`).
+    """
+    pass
+
+
 class SocrataApi:
     """
     Class for starting a session for requests via Socrata APIs.
     Initialize with a base_url
     """
     def __init__(self, base_url: str):
-        self.session = CacheControl(requests.Session())
+        self.session = CacheControl(get_session(),
+                                    adapter_class=CachingTransportAdapter)
         self.base_url = base_url
         self.resource_url = urljoin(self.base_url, '/resource/')
         self.metadata_url = urljoin(self.base_url, '/api/views/metadata/v1/')
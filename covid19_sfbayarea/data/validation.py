@@ -0,0 +1,181 @@
+"""
+Check that scraper output matches our data models (the templates in the
+``data_models`` directory). Each model is compiled once into a tree of small
+check functions, so validating a county's output is just a walk over the data
+with no template lookups, which takes a few milliseconds at most:
+
+>>> errors = validate(alameda.get_county())
+>>> errors
+['case_totals.gender.nonbinary: not in the data model',
+ 'series.cases[12].cases: expected a count, not "<10"']
+
+The rules, based on how the templates are written:
+
+- Every top-level field in the template is required. Nested fields are
+  optional (counties don't all report the same things), but fields that are
+  not in the template are errors.
+- Counts (``-1`` in the template) must be numbers that are ``-1`` (for "not
+  available") or more.
+- Strings must be strings. ``yyyy-mm-dd`` in the template means a date, and
+  ``yyyy-mm-ddThh:mmz`` an ISO 8601 timestamp.
+- Every item in a list must match the template's first item. Empty lists in
+  the template use the item from a non-empty list with the same name
+  elsewhere in the template (e.g. every ``age_group``).
+"""
+
+from functools import lru_cache
+import json
+from pathlib import Path
+import re
+from typing import Any, Callable, Dict, List, Optional
+from ..errors import FormatError
+
+
+# A compiled check: takes a value and its path in the data, and appends any
+# errors to a list.
+Check = Callable[[Any, str, List[str]], None]
+
+MODELS_PATH = Path(__file__).parent.parent.parent / 'data_models'
+
+DATE_PLACEHOLDER = 'yyyy-mm-dd'
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}$')
+TIMESTAMP_PLACEHOLDER = 'yyyy-mm-ddThh:mmz'
+TIMESTAMP_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}')
+
+# Top-level fields that are allowed in output but aren't in the templates.
+EXTRA_FIELDS = {'stale': bool}
+
+
+class ValidationError(FormatError):
+    """
+    Raised when scraper output doesn't match the data model. ``errors`` lists
+    everything that's wrong with it.
+    """
+
+    def __init__(self, errors: List[str]) -> None:
+        self.errors = errors
+        super().__init__(f'{len(errors)} errors: ' + '; '.join(errors[:10])
+                         + ('; ...' if len(errors) > 10 else ''))
+
+
+def describe(value: Any) -> str:
+    text = json.dumps(value)
+    return text if len(text) <= 40 else f'{text[:37]}...'
+
+
+def check_count(value: Any, path: str, errors: List[str]) -> None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        errors.append(f'{path}: expected a count, not {describe(value)}')
+    elif value < -1:
+        errors.append(f'{path}: expected -1 or more, not {value}')
+
+
+def check_string(value: Any, path: str, errors: List[str]) -> None:
+    if not isinstance(value, str):
+        errors.append(f'{path}: expected a string, not {describe(value)}')
+
+
+def check_boolean(value: Any, path: str, errors: List[str]) -> None:
+    if not isinstance(value, bool):
+        errors.append(f'{path}: expected true or false, not {describe(value)}')
+
+
+def pattern_check(pattern: 're.Pattern[str]', description: str) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, str) or not pattern.match(value):
+            errors.append(f'{path}: expected {description}, not {describe(value)}')
+    return check
+
+
+def list_check(item_check: Optional[Check]) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, list):
+            errors.append(f'{path}: expected a list, not {describe(value)}')
+        elif item_check:
+            for index, item in enumerate(value):
+                item_check(item, f'{path}[{index}]', errors)
+    return check
+
+
+def object_check(fields: Dict[str, Check], required: bool = False) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, dict):
+            errors.append(f'{path}: expected an object, not {describe(value)}')
+            return
+        prefix = f'{path}.' if path else ''
+        for key, item in value.items():
+            field_check = fields.get(key)
+            if field_check:
+                field_check(item, prefix + key, errors)
+            else:
+                errors.append(f'{prefix}{key}: not in the data model')
+        if required:
+            for key in fields.keys() - value.keys() - EXTRA_FIELDS.keys():
+                errors.append(f'{prefix}{key}: missing')
+    return check
+
+
+def find_list_items(template: Any, items: Dict[str, Any]) -> Dict[str, Any]:
+    """Find the first item of every non-empty list in a template, by name."""
+    if isinstance(template, dict):
+        for key, value in template.items():
+            if isinstance(value, list) and value:
+                items.setdefault(key, value[0])
+            find_list_items(value, items)
+    elif isinstance(template, list):
+        for value in template:
+            find_list_items(value, items)
+    return items
+
+
+def compile_template(template: Any, list_items: Dict[str, Any],
+                     name: str = '') -> Check:
+    """Compile part of a data model template into a check."""
+    if isinstance(template, bool):
+        return check_boolean
+    if isinstance(template, (int, float)):
+        return check_count
+    if isinstance(template, str):
+        if template == DATE_PLACEHOLDER:
+            return pattern_check(DATE_PATTERN, 'a date like "2020-06-01"')
+        if template == TIMESTAMP_PLACEHOLDER:
+            return pattern_check(TIMESTAMP_PATTERN, 'an ISO 8601 timestamp')
+        return check_string
+    if isinstance(template, list):
+        item = template[0] if template else list_items.get(name)
+        if item is None:
+            return list_check(None)
+        return list_check(compile_template(item, list_items, name))
+    if isinstance(template, dict):
+        return object_check({key: compile_template(value, list_items, key)
+                             for key, value in template.items()})
+    raise ValueError(f'Unsupported value in data model: {template!r}')
+
+
+@lru_cache(maxsize=None)
+def get_validator(model: str = 'data_model') -> Check:
+    """
+    Get the compiled check for a data model, e.g. ``data_model`` or
+    ``hospitals_data_model``.
+    """
+    with (MODELS_PATH / f'{model}.json').open(encoding='utf-8') as model_file:
+        template = json.load(model_file)
+    list_items = find_list_items(template, {})
+    fields = {key: compile_template(value, list_items, key)
+              for key, value in template.items()}
+    fields.update({key: check_boolean for key in EXTRA_FIELDS})
+    return object_check(fields, required=True)
+
+
+def validate(data: Any, model: str = 'data_model') -> List[str]:
+    """Get a list of the ways ``data`` doesn't match a data model."""
+    errors: List[str] = []
+    get_validator(model)(data, '', errors)
+    return errors
+
+
+def check(data: Any, model: str = 'data_model') -> None:
+    """Raise a `ValidationError` if ``data`` doesn't match a data model."""
+    errors = validate(data, model)
+    if errors:
+        raise ValidationError(errors)
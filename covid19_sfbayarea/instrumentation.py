@@ -0,0 +1,255 @@
+"""
+Timing and size measurements for the work scrapers do. Each measurement is a
+`Span`: an HTTP request, a page load in Firefox, parsing a page of news, etc.
+
+Spans are only collected after calling `enable()`:
+
+    >>> instrumentation.enable()
+    >>> with instrumentation.labels(county='napa'):
+    >>>     NapaNews.get_news()
+    >>> print(instrumentation.summary_table(instrumentation.get_spans()))
+
+HTTP requests made with `covid19_sfbayarea.transport` and pages loaded with
+`covid19_sfbayarea.webdriver` are measured automatically. Use `span()` to
+measure other kinds of work.
+"""
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+import json
+from threading import Lock
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+@dataclass
+class Span:
+    """
+    A single, timed piece of work.
+
+    Attributes
+    ----------
+    name
+        The kind of work, e.g. ``http``, ``firefox``, or ``parse_page``.
+    start
+        When the work started, as a Unix timestamp.
+    duration
+        How long the work took in seconds.
+    url
+        The URL that was requested or parsed, if any.
+    bytes
+        The size of the data that was downloaded or parsed, if known.
+    status
+        The HTTP status code, for HTTP requests.
+    cache_hit
+        Whether an HTTP response came from a cache.
+    error
+        The name of the exception that stopped the work, if it failed.
+    labels
+        Extra labels, like the county being scraped (see `labels()`).
+    """
+    name: str
+    start: float
+    duration: float = 0
+    url: Optional[str] = None
+    bytes: Optional[int] = None
+    status: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    error: Optional[str] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def host(self) -> str:
+        return (urlparse(self.url).hostname or '') if self.url else ''
+
+
+_enabled = False
+_spans: List[Span] = []
+_labels: Dict[str, str] = {}
+_lock = Lock()
+
+
+def enable() -> None:
+    """Start collecting spans."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop collecting spans."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def get_spans() -> List[Span]:
+    with _lock:
+        return list(_spans)
+
+
+def clear() -> None:
+    with _lock:
+        _spans.clear()
+
+
+def add_span(span: Span) -> None:
+    if _enabled:
+        with _lock:
+            _spans.append(span)
+
+
+def record(name: str, duration: float, **attributes: Any) -> Span:
+    """
+    Record a span for some work that has already finished.
+    """
+    result = Span(name, time.time() - duration, duration,
+                  labels=dict(_labels), **attributes)
+    add_span(result)
+    return result
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Measure the work done in a ``with`` block. Attributes of the span (like
+    ``bytes``) can be set inside the block:
+
+    >>> with instrumentation.span('parse_page', url=url) as page_span:
+    >>>     page_span.bytes = len(html)
+    >>>     ...
+    """
+    result = Span(name, time.time(), labels=dict(_labels), **attributes)
+    start = time.perf_counter()
+    try:
+        yield result
+    except BaseException as error:
+        result.error = type(error).__name__
+        raise
+    finally:
+        result.duration = time.perf_counter() - start
+        add_span(result)
+
+
+@contextmanager
+def labels(**new_labels: str) -> Iterator[None]:
+    """
+    Add labels to all the spans recorded in a ``with`` block. These apply to
+    the whole process (including other threads), so they should be used to
+    label whole units of work, like each county scraped by a CLI command.
+    """
+    global _labels
+    previous = _labels
+    _labels = {**previous, **new_labels}
+    try:
+        yield
+    finally:
+        _labels = previous
+
+
+def to_json_lines(spans: Iterable[Span]) -> str:
+    return ''.join(json.dumps(asdict(span)) + '\n' for span in spans)
+
+
+def _group_key(span: Span) -> Tuple[Tuple[str, str], ...]:
+    return (('name', span.name), ('host', span.host),
+            *sorted(span.labels.items()))
+
+
+def _group(spans: Iterable[Span]) -> Dict[Tuple[Tuple[str, str], ...], List[Span]]:
+    groups: Dict[Tuple[Tuple[str, str], ...], List[Span]] = {}
+    for span in spans:
+        groups.setdefault(_group_key(span), []).append(span)
+    return groups
+
+
+def _prometheus_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    def escape(value: str) -> str:
+        return (value.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n'))
+    return ','.join(f'{name}="{escape(value)}"' for name, value in key)
+
+
+PROMETHEUS_METRICS = (
+    ('scraper_span_duration_seconds', 'summary',
+     'Time spent on each kind of work.'),
+    ('scraper_span_bytes_total', 'counter',
+     'Bytes downloaded or parsed by each kind of work.'),
+    ('scraper_span_cache_hits_total', 'counter',
+     'HTTP responses served from a cache.'),
+    ('scraper_span_errors_total', 'counter',
+     'Work that failed with an exception.'),
+)
+
+
+def to_prometheus(spans: Iterable[Span]) -> str:
+    """
+    Format spans as metrics in the Prometheus text exposition format.
+    """
+    groups = _group(spans)
+    lines = []
+    for metric, metric_type, description in PROMETHEUS_METRICS:
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for key, group in groups.items():
+            label_text = _prometheus_labels(key)
+            if metric_type == 'summary':
+                lines.append(f'{metric}_count{{{label_text}}} {len(group)}')
+                total = sum(span.duration for span in group)
+                lines.append(f'{metric}_sum{{{label_text}}} {total}')
+            elif metric == 'scraper_span_bytes_total':
+                total_bytes = sum(span.bytes or 0 for span in group)
+                lines.append(f'{metric}{{{label_text}}} {total_bytes}')
+            elif metric == 'scraper_span_cache_hits_total':
+                hits = sum(1 for span in group if span.cache_hit)
+                lines.append(f'{metric}{{{label_text}}} {hits}')
+            else:
+                errors = sum(1 for span in group if span.error)
+                lines.append(f'{metric}{{{label_text}}} {errors}')
+    return '\n'.join(lines) + '\n'
+
+
+def summary_table(spans: Iterable[Span]) -> str:
+    """
+    Summarize spans in a human-readable table, with a row for each kind of
+    work, host, and set of labels.
+    """
+    rows = [('labels', 'work', 'host', 'count', 'total s', 'mean s', 'max s',
+             'KiB', 'cached', 'errors')]
+    for key, group in sorted(_group(spans).items()):
+        key_values = dict(key)
+        name = key_values.pop('name')
+        host = key_values.pop('host')
+        durations = [span.duration for span in group]
+        rows.append((
+            ' '.join(f'{label}={value}' for label, value in key_values.items()),
+            name,
+            host,
+            str(len(group)),
+            f'{sum(durations):.3f}',
+            f'{sum(durations) / len(durations):.3f}',
+            f'{max(durations):.3f}',
+            f'{sum(span.bytes or 0 for span in group) / 1024:.1f}',
+            str(sum(1 for span in group if span.cache_hit)),
+            str(sum(1 for span in group if span.error)),
+        ))
+
+    widths = [max(len(row[column]) for row in rows)
+              for column in range(len(rows[0]))]
+    return '\n'.join(
+        '  '.join(value.ljust(width) if column < 3 else value.rjust(width)
+                  for column, (value, width) in enumerate(zip(row, widths)))
+        for row in rows) + '\n'
+
+
+def write_spans(path: str, spans: Iterable[Span]) -> None:
+    """
+    Write spans to a file. Files ending in ``.prom`` are written in the
+    Prometheus text format; anything else is written as JSON lines.
+    """
+    output = to_prometheus(spans) if path.endswith('.prom') else to_json_lines(spans)
+    with open(path, 'w', encoding='utf-8') as output_file:
+        output_file.write(output)
@@ -1,24 +1,33 @@
-from typing import Dict, Type
-from .alameda import AlamedaNews
-from .base import NewsScraper
-from .contra_costa import ContraCostaNews
-from .marin import MarinNews
-from .napa import NapaNews
-from .san_francisco import SanFranciscoNews
-from .san_mateo import SanMateoNews
-from .santa_clara import SantaClaraNews
-from .solano import SolanoNews
-from .sonoma import SonomaNews
+from importlib import import_module
+from typing import Any, MutableMapping, Type, TYPE_CHECKING
+from ..registry import LazyRegistry
 
+if TYPE_CHECKING:
+    from .base import NewsScraper
 
-scrapers: Dict[str, Type[NewsScraper]] = {
-    'alameda': AlamedaNews,
-    'contra_costa': ContraCostaNews,
-    'marin': MarinNews,
-    'napa': NapaNews,
-    'san_francisco': SanFranciscoNews,
-    'san_mateo': SanMateoNews,
-    'santa_clara': SantaClaraNews,
-    'solano': SolanoNews,
-    'sonoma': SonomaNews,
+
+SCRAPER_PATHS = {
+    'alameda': '.alameda:AlamedaNews',
+    'contra_costa': '.contra_costa:ContraCostaNews',
+    'marin': '.marin:MarinNews',
+    'napa': '.napa:NapaNews',
+    'san_francisco': '.san_francisco:SanFranciscoNews',
+    'san_mateo': '.san_mateo:SanMateoNews',
+    'santa_clara': '.santa_clara:SantaClaraNews',
+    'solano': '.solano:SolanoNews',
+    'sonoma': '.sonoma:SonomaNews',
 }
+
+# Scrapers are imported when they are first looked up (see `LazyRegistry`).
+scrapers: MutableMapping[str, Type['NewsScraper']] = LazyRegistry(__name__, SCRAPER_PATHS)
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from covid19_sfbayarea.news import AlamedaNews`, etc. working
+    # without importing every scraper up front.
+    paths = {path.partition(':')[2]: path for path in SCRAPER_PATHS.values()}
+    paths['NewsScraper'] = '.base:NewsScraper'
+    if name not in paths:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module_name, _, attribute = paths[name].partition(':')
+    return getattr(import_module(module_name, __name__), attribute)
@@ -1,5 +1,5 @@
 from bs4 import BeautifulSoup, element  # type: ignore
-from typing import List
+from typing import Iterable
 from urllib.parse import urljoin
 from ..webdriver import get_firefox
 from .base import NewsScraper
@@ -45,20 +45,20 @@ class AlamedaNews(NewsScraper):
             # the actual content. Soooooo, we have to look for something that
             # looks like page content before continuing on (or fail if it never
             # shows up). This is also why we are using Selenium. :(
-            driver.get(self.URL)
+            driver.get(url)
             driver.implicitly_wait(10)
             content = driver.find_element_by_class_name('content')
             if not content:
-                raise ValueError(f'Page did not load properly: {self.URL}')
+                raise ValueError(f'Page did not load properly: {url}')
 
             return driver.page_source
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         article_rows = soup.select_one('.board').find_all('tr')
-        return [self.parse_news_item(row, base_url)
-                for row in article_rows]
+        return (self.parse_news_item(row, base_url)
+                for row in article_rows)
 
     def parse_news_item(self, row: element.Tag, base_url: str) -> NewsItem:
         date_cell, info_cell = row.find_all('td')
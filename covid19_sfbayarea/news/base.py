@@ -1,8 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import requests
-from typing import Dict, List
+import logging
+from typing import Dict, Iterable, Iterator, Optional, Set
+from .. import instrumentation, transport
 from .feed import NewsFeed, NewsItem
-from .utils import decode_html_body
+from .utils import decode_html_body, KeyTermMatcher
 
 
 class NewsScraper:
@@ -17,11 +19,26 @@ class NewsScraper:
     >>> news_feed = SomeCounty.get_news()
 
     Classes inheriting from this should set ``URL`` to the URL from which
-    scraping should start, then implement `parse_page()`, which returns a list
-    of news items given some HTML.
+    scraping should start, then implement `parse_page()`, which returns an
+    iterable of news items given some HTML. It can be a generator that parses
+    items lazily; items that are out of the scraper's time range are dropped
+    without ever being held in memory all together.
+
+    Scrapers for pages that cover more than COVID-19 news should set
+    ``KEY_TERMS`` to a `KeyTermMatcher` that identifies relevant items.
+
+    If a source is split across multiple pages, implement `page_url()` and set
+    ``MAX_PAGES`` to the most pages that should ever be loaded. Pages after the
+    first are loaded concurrently, ``PAGE_CONCURRENCY`` at a time, until a
+    page has items older than ``from_date`` (sources are expected to list
+    items newest first), a page has no items we haven't already seen, or a
+    page fails to load.
     """
     FEED_INFO: Dict = {}
     URL = ''
+    KEY_TERMS: Optional[KeyTermMatcher] = None
+    MAX_PAGES = 1
+    PAGE_CONCURRENCY = 4
 
     def __init__(self, from_date: datetime = None, to_date: datetime = None) -> None:
         self.from_date = from_date
@@ -47,21 +64,93 @@ class NewsScraper:
           'date': '2020-04-23T04:11:56Z'}]
         """
         feed = self.create_feed()
-        html = self.load_html(self.URL)
-        news = self.parse_page(html, self.URL)
-        feed.append(*(item
-                      for item in news
-                      if self._in_time_range(item)))
+        for news in self.scrape_pages():
+            feed.extend(item for item in news
+                        if self._in_time_range(item) and self.is_relevant(item))
         return feed
 
+    def scrape_pages(self) -> Iterator['PageItems']:
+        """
+        Load each page of news, starting with ``URL``, and yield an iterator
+        that lazily parses the news items on it that weren't on an earlier
+        page (by ``id``). Each page is finished before the next one is parsed,
+        so only one page's items need to be held in memory. This stops once it
+        reaches:
+
+        - A page with no new items. That includes an empty page, or the same
+          page as before because the source ignored the page number.
+        - A page with items older than ``from_date``.
+        - A page after the first that fails to load, which usually means we
+          went past the last page. Errors loading the first page are raised.
+        - ``MAX_PAGES`` pages.
+        """
+        seen: Set[str] = set()
+        news = PageItems(self._parse(self._load(self.URL), self.URL), seen)
+        yield news
+        news.finish()
+        if self._is_last_page(news) or self.MAX_PAGES < 2:
+            return
+
+        with ThreadPoolExecutor(self.PAGE_CONCURRENCY) as executor:
+            next_page = 2
+            while next_page <= self.MAX_PAGES:
+                last_page = min(next_page + self.PAGE_CONCURRENCY, self.MAX_PAGES + 1)
+                urls = [url for url in map(self.page_url, range(next_page, last_page))
+                        if url]
+                if not urls:
+                    return
+                next_page = last_page
+
+                loads = [(url, executor.submit(self._load, url)) for url in urls]
+                for url, load in loads:
+                    try:
+                        html = load.result()
+                    except Exception as error:
+                        logging.warning(f'Stopping at {url}, which failed to '
+                                        f'load: {error}')
+                        return
+                    news = PageItems(self._parse(html, url), seen)
+                    yield news
+                    news.finish()
+                    if news.new_count == 0 or self._is_last_page(news):
+                        return
+
+    def page_url(self, page: int) -> Optional[str]:
+        """
+        Get the URL for a given page of news, where page 1 is ``URL``. Returns
+        ``None`` if there is no such page. Scrapers for sources that are split
+        across multiple pages should override this.
+        """
+        return self.URL if page == 1 else None
+
     def load_html(self, url: str) -> str:
-        response = requests.get(self.URL)
+        response = transport.get(url)
         response.raise_for_status()
         return decode_html_body(response)
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         raise NotImplementedError()
 
+    def _load(self, url: str) -> str:
+        with instrumentation.span('load_html', url=url) as load:
+            html = self.load_html(url)
+            load.bytes = len(html)
+        return html
+
+    def _parse(self, html: str, url: str) -> Iterator[NewsItem]:
+        # Items are parsed as they are consumed, so the span also includes
+        # the time spent filtering them.
+        with instrumentation.span('parse_page', url=url, bytes=len(html)):
+            yield from self.parse_page(html, url)
+
+    def is_relevant(self, item: NewsItem) -> bool:
+        return self.KEY_TERMS is None or self.KEY_TERMS.matches(item)
+
+    def _is_last_page(self, news: 'PageItems') -> bool:
+        if news.oldest is None:
+            return True
+        return bool(self.from_date and news.oldest < self.from_date)
+
     def _in_time_range(self, candidate: NewsItem) -> bool:
         time = candidate.date_published
         return time <= self.to_date and (not self.from_date or
@@ -71,3 +160,39 @@ class NewsScraper:
     def get_news(cls, from_date: datetime = None, to_date: datetime = None) -> NewsFeed:
         instance = cls(from_date, to_date)
         return instance.scrape()
+
+
+class PageItems:
+    """
+    Iterates over the news items on a page that aren't in ``seen`` (by
+    ``id``), adding them to it as they go by. Along the way, it counts the new
+    items and notes the oldest item on the page, so that `NewsScraper` can tell
+    whether to load another page without holding on to all the items.
+    """
+
+    def __init__(self, news: Iterable[NewsItem], seen: Set[str]) -> None:
+        self._news = iter(news)
+        self.seen = seen
+        self.new_count = 0
+        self.oldest: Optional[datetime] = None
+
+    def __iter__(self) -> 'PageItems':
+        return self
+
+    def __next__(self) -> NewsItem:
+        while True:
+            item = next(self._news)
+            if self.oldest is None or item.date_published < self.oldest:
+                self.oldest = item.date_published
+            if item.id not in self.seen:
+                self.seen.add(item.id)
+                self.new_count += 1
+                return item
+
+    def finish(self) -> None:
+        """
+        Go through any items that weren't iterated over, so that ``seen``,
+        ``new_count``, and ``oldest`` cover the whole page.
+        """
+        for _ in self:
+            pass
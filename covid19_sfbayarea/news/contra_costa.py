@@ -1,6 +1,6 @@
 from bs4 import BeautifulSoup, element  # type: ignore
 import re
-from typing import List, Optional
+from typing import Iterator, Optional
 from urllib.parse import urljoin
 from .base import NewsScraper
 from .feed import NewsItem
@@ -77,10 +77,9 @@ class ContraCostaNews(NewsScraper):
         return (HEADING_PATTERN.match(element.name) and
                 MONTH_HEADING_PATTERN.match(element.get_text())) is not None
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterator[NewsItem]:
         soup = BeautifulSoup(html, 'lxml')
         base_url = get_base_url(soup, url)
-        news = []
         month_headings = soup.find_all(self.is_news_heading)
         index = 0
         for heading in month_headings:
@@ -91,9 +90,7 @@ class ContraCostaNews(NewsScraper):
                                           article,
                                           base_url)
                 if item:
-                    news.append(item)
-
-        return news
+                    yield item
 
     def parse_article(self, index: int, article: element.Tag,
                       base_url: str) -> Optional[NewsItem]:
@@ -2,14 +2,18 @@
 Tools for modeling news feeds and serializing to multiple formats.
 """
 
-from dataclasses import dataclass, field, fields
+from abc import ABC, abstractmethod
+from contextlib import ExitStack
+from dataclasses import dataclass, fields
 from datetime import datetime
-import json
-import locale
+from email.utils import format_datetime
+from io import BytesIO
 from lxml.builder import E  # type: ignore
 import lxml.etree as ElementTree  # type: ignore
 from operator import attrgetter
-from typing import Dict, List, Optional, Any
+from typing import (Any, BinaryIO, Dict, Iterable, List, Mapping, Optional,
+                    Sequence, Type)
+from .. import serialization
 
 
 def format_datetime_8601(date_obj: datetime) -> str:
@@ -26,45 +30,73 @@ def format_datetime_8601(date_obj: datetime) -> str:
 def format_datetime_2822(date_obj: datetime) -> str:
     """
     Get an RFC 2822-formatted string for a datetime.
+
+    This uses the email module's formatter instead of ``strftime()`` because
+    day and month names must always be in English, and switching the locale
+    to guarantee that is slow and not thread-safe.
     """
-    old = locale.setlocale(locale.LC_ALL)
-    locale.setlocale(locale.LC_ALL, 'C')
-    date = date_obj.strftime('%a, %d %b %Y %H:%M:%S %z')
-    locale.setlocale(locale.LC_ALL, old)
-    return date
+    return format_datetime(date_obj)
 
 
-@dataclass
+@dataclass(init=False)
 class NewsItem:
+    # Items are held in memory for a whole scrape, so they use slots instead of
+    # a per-instance `__dict__`. Slots can't coexist with class-level default
+    # values, so defaults live in `__init__` instead of on the fields below.
+    # (Python 3.10 added ``@dataclass(slots=True)`` to do this for us, but we
+    # need to support older versions.)
+    __slots__ = ('id', 'url', 'title', 'date_published', 'summary',
+                 'date_modified', 'author', 'tags')
+
     id: str
     # Technically url, title, and date_published are optional, but in practical
     # terms, we require them to always be set.
     url: str
     title: str
-    date_published: datetime = field(default_factory=datetime.utcnow)
-    summary: Optional[str] = None
-    date_modified: Optional[datetime] = None
-    author: Optional[Dict[str, str]] = None
-    tags: List[str] = field(default_factory=list)
+    date_published: datetime
+    summary: Optional[str]
+    date_modified: Optional[datetime]
+    author: Optional[Dict[str, str]]
+    tags: Sequence[str]
+
+    def __init__(self, id: str, url: str, title: str,
+                 date_published: datetime = None, summary: str = None,
+                 date_modified: datetime = None,
+                 author: Dict[str, str] = None,
+                 tags: Sequence[str] = ()) -> None:
+        self.id = id
+        self.url = url
+        self.title = title
+        self.date_published = date_published or datetime.utcnow()
+        self.summary = summary
+        self.date_modified = date_modified
+        self.author = author
+        # Most items have no tags, so use an immutable default instead of
+        # creating an empty list for every item.
+        self.tags = tags
 
-    def format_json_simple(self) -> Dict:
+    def format_json_simple(self, formatted: 'FormattedItem' = None) -> Dict:
+        formatted = formatted or FormattedItem(self)
         return {
             'url': self.url,
             'text': self.title,
-            'date': format_datetime_8601(self.date_published)
+            'date': formatted.date_published
         }
 
-    def format_json_feed(self) -> Dict:
+    def format_json_feed(self, formatted: 'FormattedItem' = None) -> Dict:
         if not self.id:
             raise ValueError('You must specify an `id` for this news item')
 
+        formatted = formatted or FormattedItem(self)
         result = {}
-        for item_field in fields(self):
-            value = getattr(self, item_field.name)
+        for name in NEWS_ITEM_FIELDS:
+            value = getattr(self, name)
             if value:
-                if isinstance(value, datetime):
-                    value = format_datetime_8601(value)
-                result[item_field.name] = value
+                if name in NEWS_ITEM_DATE_FIELDS:
+                    value = getattr(formatted, name)
+                elif name == 'tags':
+                    value = list(value)
+                result[name] = value
 
         return result
 
@@ -79,19 +111,64 @@ class NewsItem:
         )
 
 
-@dataclass
+# Serialization walks these instead of calling `dataclasses.fields()` for
+# every item.
+NEWS_ITEM_FIELDS = tuple(item_field.name for item_field in fields(NewsItem))
+NEWS_ITEM_DATE_FIELDS = frozenset(('date_published', 'date_modified'))
+
+
+class FormattedItem:
+    """
+    A news item along with formatted versions of the values that multiple
+    output formats share. When writing a feed in several formats at once, each
+    item's values only need to be formatted once.
+    """
+    __slots__ = ('item', 'date_published', 'date_modified')
+
+    def __init__(self, item: NewsItem) -> None:
+        self.item = item
+        self.date_published = format_datetime_8601(item.date_published)
+        self.date_modified = (item.date_modified and
+                              format_datetime_8601(item.date_modified))
+
+
+@dataclass(init=False)
 class NewsFeed:
+    # See `NewsItem` for why defaults are set in `__init__`.
+    __slots__ = ('title', 'home_page_url', 'feed_url', 'description', 'icon',
+                 'author', 'expired', 'items')
+
     title: str
-    home_page_url: Optional[str] = None
-    feed_url: Optional[str] = None
-    description: Optional[str] = None
-    icon: Optional[str] = None
+    home_page_url: Optional[str]
+    feed_url: Optional[str]
+    description: Optional[str]
+    icon: Optional[str]
     # dict with keys: 'name', 'url', 'avatar' (all optional)
-    author: Optional[Dict[str, str]] = None
-    expired: bool = False
-    items: List[NewsItem] = field(default_factory=list, init=False)
+    author: Optional[Dict[str, str]]
+    expired: bool
+    items: List[NewsItem]
+
+    def __init__(self, title: str, home_page_url: str = None,
+                 feed_url: str = None, description: str = None,
+                 icon: str = None, author: Dict[str, str] = None,
+                 expired: bool = False) -> None:
+        self.title = title
+        self.home_page_url = home_page_url
+        self.feed_url = feed_url
+        self.description = description
+        self.icon = icon
+        self.author = author
+        self.expired = expired
+        self.items = []
 
     def append(self, *items: NewsItem) -> None:
+        self.extend(items)
+
+    def extend(self, items: Iterable[NewsItem]) -> None:
+        """
+        Add news items from any iterable, including a generator that parses
+        them lazily.
+        """
         self.items.extend(items)
         self.sort_items()
 
@@ -103,10 +180,44 @@ class NewsFeed:
         self.items.sort(reverse=True, key=attrgetter('id'))
         self.items.sort(reverse=True, key=attrgetter('date_published'))
 
+    def write(self, streams: Mapping[str, BinaryIO], pretty: bool = True) -> None:
+        """
+        Write this feed to one or more binary streams, each in a different
+        format, in a single pass over the feed's items. Output is written
+        incrementally, so the complete serialized feed is never held in memory.
+
+        Parameters
+        ----------
+        streams
+            A dict where keys are format names (any key in ``WRITERS``) and
+            values are writable binary streams (e.g. files opened with `wb`).
+        pretty
+            Whether to "pretty print" the output. (Default: True)
+
+        Examples
+        --------
+        >>> with open('feed.json', 'wb') as json_file, \\
+        >>>      open('feed.rss', 'wb') as rss_file:
+        >>>     feed.write({'json_feed': json_file, 'rss': rss_file})
+        """
+        writers = [WRITERS[name](self, stream, pretty)
+                   for name, stream in streams.items()]
+        for writer in writers:
+            writer.start()
+        for item in self.items:
+            formatted = FormattedItem(item)
+            for writer in writers:
+                writer.write_item(formatted)
+        for writer in writers:
+            writer.end()
+
+    def _format(self, format_name: str, pretty: bool) -> bytes:
+        buffer = BytesIO()
+        self.write({format_name: buffer}, pretty=pretty)
+        return buffer.getvalue()
+
     def format_json_simple(self, pretty: bool = True) -> bytes:
-        indent = 2 if pretty else None
-        data = json.dumps(self.format_json_simple_dict(), indent=indent)
-        return data.encode('utf-8')
+        return self._format('json_simple', pretty)
 
     def format_json_simple_dict(self) -> Dict:
         """
@@ -122,9 +233,7 @@ class NewsFeed:
         }
 
     def format_json_feed(self, pretty: bool = True) -> bytes:
-        indent = 2 if pretty else None
-        data = json.dumps(self.format_json_feed_dict(), indent=indent)
-        return data.encode('utf-8')
+        return self._format('json_feed', pretty)
 
     def format_json_feed_dict(self) -> Dict:
         """
@@ -135,27 +244,27 @@ class NewsFeed:
         -------
         dict
         """
+        feed = self._json_feed_header()
+        feed['items'] = [item.format_json_feed() for item in self.items]
+        return feed
+
+    def _json_feed_header(self) -> Dict[str, Any]:
+        """
+        Get all the top-level JSON Feed fields except ``items``.
+        """
         if not self.title:
             raise ValueError('You must specify a `title` for this feed')
 
         feed: Dict[str, Any] = {
             'version': 'https://jsonfeed.org/version/1'
         }
-        for item_field in fields(self):
-            if item_field.name == 'items':
-                value = [item.format_json_feed() for item in self.items]
-            else:
-                value = getattr(self, item_field.name)
+        for name in NEWS_FEED_HEADER_FIELDS:
+            value = getattr(self, name)
             if value:
-                feed[item_field.name] = value
+                feed[name] = value
 
         return feed
 
-    # TODO: revisit whether this should really return a string -- when the XML
-    # is serialized to bytes in a file, it should ideally have an XML encoding
-    # declaration at the top, but `ElementTree.tostring` very reasonably won't
-    # output that if you're asking for a string (`encoding='unicode'`) back
-    # instead of bytes (e.g. with `encoding='utf-8'`).
     def format_rss(self, pretty: bool = True) -> bytes:
         """
         Output this news feed in RSS 2.0 format.
@@ -170,27 +279,158 @@ class NewsFeed:
 
         Returns
         -------
-        str
-            An XML string. Note this is a *string*, not bytes, so you may want
-            to add an XML encoding header (e.g.
-            `<?xml version="1.0" encoding="UTF-8"?>`) when writing to disk.
+        bytes
+            UTF-8 encoded XML, including an XML declaration.
         """
-        if not self.title:
+        return self._format('rss', pretty)
+
+
+NEWS_FEED_HEADER_FIELDS = tuple(feed_field.name for feed_field in fields(NewsFeed)
+                                if feed_field.name != 'items')
+
+
+class FeedWriter(ABC):
+    """
+    Writes a news feed to a binary stream in a particular format. Writers are
+    given one item at a time (see `NewsFeed.write()`) so that several formats
+    can be written in a single pass over a feed.
+
+    Subclasses should set ``extension`` to the file extension for their format
+    and implement `start()`, `write_item()`, and `end()`. A writer that is
+    missing any of them can't be created.
+    """
+    extension = ''
+
+    def __init__(self, feed: NewsFeed, stream: BinaryIO, pretty: bool = True) -> None:
+        self.feed = feed
+        self.stream = stream
+        self.pretty = pretty
+
+    @abstractmethod
+    def start(self) -> None:
+        ...
+
+    @abstractmethod
+    def write_item(self, item: FormattedItem) -> None:
+        ...
+
+    @abstractmethod
+    def end(self) -> None:
+        ...
+
+
+class JsonWriter(FeedWriter):
+    """
+    Base class for JSON formats, which are an object with some header fields
+    followed by a list of items. Output is identical to encoding the whole
+    object with `serialization.dumps()`. Subclasses should set ``list_key``
+    and implement `header()` and `format_item()`.
+    """
+    list_key = ''
+
+    @abstractmethod
+    def header(self) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def format_item(self, item: FormattedItem) -> Dict:
+        ...
+
+    def start(self) -> None:
+        self.count = 0
+        fields = serialization.dumps(self.header(), self.pretty)[1:-1].rstrip()
+        key = serialization.dumps(self.list_key)
+        if self.pretty:
+            opening = b'{%s,\n  %s: [' % (fields, key) if fields else b'{\n  %s: [' % key
+        else:
+            opening = b'{%s,%s:[' % (fields, key) if fields else b'{%s:[' % key
+        self.stream.write(opening)
+
+    def write_item(self, item: FormattedItem) -> None:
+        data = serialization.dumps(self.format_item(item), self.pretty)
+        if self.pretty:
+            separator = b',\n    ' if self.count else b'\n    '
+            data = data.replace(b'\n', b'\n    ')
+        else:
+            separator = b',' if self.count else b''
+        self.stream.write(separator + data)
+        self.count += 1
+
+    def end(self) -> None:
+        if self.pretty:
+            self.stream.write(b'\n  ]\n}' if self.count else b']\n}')
+        else:
+            self.stream.write(b']}')
+
+
+class JsonSimpleWriter(JsonWriter):
+    extension = '.simple.json'
+    list_key = 'newsItems'
+
+    def header(self) -> Dict[str, Any]:
+        return {}
+
+    def format_item(self, item: FormattedItem) -> Dict:
+        return item.item.format_json_simple(item)
+
+
+class JsonFeedWriter(JsonWriter):
+    extension = '.json'
+    list_key = 'items'
+
+    def header(self) -> Dict[str, Any]:
+        return self.feed._json_feed_header()
+
+    def format_item(self, item: FormattedItem) -> Dict:
+        return item.item.format_json_feed(item)
+
+
+class RssWriter(FeedWriter):
+    extension = '.rss'
+
+    def start(self) -> None:
+        feed = self.feed
+        if not feed.title:
             raise ValueError('You must specify a `title` for this feed')
-        if not self.home_page_url:
+        if not feed.home_page_url:
             raise ValueError('You must specify a `home_page_url` for this feed')
 
-        rss = E.rss(
-            E.channel(
-                E('title', self.title),
-                E('link', self.home_page_url),
-                # Description is required in RSS 2.0, but we don't always
-                # have anything useful to put there.
-                E('description', self.description or ''),
-                *(item.format_rss() for item in self.items)
-            ),
-            {'version': '2.0'}
-        )
+        self._context = ExitStack()
+        self.xml = self._context.enter_context(
+            ElementTree.xmlfile(self.stream, encoding='utf-8'))
+        self.xml.write_declaration()
+        self._context.enter_context(self.xml.element('rss', version='2.0'))
+        self._context.callback(self._indent, 0)
+        self._indent(1)
+        self._context.enter_context(self.xml.element('channel'))
+        self._context.callback(self._indent, 1)
+        # Description is required in RSS 2.0, but we don't always have
+        # anything useful to put there.
+        for element in (E('title', feed.title),
+                        E('link', feed.home_page_url),
+                        E('description', feed.description or '')):
+            self._indent(2)
+            self.xml.write(element)
+
+    def write_item(self, item: FormattedItem) -> None:
+        element = item.item.format_rss()
+        self._indent(2)
+        if self.pretty:
+            ElementTree.indent(element, level=2)
+        self.xml.write(element)
+
+    def end(self) -> None:
+        self._context.close()
+        if self.pretty:
+            self.stream.write(b'\n')
+
+    def _indent(self, level: int) -> None:
+        if self.pretty:
+            self.xml.write('\n' + '  ' * level)
+
 
-        return ElementTree.tostring(rss, encoding='utf-8', pretty_print=pretty,
-                                    xml_declaration=True)
+WRITERS: Dict[str, Type[FeedWriter]] = {
+    'json_feed': JsonFeedWriter,
+    'json_simple': JsonSimpleWriter,
+    'rss': RssWriter,
+}
@@ -1,5 +1,5 @@
 from bs4 import BeautifulSoup, element  # type: ignore
-from typing import List
+from typing import Iterable
 from urllib.parse import urljoin
 from .base import NewsScraper
 from .errors import FormatError
@@ -62,7 +62,7 @@ class MarinNews(NewsScraper):
 
     URL = 'https://www.marincounty.org/main/county-press-releases?sort=dept'
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         department = 'Health & Human Services'
@@ -78,8 +78,8 @@ class MarinNews(NewsScraper):
         if len(rows) == 0:
             raise FormatError('Could not find any news items on page')
 
-        return [self.parse_news_item(article, base_url)
-                for article in rows]
+        return (self.parse_news_item(article, base_url)
+                for article in rows)
 
     def parse_news_item(self, item_element: element.Tag, base_url: str) -> NewsItem:
         title_link = item_element.select_one('.pr-list-title a')
@@ -1,11 +1,10 @@
 from bs4 import BeautifulSoup, element  # type: ignore
-import dateutil.parser
-from typing import List
+from typing import Iterable, Optional
 from urllib.parse import urljoin
 from .base import NewsScraper
 from .errors import FormatError
 from .feed import NewsItem
-from .utils import get_base_url, HEADING_PATTERN
+from .utils import get_base_url, parse_datetime, HEADING_PATTERN
 
 
 class SanFranciscoNews(NewsScraper):
@@ -35,13 +34,20 @@ class SanFranciscoNews(NewsScraper):
     )
 
     URL = 'https://sf.gov/news/topics/794'
+    # `page_url()` hasn't been checked against a recording of the live site,
+    # so only load the first page until one shows page 2 is different.
+    MAX_PAGES = 1
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def page_url(self, page: int) -> Optional[str]:
+        # sf.gov is a Drupal site, where page numbers are zero-based.
+        return f'{self.URL}?page={page - 1}' if page > 1 else self.URL
+
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         articles = soup.main.find_all('article')
-        return [self.parse_news_item(article, base_url)
-                for article in articles]
+        return (self.parse_news_item(article, base_url)
+                for article in articles)
 
     def parse_news_item(self, item: element.Tag, base_url: str) -> NewsItem:
         title_link = item.find(HEADING_PATTERN).find('a')
@@ -57,6 +63,6 @@ class SanFranciscoNews(NewsScraper):
             raise FormatError('No title content found')
 
         date_string = item.find('time')['datetime']
-        date = dateutil.parser.parse(date_string)
+        date = parse_datetime(date_string)
 
         return NewsItem(id=url, url=url, title=title, date_published=date)
@@ -1,10 +1,7 @@
-from bs4 import element  # type: ignore
 from lxml import etree  # type: ignore
 import re
-from typing import List
-from .base import NewsScraper
-from .feed import NewsItem, NewsFeed
-from .utils import parse_datetime
+from .feed import NewsItem
+from .rss import RssNewsScraper
 
 
 SUMMARY_PREFIX_PATTERN = re.compile(r'''
@@ -25,11 +22,7 @@ DATE_PREFIX_PATTERN = re.compile(r'''
 ''', re.VERBOSE)
 
 
-# NOTE: this is currently the only scraper that reads in RSS. If we wind up
-# finding RSS feeds we should be using from other counties, we should extract
-# most of this into a base class for transforming RSS. The vast majority of the
-# code here is about handling RSS and is not specific to San Mateo.
-class SanMateoNews(NewsScraper):
+class SanMateoNews(RssNewsScraper):
     """
     Scrape official county COVID-related news from San Mateo County. It's based
     on the RSS feed from the County Manager's Office (CMO), though the items
@@ -60,29 +53,7 @@ class SanMateoNews(NewsScraper):
 
     URL = 'https://cmo.smcgov.org/news/feed'
 
-    def scrape(self) -> NewsFeed:
-        """
-        Create and return a news feed.
-        """
-        feed = self.create_feed()
-        xml = self.load_xml(self.URL)
-        news = self.parse_feed(xml, self.URL)
-        feed.append(*(item
-                      for item in news
-                      if self._in_time_range(item)))
-        return feed
-
-    def load_xml(self, url: str) -> bytes:
-        import requests
-        response = requests.get(self.URL)
-        response.raise_for_status()
-        return response.content
-
-    def parse_feed(self, xml: bytes, url: str) -> List[NewsItem]:
-        root = etree.fromstring(xml)
-        return [self.parse_news_item(item) for item in root.iter('item')]
-
-    def parse_news_item(self, item_element: element.Tag) -> NewsItem:
+    def parse_news_item(self, item_element: etree._Element) -> NewsItem:
         # Items are mostly standard RSS. Example in practice:
         # <item>
         #     <title>May 29, 2020 - Rough Waters Ahead: County of San Mateo  Releases 2020-21 Recommended Budget</title>
@@ -92,25 +63,13 @@ class SanMateoNews(NewsScraper):
         #     <dc:creator>mwilson</dc:creator>
         #     <guid isPermaLink="false">11806 at https://cmo.smcgov.org</guid>
         # </item>
-        title = item_element.find('title').text.strip()
-        # Most titles are prefixed with a date, which is a bit redundant.
-        title = DATE_PREFIX_PATTERN.sub('', title)
+        item = super().parse_news_item(item_element)
 
-        url = item_element.find('link').text.strip()
-        date = parse_datetime(item_element.find('pubDate').text.strip())
-        guid = item_element.find('guid').text.strip()
+        # Most titles are prefixed with a date, which is a bit redundant.
+        item.title = DATE_PREFIX_PATTERN.sub('', item.title)
 
-        # The <description> element can contain HTML snippets. Since we are
-        # translating this to our feed's `summary`, which is plain text, we
-        # do some quick-n-dirty HTML parsing.
-        description = item_element.find('description').text.strip()
-        description = re.sub(r'<br\s*/?>', '\n', description)
-        description = re.sub(r'</?\w+[^>]*>', '', description)
         # Strip meaningless prefixes from the front of the text.
-        description = SUMMARY_PREFIX_PATTERN.sub('', description.strip())
-
-        # NOTE: it looks like San Mateo doesn't use <category>, but if we make
-        # this more generic, it'd be smart to add parsing for it.
+        if item.summary:
+            item.summary = SUMMARY_PREFIX_PATTERN.sub('', item.summary)
 
-        return NewsItem(id=guid, url=url, title=title, date_published=date,
-                        summary=description)
+        return item
@@ -1,5 +1,5 @@
 from bs4 import BeautifulSoup, element  # type: ignore
-from typing import List
+from typing import Iterable
 from urllib.parse import urljoin
 from ..webdriver import get_firefox
 from .base import NewsScraper
@@ -38,20 +38,20 @@ class SantaClaraNews(NewsScraper):
 
     def load_html(self, url: str) -> str:
         with get_firefox() as driver:
-            driver.get(self.URL)
+            driver.get(url)
             driver.implicitly_wait(10)
             content = driver.find_element_by_class_name('sccgov-alerts-archive-item')
             if not content:
-                raise ValueError(f'Page did not load properly: {self.URL}')
+                raise ValueError(f'Page did not load properly: {url}')
 
             return driver.page_source
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         articles = soup.select('.sccgov-alerts-archive-item')
-        return [self.parse_article(index, article, base_url)
-                for index, article in enumerate(articles)]
+        return (self.parse_article(index, article, base_url)
+                for index, article in enumerate(articles))
 
     def parse_article(self, index: int, article: element.Tag,
                       base_url: str) -> NewsItem:
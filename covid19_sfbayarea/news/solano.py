@@ -1,11 +1,11 @@
 from bs4 import BeautifulSoup, element  # type: ignore
 import re
-from typing import List
+from typing import Iterable
 from urllib.parse import urljoin
 from .base import NewsScraper
 from .errors import FormatError
 from .feed import NewsItem
-from .utils import get_base_url, is_covid_related, parse_datetime
+from .utils import COVID_KEY_TERM_MATCHER, get_base_url, parse_datetime
 
 
 SUMMARY_PREFIX_PATTERN = re.compile(r'^SOLANO COUNTY\s*[\-\u2013]\s*', re.I)
@@ -43,17 +43,17 @@ class SolanoNews(NewsScraper):
     )
 
     URL = 'http://www.solanocounty.com/news/default.asp'
+    KEY_TERMS = COVID_KEY_TERM_MATCHER
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         headers = soup.find_all('a', class_='newsheader')
         if len(headers) == 0:
             raise FormatError('Could not find any news items on page')
 
-        parsed = (self.parse_news_item(header, base_url)
-                  for header in headers)
-        return list(filter(is_covid_related, parsed))
+        return (self.parse_news_item(header, base_url)
+                for header in headers)
 
     def parse_news_item(self, title_link: element.Tag, base_url: str) -> NewsItem:
         cell = title_link.find_parent('td')
@@ -1,10 +1,10 @@
 from bs4 import BeautifulSoup, element  # type: ignore
-from typing import List
+from typing import Iterable, Optional
 from urllib.parse import urljoin
 from .base import NewsScraper
 from .errors import FormatError
 from .feed import NewsItem
-from .utils import get_base_url, is_covid_related, parse_datetime
+from .utils import COVID_KEY_TERM_MATCHER, get_base_url, parse_datetime
 
 
 class SonomaNews(NewsScraper):
@@ -48,17 +48,24 @@ class SonomaNews(NewsScraper):
     )
 
     URL = 'https://sonomacounty.ca.gov/News/'
+    KEY_TERMS = COVID_KEY_TERM_MATCHER
+    # `page_url()` hasn't been checked against a recording of the live site,
+    # so only load the first page until one shows page 2 is different.
+    MAX_PAGES = 1
 
-    def parse_page(self, html: str, url: str) -> List[NewsItem]:
+    def page_url(self, page: int) -> Optional[str]:
+        return f'{self.URL}?page={page}' if page > 1 else self.URL
+
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
         soup = BeautifulSoup(html, 'html5lib')
         base_url = get_base_url(soup, url)
         articles = soup.select('.teaserContainer.srchResults .teaserContainer')
-        if len(articles) == 0:
+        # Later pages may legitimately be empty if we've paged past the end.
+        if len(articles) == 0 and url == self.URL:
             raise FormatError('Could not find any news items on page')
 
-        parsed = (self.parse_news_item(article, base_url)
-                  for article in articles)
-        return list(filter(is_covid_related, parsed))
+        return (self.parse_news_item(article, base_url)
+                for article in articles)
 
     def parse_news_item(self, item_element: element.Tag, base_url: str) -> NewsItem:
         title_element = item_element.select_one('.titlePrimary')
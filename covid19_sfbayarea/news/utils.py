@@ -1,20 +1,82 @@
 from bs4 import BeautifulSoup, element  # type: ignore
+import chardet  # type: ignore
+import codecs
 from datetime import datetime, tzinfo
 import dateutil.parser
 import dateutil.tz
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 import re
 import requests
-from typing import Optional
-from urllib.parse import urljoin
+from typing import Dict, Iterable, Mapping, Optional, Union
+from urllib.parse import urljoin, urlparse
 from .feed import NewsItem
 
 
 HEADING_PATTERN = re.compile(r'h\d')
-ISO_DATETIME_PATTERN = re.compile(r'^\d{4}-\d\d-\d\d(T|\s)\d\d:\d\d:\d\d(\.\d+)?(Z|\d{4}|\d\d:\d\d)$')
 US_SHORT_DATE_PATTERN = re.compile(r'^\s*\d+/\d+/\d+\s*$')
 PACIFIC_TIME = dateutil.tz.gettz('America/Los_Angeles')
 CURRENT_YEAR = datetime.utcnow().year
 
+# The patterns below describe the date formats we see most often on county
+# sites. `parse_datetime()` handles strings that match them with fast,
+# specialized parsers and only falls back to dateutil for everything else.
+
+# ISO 8601 (e.g. the `datetime` attribute of SF's <time> elements). The parts
+# are captured so we can normalize them for `datetime.fromisoformat()`, which
+# (before Python 3.11) does not support `Z`, `+hhmm` offsets, or fractional
+# seconds that aren't 3 or 6 digits long.
+ISO_DATETIME_PATTERN = re.compile(r'''
+    ^\s*
+    (\d{4}-\d\d-\d\d)                   # Date
+    (?:
+        [T\s](\d\d:\d\d(?::\d\d)?)      # Time
+        (\.\d{3}|\.\d{6})?              # Optional fractional seconds
+        (Z|[+-]\d\d:?\d\d)?             # Optional timezone offset
+    )?
+    \s*$
+''', re.VERBOSE)
+
+# RFC 2822 (e.g. `<pubDate>` in San Mateo's RSS feed):
+# "Fri, 29 May 2020 16:18:06 +0000"
+RFC_2822_PATTERN = re.compile(r'''
+    ^\s*
+    (?:[A-Za-z]{3},\s*)?
+    \d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+
+    \d\d:\d\d(?::\d\d)?\s+
+    (?:[+-]\d{4}|GMT|UTC?)
+    \s*$
+''', re.VERBOSE)
+
+# US-style dates, optionally followed by a time (e.g. "6/15/2020" from Contra
+# Costa or "06/15/2020 at 4:30 PM" from Sonoma). Two-digit years are left to
+# dateutil.
+US_DATETIME_PATTERN = re.compile(r'''
+    ^\s*
+    (\d{1,2})/(\d{1,2})/(\d{4})         # Date in mm/dd/yyyy format
+    (?:
+        \s+(?:at\s+)?
+        (\d{1,2}):(\d\d)(?::(\d\d))?    # Time
+        (?:\s*([AaPp])\.?[Mm]\.?)?      # Optional AM/PM
+    )?
+    \s*$
+''', re.VERBOSE)
+
+# Dates with the month written out (e.g. "June 15, 2020" from Napa).
+LONG_DATE_PATTERN = re.compile(r'^\s*([A-Za-z]+)\.?\s+(\d{1,2}),?\s+(\d{4})\s*$')
+
+MONTH_NUMBERS = {
+    name: index + 1
+    for names in (
+        ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+         'august', 'september', 'october', 'november', 'december'),
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct',
+         'nov', 'dec'),
+    )
+    for index, name in enumerate(names)
+}
+MONTH_NUMBERS['sept'] = 9
+
 # Sometimes we can't find a news feed that is specific to COVID-19, so the news
 # items we scrape need to be filtered. These key terms are used to test whether
 # a news item should be included.
@@ -42,6 +104,31 @@ XML_PROLOG_PATTERN = re.compile(
     b'<\\?xml\\s[^>]*encoding=[\'"]([^\'"]+)[\'"].*\\?>',
     re.IGNORECASE)
 
+# How many bytes at the start of a document to examine when looking for its
+# encoding. Encoding declarations have to be near the top of a document, and
+# the first few KB are enough for statistical detection, too.
+SNIFF_LENGTH = 4096
+
+# Byte order marks and the encodings they indicate. (UTF-32 must be checked
+# before UTF-16, since the UTF-32 LE BOM starts with the UTF-16 LE BOM.)
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# The lowest confidence from `chardet.detect()` that we trust. (chardet never
+# has more than 0.73 confidence in Windows-1252 and similar encodings.)
+MIN_DETECTION_CONFIDENCE = 0.5
+
+# Encodings we had to detect statistically (because they weren't declared),
+# keyed by host. Pages from the same site nearly always share an encoding, so
+# we try the host's last detected encoding before detecting again. Only
+# confident detections are kept.
+DETECTED_ENCODINGS: Dict[str, str] = {}
+
 
 def get_base_url(soup: BeautifulSoup, url: str) -> str:
     """
@@ -115,13 +202,13 @@ def parse_datetime(date_string: str, timezone: Optional[tzinfo] = PACIFIC_TIME)
     Parse a datetime from a string and ensure it always has a timezone set. Use
     the `timezone` argument to set the timezone to use if none was specified in
     the parsed string.
-    """
-    # Handle dumb typos that might be in the dates on the page :(
-    if US_SHORT_DATE_PATTERN.match(date_string):
-        if date_string.endswith('/202'):
-            date_string += '0'
 
-    date = dateutil.parser.parse(date_string)
+    Common formats (ISO 8601, RFC 2822, US-style and long-form dates) are
+    parsed directly; anything else is handed off to dateutil. Results are
+    memoized, since the same date strings show up over and over on listing
+    pages.
+    """
+    date = _parse_datetime_string(date_string)
     if date.tzinfo is None:
         date = date.replace(tzinfo=timezone)
 
@@ -132,6 +219,72 @@ def parse_datetime(date_string: str, timezone: Optional[tzinfo] = PACIFIC_TIME)
     return date
 
 
+@lru_cache(maxsize=4096)
+def _parse_datetime_string(date_string: str) -> datetime:
+    # Handle dumb typos that might be in the dates on the page :(
+    if US_SHORT_DATE_PATTERN.match(date_string):
+        if date_string.endswith('/202'):
+            date_string += '0'
+
+    return _parse_known_format(date_string) or dateutil.parser.parse(date_string)
+
+
+def _parse_known_format(date_string: str) -> Optional[datetime]:
+    """
+    Parse a date string in one of the formats we commonly encounter without
+    going through dateutil's (slow) generic parser. Returns ``None`` if the
+    string is not in a known format.
+    """
+    try:
+        match = ISO_DATETIME_PATTERN.match(date_string)
+        if match:
+            date, time, fraction, offset = match.groups()
+            normalized = date
+            if time:
+                normalized += f'T{time}{fraction or ""}'
+                if offset == 'Z':
+                    normalized += '+00:00'
+                elif offset:
+                    normalized += f'{offset[:3]}:{offset[-2:]}'
+            return datetime.fromisoformat(normalized)
+
+        match = US_DATETIME_PATTERN.match(date_string)
+        if match:
+            month, day, year, hour, minute, second, meridiem = match.groups()
+            hour_number = int(hour or 0)
+            if meridiem:
+                if not 1 <= hour_number <= 12:
+                    return None
+                hour_number = hour_number % 12
+                if meridiem in 'Pp':
+                    hour_number += 12
+            return datetime(int(year), int(month), int(day), hour_number,
+                            int(minute or 0), int(second or 0))
+
+        match = LONG_DATE_PATTERN.match(date_string)
+        if match:
+            month_name, day, year = match.groups()
+            month_number = MONTH_NUMBERS.get(month_name.lower())
+            if month_number:
+                return datetime(int(year), month_number, int(day))
+            return None
+
+        if RFC_2822_PATTERN.match(date_string):
+            parsed = parsedate_to_datetime(date_string)
+            # `-0000` means "UTC, but the local zone is unknown", which
+            # dateutil treats differently than the email module. Let dateutil
+            # decide in that case.
+            if parsed.tzinfo is None:
+                return None
+            return parsed
+    except (TypeError, ValueError):
+        # Strings that look right but have out-of-range values, etc. will get
+        # a more helpful error from dateutil.
+        pass
+
+    return None
+
+
 # NOTE: This is adapted from:
 # https://github.com/edgi-govdata-archiving/web-monitoring-processing
 def guess_html_encoding(response: requests.Response) -> Optional[str]:
@@ -140,20 +293,26 @@ def guess_html_encoding(response: requests.Response) -> Optional[str]:
     responses that don't include the encoding as a header (where requests will
     automatically pick it up).
 
-    There are a few improvements that could be made here for maximum
-    correctness (such as using cchardet), but this covers all our existing
-    cases well enough for now.
+    This only looks at headers and the first ``SNIFF_LENGTH`` bytes of the
+    body (for a byte order mark, ``<meta>`` tag, or XML prolog), so it's fast
+    even for very large pages. It returns ``None`` if the document doesn't
+    declare its encoding.
     """
     encoding = None
+    content = response.content
     content_type = response.headers.get('Content-Type', '').lower()
     if 'charset=' in content_type:
         encoding = content_type.split('charset=')[-1]
     if not encoding:
-        meta_tag_match = META_TAG_PATTERN.search(response.content, endpos=2048)
+        for mark, bom_encoding in BYTE_ORDER_MARKS:
+            if content.startswith(mark):
+                return bom_encoding
+    if not encoding:
+        meta_tag_match = META_TAG_PATTERN.search(content, endpos=SNIFF_LENGTH)
         if meta_tag_match:
             encoding = meta_tag_match.group(1).decode('ascii', errors='ignore')
     if not encoding:
-        prolog_match = XML_PROLOG_PATTERN.search(response.content, endpos=2048)
+        prolog_match = XML_PROLOG_PATTERN.search(content, endpos=SNIFF_LENGTH)
         if prolog_match:
             encoding = prolog_match.group(1).decode('ascii', errors='ignore')
     if encoding:
@@ -162,13 +321,56 @@ def guess_html_encoding(response: requests.Response) -> Optional[str]:
     return encoding
 
 
+def detect_encoding(content: bytes) -> Optional[str]:
+    """
+    Statistically detect the encoding of some content using only its first
+    ``SNIFF_LENGTH`` bytes. (Detecting on the whole document, as requests does
+    for ``Response.text``, is very slow for large pages.)
+
+    Returns ``None`` if the encoding can't be determined. That includes
+    detecting ASCII, since it only means the sniffed bytes were all ASCII;
+    the rest of the document may not be.
+    """
+    detected = chardet.detect(content[:SNIFF_LENGTH])
+    encoding = detected.get('encoding')
+    if (not encoding or encoding.lower() == 'ascii' or
+            (detected.get('confidence') or 0) < MIN_DETECTION_CONFIDENCE):
+        return None
+    return encoding
+
+
 def decode_html_body(response: requests.Response) -> str:
+    """
+    Decode the body of an HTML response to a string, using as little work as
+    possible to figure out the right encoding.
+    """
+    content = response.content
     encoding = guess_html_encoding(response)
     if encoding:
-        return response.content.decode(encoding, errors='replace')
+        try:
+            return content.decode(encoding, errors='replace')
+        except LookupError:
+            # The page declared an encoding Python doesn't know about.
+            pass
+
+    # Content that is valid UTF-8 is almost certainly UTF-8, and checking
+    # that is fast. Otherwise, try what we detected for this host last time.
+    host = urlparse(response.url or '').hostname or ''
+    for candidate in ('utf-8', DETECTED_ENCODINGS.get(host)):
+        if candidate:
+            try:
+                return content.decode(candidate)
+            except (LookupError, UnicodeDecodeError):
+                pass
+
+    encoding = detect_encoding(content)
+    if encoding:
+        DETECTED_ENCODINGS[host] = encoding
     else:
-        # If we couldn't guess the encoding, let requests do its best.
-        return response.text
+        # Windows-1252 is the default for HTML documents that don't declare
+        # an encoding, and it can decode nearly anything.
+        encoding = 'windows-1252'
+    return content.decode(encoding, errors='replace')
 
 
 def find_with_text(soup: BeautifulSoup, text: str, tag_name: str = None) -> Optional[element.Tag]:
@@ -181,11 +383,84 @@ def find_with_text(soup: BeautifulSoup, text: str, tag_name: str = None) -> Opti
     return soup.find(match_element)
 
 
+class KeyTermMatcher:
+    """
+    Finds key terms in the title, summary, URL, and tags of news items. The
+    terms are compiled into a single case-insensitive regular expression that
+    scans each field separately (so we never need to build a combined,
+    lowercased copy of an item's text).
+
+    Terms can be weighted. An item matches if the total weight of the distinct
+    terms found in it is at least ``threshold``. Negative weights can be used
+    for terms that suggest an item is *not* relevant.
+
+    Where terms overlap, only the longest one is counted at each place in the
+    text. For example, with the terms "covid" and "covid-19", the text
+    "COVID-19" only counts as "covid-19". "covid" is only counted if it also
+    appears somewhere else on its own.
+
+    Parameters
+    ----------
+    terms
+        Either an iterable of terms that all have a weight of 1, or a mapping
+        of terms to their weights.
+    threshold
+        The minimum total weight for an item to match. (Default: 1)
+
+    Examples
+    --------
+    >>> matcher = KeyTermMatcher({'covid': 1, 'health': 0.5}, threshold=1)
+    >>> matcher.find(item)
+    {'health': 0.5}
+    >>> matcher.matches(item)
+    False
+    """
+    def __init__(self, terms: Union[Iterable[str], Mapping[str, float]],
+                 threshold: float = 1) -> None:
+        if not isinstance(terms, Mapping):
+            terms = {term: 1 for term in terms}
+        self.weights = {term.lower(): weight for term, weight in terms.items()}
+        self.threshold = threshold
+        # Longer terms go first so that, when terms overlap, the regex prefers
+        # the most specific one.
+        ordered_terms = sorted(self.weights, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(term) for term in ordered_terms),
+                                  re.IGNORECASE)
+        # If any single term is enough to match, `matches()` can stop at the
+        # first term it finds.
+        self._any_term_matches = all(weight >= threshold
+                                     for weight in self.weights.values())
+
+    def _texts(self, item: NewsItem) -> Iterable[str]:
+        return (text
+                for text in (item.title, item.summary, item.url, *item.tags)
+                if text)
+
+    def find(self, item: NewsItem) -> Dict[str, float]:
+        """
+        Get the key terms found in a news item and their weights.
+        """
+        found = {}
+        for text in self._texts(item):
+            for match in self.pattern.finditer(text):
+                term = match.group().lower()
+                found[term] = self.weights[term]
+        return found
+
+    def score(self, item: NewsItem) -> float:
+        """
+        Get the total weight of the key terms found in a news item.
+        """
+        return sum(self.find(item).values())
+
+    def matches(self, item: NewsItem) -> bool:
+        if self._any_term_matches:
+            return any(self.pattern.search(text) for text in self._texts(item))
+        return self.score(item) >= self.threshold
+
+
+COVID_KEY_TERM_MATCHER = KeyTermMatcher(COVID_KEY_TERMS)
+
+
 def is_covid_related(item: NewsItem) -> bool:
-    comparable = ' '.join([
-        item.title,
-        item.summary or '',
-        item.url,
-        *item.tags
-    ]).lower()
-    return any(term in comparable for term in COVID_KEY_TERMS)
+    return COVID_KEY_TERM_MATCHER.matches(item)
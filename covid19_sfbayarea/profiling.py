@@ -0,0 +1,118 @@
+"""
+Profiling for scraper runs. The CLI scripts use this to implement their
+``--profile`` option:
+
+    >>> with profile_run('profiles', 'napa'):
+    >>>     NapaNews.get_news()
+
+That writes ``profiles/napa.prof`` (which can be explored with tools like
+``snakeviz`` or the standard library's ``pstats``) and prints the hottest
+functions to stderr, grouped into categories: network wait, HTML/XML parsing,
+date parsing, serialization, and everything else.
+"""
+
+from contextlib import contextmanager
+import cProfile
+from pathlib import Path
+import pstats
+import sys
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+
+# Functions are grouped into categories based on these substrings of their
+# file names or names. The first matching category wins.
+CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('network wait', (
+        'socket', 'ssl', 'http/client', 'urllib3', 'requests/', 'selenium',
+        'selectors.py', 'select.', 'time.sleep',
+        # The main thread waits on locks while other threads load pages.
+        'acquire', 'concurrent/futures',
+    )),
+    ('HTML/XML parsing', (
+        'bs4/', 'html5lib', 'lxml', 'soupsieve', 'html/parser', 'webencodings',
+        'chardet', 'news/rss.py', ':parse_page', ':parse_news_item',
+    )),
+    ('date parsing', (
+        'dateutil', '_strptime', 'email/_parseaddr', 'email/utils',
+        'parse_datetime', 'fromisoformat',
+    )),
+    # News feeds are written by the writers in `news/feed.py`.
+    ('JSON/RSS serialization', (
+        'json/', '_json', 'news/feed.py',
+    )),
+]
+OTHER = 'other'
+
+FunctionKey = Tuple[str, int, str]
+
+
+def categorize(function: FunctionKey) -> str:
+    filename, _, name = function
+    location = f'{filename.replace(chr(92), "/")}:{name}'
+    for category, patterns in CATEGORIES:
+        if any(pattern in location for pattern in patterns):
+            return category
+    return OTHER
+
+
+def hot_functions(stats: pstats.Stats, limit: int = 5
+                  ) -> Dict[str, Tuple[float, List[Tuple[float, int, FunctionKey]]]]:
+    """
+    Group the functions in a profile into categories. For each category, get
+    the total time spent in it and its ``limit`` hottest functions (by time
+    spent in the function itself, not counting functions it called).
+    """
+    categories: Dict[str, List[Tuple[float, int, FunctionKey]]] = {}
+    profile_data = stats.stats  # type: ignore
+    for function, (_, call_count, own_time, _, _) in profile_data.items():
+        categories.setdefault(categorize(function), []).append(
+            (own_time, call_count, function))
+
+    result = {}
+    for category in [name for name, _ in CATEGORIES] + [OTHER]:
+        functions = sorted(categories.get(category, []), reverse=True)
+        result[category] = (sum(own_time for own_time, _, _ in functions),
+                            functions[:limit])
+    return result
+
+
+def format_function(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == '~':
+        return name
+    return f'{Path(filename).name}:{line}({name})'
+
+
+def print_report(name: str, stats: pstats.Stats, output: TextIO = sys.stderr,
+                 limit: int = 5) -> None:
+    print(f'Hot functions for {name}:', file=output)
+    for category, (total, functions) in hot_functions(stats, limit).items():
+        print(f'  {category:<24} {total:8.3f}s', file=output)
+        for own_time, call_count, function in functions:
+            print(f'    {own_time:8.3f}s {call_count:>8} calls  '
+                  f'{format_function(function)}', file=output)
+    print(file=output)
+
+
+@contextmanager
+def profile_run(directory: Optional[str], name: str) -> Iterator[None]:
+    """
+    Profile the code in a ``with`` block, write the profile to
+    ``<directory>/<name>.prof``, and print a report of the hottest functions.
+    If ``directory`` is ``None``, this does nothing, so callers can always use
+    it and let a CLI option decide whether to profile.
+    """
+    if directory is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = Path(directory, f'{name}.prof')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        print_report(name, pstats.Stats(profiler))
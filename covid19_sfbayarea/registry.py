@@ -0,0 +1,52 @@
+from importlib import import_module
+from typing import Any, Dict, Iterator, MutableMapping
+
+
+class LazyRegistry(MutableMapping[str, Any]):
+    """
+    A dictionary of scrapers that only imports each scraper's module when it
+    is looked up. Scraper modules import heavy libraries (BeautifulSoup, lxml,
+    Selenium, etc.), so importing all of them up front makes every command
+    slow to start, even ones that only run one scraper or just print ``--help``.
+
+    Values are given as import paths relative to ``package``, either of a
+    module (``'.alameda'``) or an attribute of a module
+    (``'.alameda:AlamedaNews'``):
+
+    >>> scrapers = LazyRegistry(__name__, {'alameda': '.alameda:AlamedaNews'})
+    >>> list(scrapers)  # Doesn't import anything
+    ['alameda']
+    >>> scrapers['alameda']  # Imports `.alameda`
+    <class 'covid19_sfbayarea.news.alameda.AlamedaNews'>
+    """
+
+    def __init__(self, package: str, paths: Dict[str, str]) -> None:
+        self.package = package
+        self.paths = dict(paths)
+        self.loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.loaded:
+            module_name, _, attribute = self.paths[name].partition(':')
+            value: Any = import_module(module_name, self.package)
+            if attribute:
+                value = getattr(value, attribute)
+            self.loaded[name] = value
+        return self.loaded[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self.paths.setdefault(name, '')
+        self.loaded[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self.paths[name]
+        self.loaded.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.package!r}, {self.paths!r})'
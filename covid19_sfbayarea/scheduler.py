@@ -0,0 +1,175 @@
+"""
+Runs jobs (like scraping one county's data or news) over and over, each on
+its own interval, in a single long-running process. That lets jobs share warm
+HTTP sessions and browsers (see `covid19_sfbayarea.webdriver.use_browser_pool`)
+instead of starting everything from scratch for every run.
+
+    >>> scheduler = Scheduler([
+    >>>     Job('news.napa', lambda: NapaNews.get_news(), interval=3600),
+    >>> ])
+    >>> scheduler.run()
+
+Intervals are jittered so that jobs with the same interval don't all hit the
+network at the same moment, and the first runs of jobs are spread out over
+their first interval.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import random
+from threading import Event, Lock
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# The longest the scheduler sleeps before checking for due jobs again.
+MAX_SLEEP = 60.0
+
+
+def format_time(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """
+    A function to run every ``interval`` seconds, along with the status of
+    its runs so far.
+    """
+    name: str
+    run: Callable[[], Any]
+    interval: float
+    next_run: float = 0
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    last_started: Optional[float] = None
+    last_finished: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'running': self.running,
+            'next_run': None if self.running else format_time(self.next_run),
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_started': format_time(self.last_started),
+            'last_finished': format_time(self.last_finished),
+            'last_duration': self.last_duration,
+            'last_error': self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Runs jobs on their intervals, up to ``workers`` at a time.
+
+    Parameters
+    ----------
+    jobs
+        The jobs to run.
+    workers
+        How many jobs can run at once.
+    jitter
+        How much to randomly vary each interval by, as a fraction of it. For
+        example, with ``0.1``, a job with a one hour interval runs again 54 to
+        66 minutes after it last finished.
+    on_status
+        Called with the status of every job (see `status()`) whenever a job
+        starts or finishes.
+    """
+
+    def __init__(self, jobs: Iterable[Job], workers: int = 4,
+                 jitter: float = 0.1,
+                 on_status: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+                 ) -> None:
+        self.jobs = list(jobs)
+        self.workers = workers
+        self.jitter = jitter
+        self.on_status = on_status
+        self._lock = Lock()
+        self._wake = Event()
+        self._stop = Event()
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.status() for job in self.jobs]
+
+    def stop(self) -> None:
+        """Stop starting jobs. `run()` returns once running jobs finish."""
+        self._stop.set()
+        self._wake.set()
+
+    def schedule(self, job: Job, delay: float) -> None:
+        jitter = random.uniform(-self.jitter, self.jitter)
+        job.next_run = time.time() + delay * (1 + jitter)
+
+    def run(self) -> None:
+        """
+        Run jobs until `stop()` is called or the process is interrupted (e.g.
+        with Ctrl+C). Jobs that are already running are allowed to finish.
+        """
+        now = time.time()
+        for job in self.jobs:
+            job.next_run = now + random.uniform(0, job.interval * self.jitter)
+
+        futures: List[Future] = []
+        with ThreadPoolExecutor(self.workers) as executor:
+            try:
+                while not self._stop.is_set():
+                    with self._lock:
+                        now = time.time()
+                        for job in self.jobs:
+                            if not job.running and job.next_run <= now:
+                                job.running = True
+                                futures.append(executor.submit(self.run_job, job))
+                        waiting = [job.next_run for job in self.jobs
+                                   if not job.running]
+                    futures = [future for future in futures if not future.done()]
+                    sleep = min(waiting, default=now + MAX_SLEEP) - now
+                    # Jobs that finish wake us up to schedule their next run.
+                    self._wake.wait(min(max(sleep, 0), MAX_SLEEP))
+                    self._wake.clear()
+            except KeyboardInterrupt:
+                logging.info('Stopping once running jobs finish')
+            # Don't start jobs that are waiting for a worker.
+            for future in futures:
+                future.cancel()
+
+    def run_job(self, job: Job) -> None:
+        with self._lock:
+            job.last_started = time.time()
+        self.report_status()
+        start = time.perf_counter()
+        try:
+            job.run()
+            error = None
+        except Exception as exception:
+            logging.exception(f'Job {job.name} failed')
+            error = f'{type(exception).__name__}: {exception}'
+
+        with self._lock:
+            job.runs += 1
+            if error:
+                job.failures += 1
+            job.last_error = error
+            job.last_duration = time.perf_counter() - start
+            job.last_finished = time.time()
+            self.schedule(job, job.interval)
+            job.running = False
+        self.report_status()
+        self._wake.set()
+
+    def report_status(self) -> None:
+        if self.on_status:
+            try:
+                self.on_status(self.status())
+            except Exception:
+                logging.exception('Reporting job status failed')
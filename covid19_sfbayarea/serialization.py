@@ -0,0 +1,107 @@
+"""
+Fast JSON output. If `orjson <https://github.com/ijl/orjson>`_ is installed,
+it is used to encode JSON; otherwise the standard library's ``json`` module
+is used. Either way, the output is the same: UTF-8 encoded bytes, pretty
+printed with two-space indents (like ``json.dumps(value, indent=2,
+ensure_ascii=False)``) or, in compact mode, with no whitespace at all.
+
+>>> with open('data.json', 'wb') as output_file:
+>>>     serialization.dump(data, output_file, pretty=False)
+
+`dump()` streams large objects into a file one member at a time rather than
+building the whole encoded output in memory first.
+"""
+
+import json
+from typing import Any, BinaryIO, Callable, Dict, Iterator
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+
+# An encoder takes a value and whether to pretty print it and returns the
+# encoded value.
+Encoder = Callable[[Any, bool], bytes]
+
+INDENT = b'  '
+
+# How many levels of nested objects and lists `dump()` writes one member at a
+# time. Anything deeper is encoded in one go, which is much faster with
+# orjson but means the encoded value is held in memory.
+STREAM_DEPTH = 2
+
+
+def encode_json(value: Any, pretty: bool) -> bytes:
+    if pretty:
+        text = json.dumps(value, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def encode_orjson(value: Any, pretty: bool) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+
+ENCODERS: Dict[str, Encoder] = {'json': encode_json}
+if orjson:
+    ENCODERS['orjson'] = encode_orjson
+
+# The name of the encoder in use (see `set_encoder()`).
+encoder_name = 'orjson' if orjson else 'json'
+
+
+def set_encoder(name: str) -> None:
+    """Use one of the ``ENCODERS`` to encode JSON."""
+    global encoder_name
+    if name not in ENCODERS:
+        raise ValueError(f'Unknown JSON encoder "{name}" (available: '
+                         f'{", ".join(ENCODERS)})')
+    encoder_name = name
+
+
+def dumps(value: Any, pretty: bool = True) -> bytes:
+    """Encode a value as JSON."""
+    return ENCODERS[encoder_name](value, pretty)
+
+
+def iter_encode(value: Any, pretty: bool = True, level: int = 0,
+                depth: int = STREAM_DEPTH) -> Iterator[bytes]:
+    """
+    Encode a value as JSON in chunks. Objects and lists nested up to
+    ``depth`` levels deep are encoded one member at a time. ``level`` is how
+    deeply indented the value is.
+    """
+    if depth <= 0 or not value or not isinstance(value, (dict, list)):
+        data = dumps(value, pretty)
+        if pretty and level:
+            data = data.replace(b'\n', b'\n' + INDENT * level)
+        yield data
+        return
+
+    if isinstance(value, dict):
+        opening, closing = b'{', b'}'
+        key_separator = b': ' if pretty else b':'
+        members: Iterator = ((dumps(str(key), False) + key_separator, item)
+                             for key, item in value.items())
+    else:
+        opening, closing = b'[', b']'
+        members = ((b'', item) for item in value)
+
+    if pretty:
+        separator = b',\n' + INDENT * (level + 1)
+        yield opening + b'\n' + INDENT * (level + 1)
+    else:
+        separator = b','
+        yield opening
+    for index, (prefix, item) in enumerate(members):
+        yield (separator if index else b'') + prefix
+        yield from iter_encode(item, pretty, level + 1, depth - 1)
+    yield b'\n' + INDENT * level + closing if pretty else closing
+
+
+def dump(value: Any, stream: BinaryIO, pretty: bool = True) -> None:
+    """Write a value as JSON to a binary stream."""
+    for chunk in iter_encode(value, pretty):
+        stream.write(chunk)
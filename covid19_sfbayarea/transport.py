@@ -0,0 +1,481 @@
+"""
+Tools for making HTTP requests from scrapers. Scrapers should make requests
+with `get()` or a session from `get_session()` (rather than calling
+`requests.get()` directly) so that their traffic can be recorded and replayed.
+
+A *cassette* is a file with every HTTP response (and every page loaded in
+Firefox, see `covid19_sfbayarea.webdriver`) from a scraper run. Replaying a
+cassette runs scrapers exactly as they ran when it was recorded, but entirely
+offline, which is useful for testing, profiling, and load-testing.
+
+Use a cassette for a block of code with `use_cassette()`:
+
+    >>> with use_cassette('napa.json', 'record'):
+    >>>     NapaNews.get_news()
+    >>> with use_cassette('napa.json', 'replay'):
+    >>>     NapaNews.get_news()  # No network requests!
+
+Or use one for a whole run of a scraper script with environment variables:
+
+    $ SCRAPER_CASSETTE=run.json SCRAPER_TRANSPORT=record python scraper_data.py
+    $ SCRAPER_CASSETTE=run.json SCRAPER_TRANSPORT=replay python scraper_data.py
+
+- ``SCRAPER_TRANSPORT`` is ``live`` (the default), ``record``, or ``replay``.
+- ``SCRAPER_CASSETTE`` is the path of the cassette file.
+- ``SCRAPER_REPLAY_LATENCY`` simulates network latency when replaying. It is
+  a number of seconds to wait before each response, or ``recorded`` to wait
+  as long as each response took when it was recorded. Defaults to ``0``.
+
+Live requests are also made resilient to slow or flaky servers: they time out
+instead of hanging, idempotent requests that fail with connection errors or
+5xx responses are retried with jittered exponential backoff, and requests to a
+host that keeps failing fail fast (see `CircuitBreaker`). The settings for
+this are attributes of `TransportAdapter`, which can also limit how many
+requests are made to each host at once.
+"""
+
+import atexit
+from base64 import b64decode, b64encode
+from contextlib import contextmanager, nullcontext
+from io import BytesIO
+import json
+from os import getenv
+from pathlib import Path
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from threading import BoundedSemaphore, Lock
+import time
+from typing import Any, ContextManager, Dict, Iterator, Optional, Union
+from urllib.parse import urlparse
+from urllib3 import HTTPResponse  # type: ignore
+from . import instrumentation
+
+
+TRANSPORT_MODES = ('live', 'record', 'replay')
+
+# Headers that describe the body as it was sent over the wire. Cassettes store
+# the decoded body, so these would be wrong when replaying it.
+TRANSPORT_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+class MissingRecording(Exception):
+    """
+    Raised when replaying a cassette and a scraper makes a request that was
+    not recorded.
+    """
+
+
+class Cassette:
+    """
+    A set of recorded HTTP responses and browser pages.
+
+    Parameters
+    ----------
+    path
+        Where the cassette is saved.
+    mode
+        Whether responses should be recorded to (``record``) or served from
+        (``replay``) this cassette.
+    latency
+        When replaying, how many seconds to wait before each response. If
+        ``None``, wait as long as the response took when it was recorded.
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = 'replay',
+                 latency: Optional[float] = 0) -> None:
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'Cassettes can record or replay, not "{mode}"')
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        # Any extra information needed to replay a run the same way it was
+        # recorded (for example, the date range of a news scraper).
+        self.options: Dict[str, Any] = {}
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, str] = {}
+        self._lock = Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    def load(self) -> None:
+        with self.path.open(encoding='utf-8') as cassette_file:
+            data = json.load(cassette_file)
+        self.options = data.get('options', {})
+        self.responses = {self.request_key(entry['method'], entry['url']): entry
+                          for entry in data['responses']}
+        self.pages = data['pages']
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('w', encoding='utf-8') as cassette_file:
+            json.dump({'options': self.options,
+                       'responses': list(self.responses.values()),
+                       'pages': self.pages},
+                      cassette_file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def request_key(method: str, url: str) -> str:
+        return f'{method.upper()} {url}'
+
+    def add_response(self, response: requests.Response) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {
+            'method': response.request.method,
+            'url': response.request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {key: value for key, value in response.headers.items()
+                        if key.lower() not in TRANSPORT_HEADERS},
+            'elapsed': response.elapsed.total_seconds(),
+        }
+        try:
+            entry['body'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_base64'] = b64encode(response.content).decode('ascii')
+
+        with self._lock:
+            self.responses[self.request_key(entry['method'], entry['url'])] = entry
+        return entry
+
+    def find_response(self, request: requests.PreparedRequest) -> Dict[str, Any]:
+        key = self.request_key(request.method or 'GET', request.url or '')
+        try:
+            return self.responses[key]
+        except KeyError:
+            raise MissingRecording(f'No recorded response for {key} in {self.path}')
+
+    def add_page(self, url: str, source: str) -> None:
+        with self._lock:
+            self.pages[url] = source
+
+    def find_page(self, url: str) -> str:
+        try:
+            return self.pages[url]
+        except KeyError:
+            raise MissingRecording(f'No recorded page for {url} in {self.path}')
+
+    def wait(self, entry: Dict[str, Any]) -> None:
+        """Simulate the latency of a live request."""
+        latency = entry.get('elapsed', 0) if self.latency is None else self.latency
+        if latency > 0:
+            time.sleep(latency)
+
+
+# The cassette currently in use, if any.
+_cassette: Optional[Cassette] = None
+_configured = False
+
+
+def parse_latency(value: str) -> Optional[float]:
+    return None if value == 'recorded' else float(value)
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    Get the cassette requests should be recorded to or replayed from. Returns
+    ``None`` if requests should just be made normally.
+    """
+    global _cassette, _configured
+    if not _configured:
+        _configured = True
+        mode = getenv('SCRAPER_TRANSPORT', 'live')
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f'SCRAPER_TRANSPORT must be one of '
+                             f'{", ".join(TRANSPORT_MODES)}, not "{mode}"')
+        if mode != 'live':
+            path = getenv('SCRAPER_CASSETTE')
+            if not path:
+                raise ValueError(f'SCRAPER_CASSETTE must be set to use '
+                                 f'SCRAPER_TRANSPORT={mode}')
+            latency = parse_latency(getenv('SCRAPER_REPLAY_LATENCY', '0'))
+            _cassette = open_cassette(path, mode, latency)
+            if _cassette.recording:
+                atexit.register(_cassette.save)
+
+    return _cassette
+
+
+def open_cassette(path: Union[str, Path], mode: str,
+                  latency: Optional[float] = 0) -> Cassette:
+    cassette = Cassette(path, mode, latency)
+    if not cassette.recording:
+        cassette.load()
+    return cassette
+
+
+@contextmanager
+def use_cassette(path: Union[str, Path], mode: str = 'replay',
+                 latency: Optional[float] = 0) -> Iterator[Cassette]:
+    """
+    Record or replay all requests made inside a ``with`` block. When
+    recording, the cassette is saved at the end of the block.
+    """
+    global _cassette
+    previous = get_cassette()
+    _cassette = open_cassette(path, mode, latency)
+    try:
+        yield _cassette
+        if _cassette.recording:
+            _cassette.save()
+    finally:
+        _cassette = previous
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised instead of making a request to a host that has failed repeatedly.
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks failures for a host. After ``threshold`` requests in a row fail,
+    the circuit *opens* and requests fail immediately with `CircuitOpenError`
+    for ``reset_after`` seconds. After that, one trial request is allowed
+    through; if it succeeds, the circuit closes again, and if not, it stays
+    open for another ``reset_after`` seconds.
+    """
+
+    def __init__(self, host: str, threshold: int, reset_after: float) -> None:
+        self.host = host
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = Lock()
+
+    def check(self) -> None:
+        """Raise `CircuitOpenError` if requests should not be made."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_after:
+                raise CircuitOpenError(
+                    f'Not requesting from {self.host} after {self.failures} '
+                    f'failed requests in a row')
+            # Let a trial request through, but make any others wait until we
+            # know how it went.
+            self.opened_at = time.monotonic()
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failed(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = Lock()
+
+
+def get_circuit_breaker(host: str, threshold: int,
+                        reset_after: float) -> CircuitBreaker:
+    """
+    Get the circuit breaker for a host. Breakers are shared by every session
+    in the process.
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, threshold, reset_after)
+        return _breakers[host]
+
+
+_host_limits: Dict[str, BoundedSemaphore] = {}
+
+
+def get_host_limit(host: str, limit: int) -> BoundedSemaphore:
+    """
+    Get a semaphore that limits how many requests are made to a host at once.
+    Like circuit breakers, these are shared by every session in the process.
+    """
+    with _breakers_lock:
+        if host not in _host_limits:
+            _host_limits[host] = BoundedSemaphore(limit)
+        return _host_limits[host]
+
+
+class TransportAdapter(HTTPAdapter):
+    """
+    A transport adapter that records responses to or replays them from the
+    current cassette (see `get_cassette()`). When there is no cassette, it
+    works just like a normal `HTTPAdapter`.
+
+    Live requests (including ones being recorded) use a default timeout, are
+    retried if they are idempotent and fail in a way that might be temporary,
+    and go through a per-host `CircuitBreaker`. Adjust the class attributes to
+    change how this works.
+
+    Other adapters can support cassettes by inheriting from this, e.g:
+
+    >>> class CachingTransportAdapter(CacheControlAdapter, TransportAdapter):
+    >>>     pass
+    """
+    # (connect, read) timeout in seconds for requests that don't set one.
+    timeout = (10, 60)
+    # How many times to retry a failed request, and the base and maximum
+    # delays for exponential backoff between retries.
+    retries = 3
+    backoff = 1.0
+    backoff_max = 30.0
+    retry_methods = frozenset(('GET', 'HEAD', 'OPTIONS'))
+    retry_statuses = frozenset((429, 500, 502, 503, 504))
+    # Requests in a row that must fail before a host's circuit opens, and how
+    # long it stays open.
+    breaker_threshold = 3
+    breaker_reset = 60.0
+    # How many requests can be made to a host at once, across all sessions
+    # (``None`` for no limit). Requests over the limit wait their turn.
+    host_concurrency: Optional[int] = None
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False,
+             timeout: Any = None, verify: Any = True, cert: Any = None,
+             proxies: Any = None) -> requests.Response:
+        cassette = get_cassette()
+        if timeout is None:
+            timeout = self.timeout
+        if cassette is None:
+            return self.send_live(request, stream, timeout, verify, cert, proxies)
+
+        if cassette.recording:
+            entry = cassette.add_response(
+                self.send_live(request, stream, timeout, verify, cert, proxies))
+        else:
+            entry = cassette.find_response(request)
+            cassette.wait(entry)
+        # When recording, reading the content consumed the live response, so
+        # hand back a copy of the recording, just as we do when replaying.
+        return self.build_cassette_response(request, entry)
+
+    def send_live(self, request: requests.PreparedRequest, stream: bool,
+                  timeout: Any, verify: Any, cert: Any,
+                  proxies: Any) -> requests.Response:
+        """
+        Actually send a request over the network, with retries and circuit
+        breaking.
+        """
+        host = urlparse(request.url).hostname or ''
+        breaker = get_circuit_breaker(host, self.breaker_threshold,
+                                      self.breaker_reset)
+        breaker.check()
+        host_limit: ContextManager[Any] = nullcontext()
+        if self.host_concurrency:
+            host_limit = get_host_limit(host, self.host_concurrency)
+
+        retries = self.retries if request.method in self.retry_methods else 0
+        for attempt in range(retries + 1):
+            last_try = attempt == retries
+            try:
+                # Only hold a slot while actually requesting, not while
+                # waiting to retry.
+                with host_limit:
+                    response = super().send(request, stream, timeout, verify,
+                                            cert, proxies)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if last_try:
+                    breaker.failed()
+                    raise
+            else:
+                if response.status_code not in self.retry_statuses:
+                    breaker.succeeded()
+                    return response
+                if last_try:
+                    # A 429 means the server is healthy, just busy.
+                    if response.status_code >= 500:
+                        breaker.failed()
+                    return response
+                delay = self.retry_delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                continue
+
+            time.sleep(self.retry_delay(attempt))
+
+        raise AssertionError('Unreachable')
+
+    def retry_delay(self, attempt: int,
+                    response: requests.Response = None) -> float:
+        """
+        Get how long to wait before retrying. This uses exponential backoff
+        with "full jitter," so that many clients retrying at once don't all
+        hit the server at the same moment. If the server said how long to wait
+        with a ``Retry-After`` header, that is respected.
+        """
+        retry_after = response and response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff * 2 ** attempt,
+                                     self.backoff_max))
+
+    def build_cassette_response(self, request: requests.PreparedRequest,
+                                entry: Dict[str, Any]) -> requests.Response:
+        if 'body_base64' in entry:
+            body = b64decode(entry['body_base64'])
+        else:
+            body = entry['body'].encode('utf-8')
+
+        raw = HTTPResponse(body=BytesIO(body),
+                           headers=entry['headers'],
+                           status=entry['status'],
+                           reason=entry['reason'],
+                           preload_content=False,
+                           decode_content=False)
+        # Use the normal machinery for building responses, so they behave
+        # exactly like live ones (including streaming, caching, and cookies).
+        return self.build_response(request, raw)
+
+
+def record_span(response: requests.Response, *args: Any,
+                **kwargs: Any) -> None:
+    """
+    A `requests` response hook that records an instrumentation span for each
+    request (see `covid19_sfbayarea.instrumentation`).
+    """
+    if not instrumentation.is_enabled():
+        return
+
+    # Don't read the body of streaming responses just to measure it.
+    size = response.headers.get('Content-Length')
+    if not kwargs.get('stream'):
+        size = len(response.content)
+    instrumentation.record('http', response.elapsed.total_seconds(),
+                           url=response.url,
+                           bytes=int(size) if size is not None else None,
+                           status=response.status_code,
+                           cache_hit=getattr(response, 'from_cache', False))
+
+
+def get_session() -> requests.Session:
+    """
+    Create a `requests.Session` that supports recording and replaying, and
+    records instrumentation spans.
+    """
+    session = requests.Session()
+    session.mount('https://', TransportAdapter())
+    session.mount('http://', TransportAdapter())
+    session.hooks['response'].append(record_span)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = Lock()
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """
+    Make a GET request. This takes the same arguments as `requests.get()`, but
+    supports recording and replaying, and reuses connections across calls
+    (including calls from different threads).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = get_session()
+    return _session.get(url, **kwargs)
@@ -1,14 +1,264 @@
+from contextlib import contextmanager
 from os import getenv
 from selenium import webdriver  # type: ignore
+from selenium.common.exceptions import (NoSuchElementException,  # type: ignore
+                                        TimeoutException,
+                                        WebDriverException)
+from threading import BoundedSemaphore, Lock
+from typing import Any, Iterator, List, Optional, Union
+from . import instrumentation
+from .transport import Cassette, get_cassette
 
 
-def get_firefox() -> webdriver.Firefox:
+# Seconds to wait for a page to load before giving up.
+PAGE_LOAD_TIMEOUT = 120
+
+# Seconds to wait for a browser from a `BrowserPool` before giving up.
+POOL_TIMEOUT = 600
+
+# Anything `get_firefox()` can return. All of them support the parts of the
+# `webdriver.Firefox` API that scrapers use: ``get()``, ``implicitly_wait()``,
+# ``find_element_by_class_name()``, ``page_source``, ``current_url``,
+# ``quit()``, and use in a ``with`` block.
+Browser = Union['Firefox', 'ReplayFirefox', 'RecordingFirefox', 'PooledFirefox']
+
+
+def get_firefox() -> Browser:
     """
     Get a properly configured Firefox webdriver instance.
 
     By default, this returns a headless Firefox. Set the ``FIREFOX_VISIBLE``
     environment variable to anything in order to get a non-headless browser.
+
+    When recording or replaying a cassette (see `covid19_sfbayarea.transport`),
+    the source of every page loaded is recorded, or pages are served from the
+    cassette without starting Firefox at all.
+
+    Starting the browser and each page load are recorded as instrumentation
+    spans (see `covid19_sfbayarea.instrumentation`). Page loads time out after
+    ``PAGE_LOAD_TIMEOUT`` seconds.
+
+    Inside a `use_browser_pool()` block, this borrows an already-running
+    Firefox from the pool instead of starting a new one. Calling ``quit()`` on
+    it (or leaving a ``with`` block) returns it to the pool.
     """
+    cassette = get_cassette()
+    if cassette and not cassette.recording:
+        return ReplayFirefox(cassette)
+
+    driver = _pool.acquire() if _pool else start_firefox()
+    if cassette:
+        return RecordingFirefox(cassette, driver)
+    return driver
+
+
+def start_firefox() -> 'Firefox':
     options = webdriver.FirefoxOptions()
     options.headless = not getenv('FIREFOX_VISIBLE')
-    return webdriver.Firefox(options=options)
+    with instrumentation.span('firefox_start'):
+        driver = Firefox(options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+class Firefox(webdriver.Firefox):  # type: ignore
+    """
+    A `webdriver.Firefox` that records an instrumentation span for each page
+    it loads.
+    """
+
+    def get(self, url: str) -> None:
+        with instrumentation.span('firefox', url=url) as load:
+            super().get(url)
+        # Measure the page after the span ends so that getting the source
+        # doesn't count towards the page's load time.
+        if instrumentation.is_enabled():
+            load.bytes = len(self.page_source)
+
+
+class ReplayFirefox:
+    """
+    Stands in for `webdriver.Firefox`, serving pages from a cassette.
+    """
+
+    def __init__(self, cassette: Cassette) -> None:
+        self.cassette = cassette
+        self.current_url = 'about:blank'
+
+    def __enter__(self) -> 'ReplayFirefox':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.quit()
+
+    @property
+    def page_source(self) -> str:
+        if self.current_url == 'about:blank':
+            return '<html><head></head><body></body></html>'
+        return self.cassette.find_page(self.current_url)
+
+    def get(self, url: str) -> None:
+        with instrumentation.span('firefox', url=url) as load:
+            self.current_url = url
+            load.bytes = len(self.page_source)
+
+    def implicitly_wait(self, seconds: float) -> None:
+        pass
+
+    def find_element_by_class_name(self, name: str) -> 'ReplayFirefox':
+        """
+        Recorded pages have already finished loading, so rather than finding
+        an actual element, this just checks that the class name is present.
+        """
+        if name not in self.page_source:
+            raise NoSuchElementException(f'No element with class "{name}"')
+        return self
+
+    def quit(self) -> None:
+        pass
+
+
+class RecordingFirefox:
+    """
+    Wraps a `webdriver.Firefox` and records the source of each page it loads.
+    """
+
+    def __init__(self, cassette: Cassette,
+                 driver: Union['Firefox', 'PooledFirefox']) -> None:
+        self.cassette = cassette
+        self.driver = driver
+        self.requested_url = 'about:blank'
+
+    def __enter__(self) -> 'RecordingFirefox':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.quit()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.driver, name)
+
+    @property
+    def page_source(self) -> str:
+        source: str = self.driver.page_source
+        # Record under the URL the scraper asked for rather than wherever the
+        # browser wound up, since that's what it will ask for when replaying.
+        if self.requested_url != 'about:blank':
+            self.cassette.add_page(self.requested_url, source)
+        return source
+
+    def get(self, url: str) -> None:
+        self.requested_url = url
+        self.driver.get(url)
+
+    def quit(self) -> None:
+        self.driver.quit()
+
+
+class BrowserPool:
+    """
+    Keeps up to ``size`` Firefox instances running so they can be reused,
+    rather than paying to start a new browser for every scrape. If all of them
+    are in use, `acquire()` waits up to ``timeout`` seconds for one to be
+    released, then raises a `TimeoutException`, so a scraper that never gives
+    its browser back can't block every other scraper forever.
+    """
+
+    def __init__(self, size: int, timeout: float = POOL_TIMEOUT) -> None:
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[Firefox] = []
+        self._available = BoundedSemaphore(size)
+        self._lock = Lock()
+
+    def acquire(self) -> 'PooledFirefox':
+        if not self._available.acquire(timeout=self.timeout):
+            raise TimeoutException(f'No browser was free after {self.timeout} '
+                                   'seconds')
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+        if driver is None:
+            try:
+                driver = start_firefox()
+            except BaseException:
+                self._available.release()
+                raise
+        return PooledFirefox(self, driver)
+
+    def release(self, driver: 'Firefox') -> None:
+        # Reset the browser so nothing from one scrape affects the next. If
+        # that fails, the browser is probably broken, so get rid of it.
+        try:
+            driver.implicitly_wait(0)
+            driver.get('about:blank')
+            driver.delete_all_cookies()
+        except WebDriverException:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        else:
+            with self._lock:
+                self._idle.append(driver)
+        self._available.release()
+
+    def close(self) -> None:
+        """Quit all the browsers that aren't in use."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            driver.quit()
+
+
+class PooledFirefox:
+    """
+    Wraps a `webdriver.Firefox` from a `BrowserPool`, returning it to the pool
+    instead of quitting. If it's garbage collected without being quit (e.g. a
+    scraper raised an error before calling ``quit()``), it's returned then.
+    """
+
+    def __init__(self, pool: BrowserPool, driver: Firefox) -> None:
+        self.pool = pool
+        self.driver: Optional[Firefox] = driver
+
+    def __enter__(self) -> 'PooledFirefox':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.quit()
+
+    def __del__(self) -> None:
+        # `driver` isn't set if `__init__()` failed.
+        if self.__dict__.get('driver') is not None:
+            self.quit()
+
+    def __getattr__(self, name: str) -> Any:
+        if self.driver is None:
+            raise WebDriverException('This browser was returned to the pool')
+        return getattr(self.driver, name)
+
+    def quit(self) -> None:
+        if self.driver is not None:
+            driver, self.driver = self.driver, None
+            self.pool.release(driver)
+
+
+# The browser pool currently in use, if any.
+_pool: Optional[BrowserPool] = None
+
+
+@contextmanager
+def use_browser_pool(size: int,
+                     timeout: float = POOL_TIMEOUT) -> Iterator[BrowserPool]:
+    """
+    Make `get_firefox()` borrow browsers from a pool of up to ``size`` warm
+    browsers inside a ``with`` block. The browsers are quit at the end.
+    """
+    global _pool
+    previous = _pool
+    _pool = BrowserPool(size, timeout)
+    try:
+        yield _pool
+    finally:
+        _pool.close()
+        _pool = previous
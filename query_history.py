@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import click
+import csv
+from covid19_sfbayarea import serialization
+from covid19_sfbayarea.data.history import HistoryStore
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+from typing import Any, Dict, List
+
+
+def write_rows(rows: List[Dict[str, Any]], format: str) -> None:
+    if format == 'json':
+        serialization.dump(rows, sys.stdout.buffer)
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+    elif rows:
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]),
+                                lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@click.command(help='Query the history database written by the --history '
+                    'option of scraper_data.py, hospitals.py, and scraper.py. '
+                    'For example, ICU beds in Marin over the last 90 days: '
+                    '"query_history.py history.db --county marin --series '
+                    'hospitals --field icu_available_beds --days 90"')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--county', help='only get values for this county, e.g. '
+                                '"san_francisco"')
+@click.option('--series', help='only get values in this series, e.g. "cases", '
+                                '"hospitals", or "case_totals.gender"')
+@click.option('--field', help='only get values of this field, e.g. '
+                               '"cumul_cases"')
+@click.option('--since', metavar='YYYY-MM-DD',
+              help='only get values from this date or later')
+@click.option('--until', metavar='YYYY-MM-DD',
+              help='only get values from this date or earlier')
+@click.option('--days', type=int,
+              help='only get values from this many days ago or later')
+@click.option('--format', type=click.Choice(('csv', 'json')), default='csv',
+              show_default=True)
+@click.option('--summary', is_flag=True,
+              help='instead of values, list the counties, series, and fields '
+                   'in the database, and what dates they cover')
+def main(path: str, county: str, series: str, field: str, since: str,
+         until: str, days: int, format: str, summary: bool) -> None:
+    if days is not None:
+        days_ago = (date.today() - timedelta(days=days)).isoformat()
+        since = max(since, days_ago) if since else days_ago
+
+    with HistoryStore(Path(path)) as history:
+        if summary:
+            rows = history.summary()
+        else:
+            rows = history.query(county, series, field, since, until)
+    write_rows(rows, format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+source env/bin/activate;
+python3 query_history.py $@;
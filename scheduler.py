@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+import click
+from datetime import datetime, timedelta
+from covid19_sfbayarea import (artifacts, data as data_scrapers, news,
+                               serialization)
+from covid19_sfbayarea.data.store import CountyStore, scrape_county
+from covid19_sfbayarea.news.feed import WRITERS
+from covid19_sfbayarea.scheduler import Job, Scheduler
+import json
+import logging
+from pathlib import Path
+import signal
+from scraper_data import write_output
+from scraper_faq_sheet import FAQ_GID, FAQ_SHEET, export_faq
+from scraper_news import write_feed
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def parse_intervals(intervals: Tuple[str, ...]) -> Dict[str, float]:
+    result = {}
+    for interval in intervals:
+        name, _, minutes = interval.partition('=')
+        try:
+            result[name] = float(minutes)
+        except ValueError:
+            raise click.BadParameter(f'"{interval}" should look like '
+                                     '"news.alameda=30"')
+    return result
+
+
+def write_json(path: Path, value: Any) -> None:
+    # Write atomically so anything reading the file never sees it
+    # half-written.
+    with artifacts.atomic_open(path) as output_file:
+        serialization.dump(value, output_file)
+
+
+@click.command(help='Keep running the data, news, and FAQ scrapers, each on '
+                    'its own schedule, writing their output to a directory. '
+                    'Jobs are named "data.<county>", "news.<county>", and '
+                    '"faq".')
+@click.option('--output', metavar='PATH', required=True,
+              help='write output files to this directory')
+@click.option('--data-interval', type=float, default=60, show_default=True,
+              help='minutes between runs of each county\'s data scraper')
+@click.option('--news-interval', type=float, default=60, show_default=True,
+              help='minutes between runs of each county\'s news scraper')
+@click.option('--faq-interval', type=float, default=360, show_default=True,
+              help='minutes between runs of the FAQ scraper')
+@click.option('--interval', 'intervals', metavar='JOB=MINUTES', multiple=True,
+              help='minutes between runs of one job, e.g. "news.alameda=30". '
+                   'Use 0 to never run the job. Can be used more than once')
+@click.option('--news-days', type=float, default=31, show_default=True,
+              help='only include news items from this many days ago')
+@click.option('--format', 'formats', default=('json_feed',),
+              type=click.Choice(tuple(WRITERS.keys())), multiple=True,
+              help='news feed formats to write')
+@click.option('--store', 'store_path', metavar='PATH',
+              help='save each county\'s data in this directory, and only '
+                   'scrape counties whose data has changed (see '
+                   'scraper_data.py --store)')
+@click.option('--workers', type=int, default=4, show_default=True,
+              help='how many jobs can run at once')
+@click.option('--browsers', type=int, default=2, show_default=True,
+              help='how many Firefox browsers to keep running for jobs')
+@click.option('--host-concurrency', type=int, default=2, show_default=True,
+              help='how many requests can be made to a host at once')
+@click.option('--jitter', type=float, default=0.1, show_default=True,
+              help='randomly vary each interval by up to this fraction of it')
+@click.option('--status', 'status_path', metavar='PATH',
+              help='write the status of every job to this JSON file whenever '
+                   'one starts or finishes [default: <output>/status.json]')
+@click.option('--compact', is_flag=True,
+              help='write data and news feeds without any extra whitespace, '
+                   'instead of pretty printing them')
+@click.option('--gzip-level', type=click.IntRange(0, 9), default=9,
+              show_default=True,
+              help='also write a gzipped copy of each output file, '
+                   'compressed at this level (0 for no copy)')
+@click.option('--brotli-level', type=click.IntRange(0, 11),
+              help='also write a Brotli-compressed copy of each output file, '
+                   'compressed at this level (0 for no copy). Requires the '
+                   'brotli package. [default: 11 if brotli is installed, '
+                   'otherwise 0]')
+def main(output: str, data_interval: float, news_interval: float,
+         faq_interval: float, intervals: Tuple[str, ...], news_days: float,
+         formats: Tuple[str, ...], store_path: str, workers: int,
+         browsers: int, host_concurrency: int, jitter: float,
+         status_path: str, compact: bool, gzip_level: int,
+         brotli_level: int) -> None:
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    output_path = Path(output)
+    output_path.mkdir(parents=True, exist_ok=True)
+    store = CountyStore(store_path) if store_path else None
+    compression = artifacts.compression_levels(gzip_level, brotli_level)
+
+    # Keep the data for every county in one file, like scraper_data.py. Start
+    # from the last output so counties that haven't run yet aren't dropped.
+    data_lock = Lock()
+    data_path = output_path / 'data.json'
+    data: Dict[str, Dict] = {}
+    if data_path.exists():
+        data = json.loads(data_path.read_text(encoding='utf-8'))
+
+    def data_job(county: str) -> Callable[[], None]:
+        def run() -> None:
+            county_data = scrape_county(county, store)
+            with data_lock:
+                data[county] = county_data
+                write_output(data, output, not compact, compression)
+        return run
+
+    def news_job(county: str) -> Callable[[], None]:
+        def run() -> None:
+            from_date = datetime.now().astimezone() - timedelta(days=news_days)
+            feed = news.scrapers[county].get_news(from_date=from_date)
+            write_feed(feed, county, formats, str(output_path / 'news'),
+                       not compact, compression)
+        return run
+
+    def faq_job() -> None:
+        export_faq(FAQ_SHEET, FAQ_GID, output_path / 'faq.json')
+
+    jobs = [Job(f'data.{county}', data_job(county), data_interval)
+            for county in data_scrapers.scrapers]
+    jobs += [Job(f'news.{county}', news_job(county), news_interval)
+             for county in news.scrapers]
+    jobs.append(Job('faq', faq_job, faq_interval))
+
+    custom_intervals = parse_intervals(intervals)
+    unknown = set(custom_intervals) - {job.name for job in jobs}
+    if unknown:
+        raise click.BadParameter(f'Unknown jobs: {", ".join(sorted(unknown))}',
+                                 param_hint='--interval')
+    for job in jobs:
+        job.interval = custom_intervals.get(job.name, job.interval) * 60
+    jobs = [job for job in jobs if job.interval > 0]
+
+    status_lock = Lock()
+    status_file = Path(status_path) if status_path else output_path / 'status.json'
+    def write_status(status: List[Dict[str, Any]]) -> None:
+        with status_lock:
+            write_json(status_file, status)
+
+    # Requests and Selenium are slow to import, so only import them when
+    # actually running.
+    from covid19_sfbayarea.transport import TransportAdapter
+    from covid19_sfbayarea.webdriver import use_browser_pool
+    TransportAdapter.host_concurrency = host_concurrency
+    # Stop gracefully when stopped by a service manager, just like Ctrl+C.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with use_browser_pool(browsers):
+        Scheduler(jobs, workers, jitter, write_status).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
-import requests
+import click
+from covid19_sfbayarea import serialization, transport
+from covid19_sfbayarea.data.history import HistoryStore, cds_records
 import json
+import sys
 from typing import List, Dict
 
 def get_json() -> List[Dict]:
@@ -9,7 +12,7 @@ def get_json() -> List[Dict]:
     and parses it into a dict
     """
     corona_url = 'https://coronadatascraper.com/timeseries-byLocation.json'
-    raw_response = requests.get(corona_url)
+    raw_response = transport.get(corona_url)
     parsed_json = json.loads(raw_response.content)
     return parsed_json
 
@@ -62,5 +65,21 @@ bay_area_counties = [
     'Napa County, California, US',
     'Marin County, California, US'
 ]
-covid_data = pipeline(bay_area_counties)
-print(json.dumps(covid_data, indent=4))
+
+
+@click.command(help='Print Bay Area county data from the Corona Data Scraper '
+                    'project as JSON.')
+@click.option('--history', 'history_path', metavar='PATH',
+              help='also add the data to this SQLite database (see '
+                   'query_history.py)')
+def main(history_path: str) -> None:
+    covid_data = pipeline(bay_area_counties)
+    if history_path:
+        with HistoryStore(history_path) as history:
+            history.upsert(cds_records(covid_data))
+    serialization.dump(covid_data, sys.stdout.buffer)
+    sys.stdout.buffer.write(b'\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 import click
-import json
+import logging
+import sys
 from covid19_sfbayarea import data as data_scrapers
-from typing import Tuple
+from covid19_sfbayarea.data import columnar
+from covid19_sfbayarea.data.history import HistoryStore, county_records
+from covid19_sfbayarea import (artifacts, instrumentation, profiling,
+                               serialization)
+from covid19_sfbayarea.data.store import (CountyStore, retry_in_background,
+                                          scrape_county)
+from threading import Lock, Thread
+from typing import Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 
 
@@ -15,23 +23,162 @@ COUNTY_NAMES : Tuple[str,...]= tuple(data_scrapers.scrapers.keys())
                 type=click.Choice(COUNTY_NAMES, case_sensitive=False))
 @click.option('--output', metavar='PATH',
               help='write output file to this directory')
-def main(counties: Tuple[str,...], output:str) -> None:
+@click.option('--timings', is_flag=True,
+              help='print a table of how long requests and page loads took')
+@click.option('--timings-output', metavar='PATH',
+              help='write timings for every request and page load to this '
+                   'file (in Prometheus format if it ends in ".prom", '
+                   'otherwise as JSON lines)')
+@click.option('--profile', metavar='PATH',
+              help='profile each county (and writing the output) and write '
+                   'the profiles to this directory, then print the hottest '
+                   'functions')
+@click.option('--store', 'store_path', metavar='PATH',
+              help='save each county\'s output in this directory. If a county '
+                   'fails, use its last saved output (marked as "stale") '
+                   'instead')
+@click.option('--retry-wait', is_flag=True,
+              help='with --store, wait for counties that failed to be retried '
+                   '(for up to about 20 minutes) before exiting. Failed '
+                   'counties are always retried in the background, but '
+                   'without this, the retries stop when everything else is '
+                   'done. The output is updated with any that succeed')
+@click.option('--force', is_flag=True,
+              help='scrape every county, even if its data hasn\'t been '
+                   'updated since the output saved with --store')
+@click.option('--validate', is_flag=True,
+              help='check each county\'s output against the data model, and '
+                   'treat output that doesn\'t match as a failed scrape')
+@click.option('--compact', is_flag=True,
+              help='write JSON without any whitespace, instead of pretty '
+                   'printing it')
+@click.option('--gzip-level', type=click.IntRange(0, 9), default=9,
+              show_default=True,
+              help='also write a gzipped copy of each output file, '
+                   'compressed at this level (0 for no copy)')
+@click.option('--brotli-level', type=click.IntRange(0, 11),
+              help='also write a Brotli-compressed copy of each output file, '
+                   'compressed at this level (0 for no copy). Requires the '
+                   'brotli package. [default: 11 if brotli is installed, '
+                   'otherwise 0]')
+@click.option('--tables', 'tables_path', metavar='PATH',
+              help='also write each county\'s series and demographics as '
+                   'typed tables in this directory, partitioned by date. '
+                   'Requires the pyarrow package')
+@click.option('--tables-format', type=click.Choice(tuple(columnar.FORMATS)),
+              default='arrow', show_default=True,
+              help='file format for --tables: Arrow IPC or Parquet')
+@click.option('--history', 'history_path', metavar='PATH',
+              help='also add every county\'s values to this SQLite database '
+                   '(see query_history.py)')
+def main(counties: Tuple[str,...], output:str, timings: bool, timings_output: str,
+         profile: str, store_path: str, retry_wait: bool, force: bool,
+         validate: bool,
+         compact: bool, gzip_level: int, brotli_level: int, tables_path: str,
+         tables_format: str, history_path: str) -> None:
     out = dict()
     if len(counties) == 0:
         counties = COUNTY_NAMES
+    if retry_wait and not store_path:
+        raise click.UsageError('--retry-wait only works with --store')
+    if tables_path:
+        # Fail before scraping anything if pyarrow isn't installed.
+        try:
+            columnar.import_pyarrow()
+        except ImportError as error:
+            raise click.ClickException(str(error))
+    if timings or timings_output:
+        instrumentation.enable()
+    store = CountyStore(store_path) if store_path else None
+    compression = (artifacts.compression_levels(gzip_level, brotli_level)
+                   if output else None)
+    failed: List[str] = []
 
     # Run each scraper's get_county() method. Assign the output to out[county]
     for county in counties:
-        out[county] = data_scrapers.scrapers[county].get_county()
+        with instrumentation.labels(county=county), \
+                profiling.profile_run(profile, county):
+            try:
+                out[county] = scrape_county(county, store, force, validate)
+            except Exception:
+                # Without a store, one failure stops everything, as always.
+                if not store:
+                    raise
+                logging.exception(f'Scraping {county} failed and there is no '
+                                  'stored data for it')
+                failed.append(county)
+                continue
+            if out[county].get('stale'):
+                failed.append(county)
 
+    wait_for_retries = bool(store and failed and retry_wait)
+    with profiling.profile_run(profile, 'output'):
+        # When printing, wait until the retries are done so we only have to
+        # print everything once.
+        if output or not wait_for_retries:
+            write_output(out, output, not compact, compression)
+        if tables_path:
+            write_tables(out, tables_path, tables_format)
+        if history_path:
+            write_history(out, history_path)
+
+    retries: Optional[Thread] = None
+    if store and failed:
+        # Fill in counties as they succeed.
+        lock = Lock()
+        def update(county: str, data: Dict) -> None:
+            with lock:
+                out[county] = data
+                if output:
+                    write_output(out, output, not compact, compression)
+                if tables_path:
+                    write_tables({county: data}, tables_path, tables_format)
+                if history_path:
+                    write_history({county: data}, history_path)
+        click.echo(f'Retrying {", ".join(failed)} in the background', err=True)
+        retries = retry_in_background(failed, store, update,
+                                      validate=validate)
+
+    if timings:
+        click.echo(instrumentation.summary_table(instrumentation.get_spans()),
+                   err=True)
+    if timings_output:
+        instrumentation.write_spans(timings_output, instrumentation.get_spans())
+
+    if retries and retry_wait:
+        retries.join()
+        if not output:
+            write_output(out, output, not compact)
+
+    missing = [county for county in counties if county not in out]
+    if missing:
+        raise click.ClickException(f'No data for {", ".join(missing)}')
+
+
+def write_output(out: Dict, output: str, pretty: bool = True,
+                 compression: Mapping[str, int] = None) -> None:
     if output:
         parent = Path(output)
         parent.mkdir(exist_ok = True) # if output directory does not exist, create it
-        with parent.joinpath('data.json').open('w', encoding='utf-8') as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+        with artifacts.open_artifact(parent / 'data.json', compression) as f:
+            serialization.dump(out, f, pretty)
 
     else:
-        print(json.dumps(out,indent=2))
+        serialization.dump(out, sys.stdout.buffer, pretty)
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+
+
+def write_tables(out: Dict, path: str, format: str) -> None:
+    for county, data in out.items():
+        columnar.export_tables(data, path, format, county=county)
+
+
+def write_history(out: Dict, path: str) -> None:
+    with HistoryStore(path) as history:
+        for county, data in out.items():
+            history.upsert(county_records(county, data))
+
 
 if __name__ == '__main__':
     main()
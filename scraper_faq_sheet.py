@@ -13,74 +13,318 @@ Grabs data from the 'FAQ Content' CSV and turns it into nice JSON: a main faq ob
     etc
 In addition to an array of Question objects, each Section incorporates its title and a 'last updated' date value. For the Python intermediary stage (between CSV stream  and JSON) we will create a hierarchy of nested dictionaries and lists equivalent to the JSON objects and arrays.
 
-Execute with: $ python3 scraper_faq_sheet.py > path/to/where/I/want/faq_json
+Execute with: $ python3 scraper_faq_sheet.py --output path/to/where/I/want/faq.json
+
+When writing to a file, sections keep their 'last updated' date from the existing file unless their content changed, and the file is only rewritten if something changed.
+
+To export several tabs (e.g. translations) at once, each to its own file: $ python3 scraper_faq_sheet.py --output path/to/faq_dir --tab en=1318925039 --tab es=SHEET_ID:GID --index
 """
 
 #!/usr/bin/env python3
-import requests
+import click
+from concurrent.futures import ThreadPoolExecutor
+from covid19_sfbayarea import profiling
+from covid19_sfbayarea.artifacts import atomic_open
+import io
 import json
 import csv
 import datetime
+import hashlib
+from pathlib import Path
 import sys
-from typing import Iterable, Dict, List, Any
+from textwrap import indent
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, TextIO, Tuple, TYPE_CHECKING)
 
+if TYPE_CHECKING:
+    import requests
 
-# function to grab data from a google sheet + return as reader object
-def google_sheet_csv_data(sheet: str, gid: str) -> Iterable[List[str]]:
+
+# Response headers that identify a version of the sheet, and the request
+# headers used to ask for the sheet only if it differs from that version.
+VALIDATORS = {'ETag': 'If-None-Match', 'Last-Modified': 'If-Modified-Since'}
+
+
+# function to request the CSV for a google sheet (only if it has changed from
+# the version identified by `validators`, if given)
+def request_google_sheet_csv(sheet: str, gid: str,
+                             validators: Dict[str, str] = None) -> 'requests.Response':
+    # Requests is slow to import, so wait until we actually need it.
+    from covid19_sfbayarea import transport
     url = f'https://docs.google.com/spreadsheets/d/{sheet}/export'
-    response = requests.get(url, params={
+    headers = {VALIDATORS[name]: value
+               for name, value in (validators or {}).items()}
+    response = transport.get(url, headers=headers, stream=True, params={
         'format': 'csv',
         'id': sheet,
         'gid': gid
     })
     response.raise_for_status()
+    return response
+
+
+def csv_rows(response: 'requests.Response') -> Iterable[List[str]]:
+    # Stream the rows rather than loading the whole sheet.
+    response.encoding = response.encoding or 'utf-8'
     return csv.reader(response.iter_lines(decode_unicode=True))
 
 
-# Pass faq Content sheet id and gid to function
-_reader = google_sheet_csv_data(
-    '1_wBXS62S5oBQrwetGc8_-dFvDjEmNqzqHwUeP-DzkYs',
-    '1318925039'
- )
-
-# Date, to be updated each time the program runs, in UTC
-date = datetime.datetime.utcnow().strftime('%Y-%m-%d')
-
-# Create the main FAQ dictionary
-# Create a list to contain our Section objects
-# Place the Sections list inside the main FAQ dictionary
-faq_dict = {}
-sections_list: List[Dict] = []
-faq_dict['faqItems'] = sections_list
-
-# Ensure only first two columns in each row are used
-# Now arrange the Sections and Questions in a JSON-friendly way
-for index, row in enumerate(_reader):
-    rowtype, rowval, *_rest = row
-    if rowtype == 'Category':   # We don't need this row
-        pass
-    elif rowtype == 'Section Head':
-        section: Dict[str, Any] = {}   # Create a dictionary for a Section
-        sections_list.append(section)   # Add new Section to Sections list
-        section['title'] = rowval   # Give the Section its title
-        section['lastUpdatedAt'] = date   # a 'last updated' value
-        questions_list: List[Dict] = []   # Create list to contain questions
-        section['qa'] = questions_list   # add new Questions list to its Section
-    elif rowtype == 'Q':
-        question = {}   # Create new Question dictionary
-        question['q'] = rowval   # the Question's title
-        questions_list.append(question)   # Append Question to given Section
-    elif rowtype == 'A':   # Now the same for Answers & Links
-        question['a'] = rowval
-    elif rowtype == 'link':
-        question['url'] = rowval
-    elif rowtype == '':   # Some safeguards
-        pass
-    elif rowval and not rowtype:
-        raise ValueError(f'row {index} has a value but no description!')
-    else:
-        raise ValueError(f'Unknown row header: "{rowtype}"')
-
-# Create formatted json file; write to file object ready to be assigned destination at execution
-faq_json = json.dumps(faq_dict, indent=2)
-sys.stdout.write(faq_json)
+# function to grab data from a google sheet + return as reader object
+def google_sheet_csv_data(sheet: str, gid: str) -> Iterable[List[str]]:
+    return csv_rows(request_google_sheet_csv(sheet, gid))
+
+
+# The FAQ Content sheet's id and gid
+FAQ_SHEET = '1_wBXS62S5oBQrwetGc8_-dFvDjEmNqzqHwUeP-DzkYs'
+FAQ_GID = '1318925039'
+
+
+def parse_sections(rows: Iterable[List[str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Arrange the rows of the FAQ Content sheet into Sections and Questions,
+    yielding each Section as soon as all its rows have been read. Sections do
+    not have a 'last updated' date yet (see `date_sections()`).
+    """
+    section: Optional[Dict[str, Any]] = None
+
+    # Ensure only first two columns in each row are used
+    # Now arrange the Sections and Questions in a JSON-friendly way
+    for index, row in enumerate(rows):
+        rowtype, rowval, *_rest = row
+        if rowtype == 'Category':   # We don't need this row
+            pass
+        elif rowtype == 'Section Head':
+            if section:
+                yield section
+            section = {}   # Create a dictionary for a Section
+            section['title'] = rowval   # Give the Section its title
+            questions_list: List[Dict] = []   # Create list to contain questions
+            section['qa'] = questions_list   # add new Questions list to its Section
+        elif rowtype == 'Q':
+            question = {}   # Create new Question dictionary
+            question['q'] = rowval   # the Question's title
+            questions_list.append(question)   # Append Question to given Section
+        elif rowtype == 'A':   # Now the same for Answers & Links
+            question['a'] = rowval
+        elif rowtype == 'link':
+            question['url'] = rowval
+        elif rowtype == '':   # Some safeguards
+            pass
+        elif rowval and not rowtype:
+            raise ValueError(f'row {index} has a value but no description!')
+        else:
+            raise ValueError(f'Unknown row header: "{rowtype}"')
+
+    if section:
+        yield section
+
+
+def section_hash(section: Dict[str, Any]) -> str:
+    """Get a hash of a Section's content (ignoring its 'last updated' date)."""
+    content = {'title': section['title'], 'qa': section['qa']}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def date_sections(sections: Iterable[Dict[str, Any]],
+                  previous: Iterable[Dict[str, Any]] = (),
+                  changes: List[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Add a 'last updated' date to each Section: today's date (in UTC) if the
+    Section is new or has changed since the ``previous`` version of the FAQ,
+    or its date from the previous version if not. The hash of each Section
+    (see `section_hash()`) is appended to ``changes``, if given.
+    """
+    # Date, to be updated each time a section changes, in UTC
+    date = datetime.datetime.utcnow().strftime('%Y-%m-%d')
+    previous_dates = {section_hash(section): section.get('lastUpdatedAt')
+                      for section in previous}
+    for section in sections:
+        content_hash = section_hash(section)
+        if changes is not None:
+            changes.append(content_hash)
+        yield {
+            'title': section['title'],
+            'lastUpdatedAt': previous_dates.get(content_hash) or date,   # a 'last updated' value
+            'qa': section['qa'],
+        }
+
+
+def parse_faq(rows: Iterable[List[str]]) -> Dict[str, List[Dict]]:
+    """
+    Arrange the rows of the FAQ Content sheet into Sections and Questions.
+    """
+    return {'faqItems': list(date_sections(parse_sections(rows)))}
+
+
+def get_faq() -> Dict[str, List[Dict]]:
+    return parse_faq(google_sheet_csv_data(FAQ_SHEET, FAQ_GID))
+
+
+def write_faq(sections: Iterable[Dict[str, Any]], stream: TextIO) -> None:
+    """
+    Write the FAQ as JSON, one Section at a time, so the whole FAQ never has
+    to be in memory. The output is identical to ``json.dumps(faq, indent=2)``.
+    """
+    stream.write('{\n  "faqItems": [')
+    separator = '\n'
+    for section in sections:
+        stream.write(separator)
+        stream.write(indent(json.dumps(section, indent=2), '    '))
+        separator = ',\n'
+    stream.write('\n  ]\n}' if separator == ',\n' else ']\n}')
+
+
+def validators_path(output: Path) -> Path:
+    return output.with_name(f'{output.name}.http.json')
+
+
+class Unchanged(Exception):
+    """
+    Raised while writing the FAQ if it turns out to be unchanged, so that
+    `atomic_open()` leaves the existing file alone.
+    """
+
+
+def export_faq(sheet: str, gid: str, output: Path) -> bool:
+    """
+    Update the FAQ JSON file at ``output`` from a sheet. The sheet is only
+    downloaded if it has changed since the last export, and the file is only
+    rewritten if its content changed. Returns whether the file was written.
+    """
+    previous: List[Dict[str, Any]] = []
+    validators: Dict[str, str] = {}
+    if output.exists():
+        previous = json.loads(output.read_text(encoding='utf-8'))['faqItems']
+        if validators_path(output).exists():
+            validators = json.loads(validators_path(output).read_text(encoding='utf-8'))
+
+    response = request_google_sheet_csv(sheet, gid, validators)
+    if response.status_code == 304:
+        return False
+
+    # The output is written atomically, so it is never half-written, and can
+    # be left alone if nothing changed.
+    hashes: List[str] = []
+    output.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with atomic_open(output) as stream:
+            output_file = io.TextIOWrapper(stream, encoding='utf-8')
+            write_faq(date_sections(parse_sections(csv_rows(response)),
+                                    previous, hashes),
+                      output_file)
+            output_file.detach()
+            if hashes == [section_hash(section) for section in previous]:
+                raise Unchanged()
+        changed = True
+    except Unchanged:
+        changed = False
+
+    new_validators = {name: response.headers[name]
+                      for name in VALIDATORS if name in response.headers}
+    if new_validators != validators:
+        with atomic_open(validators_path(output)) as stream:
+            stream.write(json.dumps(new_validators).encode('utf-8'))
+    return changed
+
+
+class Tab(NamedTuple):
+    """A tab of a Google Sheet with FAQ content (e.g. a translation)."""
+    name: str
+    sheet: str
+    gid: str
+
+
+def cli_tab(value: str) -> Tab:
+    """Parse a CLI tab, in the form ``NAME=GID`` or ``NAME=SHEET:GID``."""
+    name, _, location = value.partition('=')
+    sheet, _, gid = location.rpartition(':')
+    if not name or not gid:
+        raise click.BadParameter(f'"{value}" should look like "NAME=GID" or '
+                                 '"NAME=SHEET:GID"')
+    return Tab(name, sheet or FAQ_SHEET, gid)
+
+
+# How many tabs to download at once.
+MAX_WORKERS = 8
+
+
+def get_tabs(tabs: Sequence[Tab]) -> Dict[str, Dict[str, List[Dict]]]:
+    """Download and parse several tabs at once."""
+    with ThreadPoolExecutor(min(len(tabs), MAX_WORKERS) or 1) as executor:
+        faqs = executor.map(
+            lambda tab: parse_faq(google_sheet_csv_data(tab.sheet, tab.gid)),
+            tabs)
+        return dict(zip((tab.name for tab in tabs), faqs))
+
+
+def export_tabs(tabs: Sequence[Tab], directory: Path,
+                index: bool = False) -> List[str]:
+    """
+    Export several tabs at once, each to ``<directory>/<name>.json`` (see
+    `export_faq()`). If ``index`` is true, all the tabs are also combined
+    into ``<directory>/index.json``. Returns the names of the tabs that
+    changed.
+    """
+    with ThreadPoolExecutor(min(len(tabs), MAX_WORKERS) or 1) as executor:
+        results = executor.map(
+            lambda tab: export_faq(tab.sheet, tab.gid, directory / f'{tab.name}.json'),
+            tabs)
+        changed = [tab.name for tab, tab_changed in zip(tabs, results)
+                   if tab_changed]
+
+    index_path = directory / 'index.json'
+    if index and (changed or not index_path.exists()):
+        combined = {tab.name: json.loads((directory / f'{tab.name}.json')
+                                         .read_text(encoding='utf-8'))
+                    for tab in tabs}
+        with atomic_open(index_path) as stream:
+            stream.write(json.dumps(combined, indent=2).encode('utf-8'))
+    return changed
+
+
+@click.command(help='Print the COVID-19 FAQ from Google Sheets as JSON.')
+@click.option('--output', metavar='PATH',
+              help='write the FAQ to this file instead of printing it. The '
+                   'file is only rewritten if the FAQ changed. With --tab, '
+                   'this is a directory, and each tab is written to '
+                   '<PATH>/<NAME>.json. The sheet\'s ETag and Last-Modified '
+                   'headers are saved next to each file (in '
+                   '<FILE>.http.json), so the sheet is only downloaded again '
+                   'if it changed. Without this option, the sheet is always '
+                   'downloaded')
+@click.option('--tab', 'tabs', metavar='NAME=[SHEET:]GID', type=cli_tab,
+              multiple=True,
+              help='get this tab (e.g. a translation) instead of the main FAQ. '
+                   'The sheet defaults to the FAQ Content sheet. Can be used '
+                   'more than once; tabs are downloaded at the same time')
+@click.option('--index', is_flag=True,
+              help='with --tab and --output, also combine all the tabs into '
+                   '<PATH>/index.json')
+@click.option('--profile', metavar='PATH',
+              help='profile the run and write the profile to this directory, '
+                   'then print the hottest functions')
+def main(output: str, tabs: Tuple[Tab, ...], index: bool, profile: str) -> None:
+    names = [tab.name for tab in tabs]
+    if len(set(names)) < len(names):
+        raise click.BadParameter('each tab must have a different name',
+                                 param_hint='--tab')
+
+    with profiling.profile_run(profile, 'faq'):
+        if tabs and output:
+            changed = export_tabs(tabs, Path(output), index)
+            unchanged = [tab.name for tab in tabs if tab.name not in changed]
+            if unchanged:
+                click.echo(f'Not changed: {", ".join(unchanged)}', err=True)
+        elif tabs:
+            sys.stdout.write(json.dumps(get_tabs(tabs), indent=2))
+        elif output:
+            if not export_faq(FAQ_SHEET, FAQ_GID, Path(output)):
+                click.echo('The FAQ has not changed', err=True)
+        else:
+            # Create formatted json; write it to stdout as it's parsed
+            sections = parse_sections(google_sheet_csv_data(FAQ_SHEET, FAQ_GID))
+            write_faq(date_sections(sections), sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
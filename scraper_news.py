@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 import click
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from covid19_sfbayarea import news
-from covid19_sfbayarea.news.utils import parse_datetime
+from covid19_sfbayarea import artifacts, instrumentation, news, profiling
+from covid19_sfbayarea.news.feed import NewsFeed, WRITERS
 from pathlib import Path
-from typing import cast, Tuple
+import sys
+from typing import cast, Iterable, Mapping, Tuple
 
 
 COUNTY_NAMES = cast(Tuple[str], tuple(news.scrapers.keys()))
@@ -12,6 +14,9 @@ COUNTY_NAMES = cast(Tuple[str], tuple(news.scrapers.keys()))
 
 def cli_date(date_string: str) -> datetime:
     '''Parse a CLI date or number of days into a TZ-aware datetime.'''
+    # Imported here since it's slow and not needed just to print --help.
+    from covid19_sfbayarea.news.utils import parse_datetime
+
     try:
         days = float(date_string)
         if days <= 0:
@@ -39,36 +44,75 @@ def cli_date(date_string: str) -> datetime:
                    'a date, you can specify a number of days ago, e.g. "14" '
                    'for 2 weeks ago.')
 @click.option('--format', default=('json_feed',),
-              type=click.Choice(('json_feed', 'json_simple', 'rss')),
+              type=click.Choice(tuple(WRITERS.keys())),
               multiple=True)
 @click.option('--output', metavar='PATH',
               help='write output file(s) to this directory')
-def main(counties: Tuple[str], from_: datetime, format: str, output: str) -> None:
+@click.option('--timings', is_flag=True,
+              help='print a table of how long requests and parsing took')
+@click.option('--timings-output', metavar='PATH',
+              help='write timings for every request and page parsed to this '
+                   'file (in Prometheus format if it ends in ".prom", '
+                   'otherwise as JSON lines)')
+@click.option('--profile', metavar='PATH',
+              help='profile each county and write the profiles to this '
+                   'directory, then print the hottest functions')
+@click.option('--compact', is_flag=True,
+              help='write feeds without any extra whitespace, instead of '
+                   'pretty printing them')
+@click.option('--gzip-level', type=click.IntRange(0, 9), default=9,
+              show_default=True,
+              help='also write a gzipped copy of each output file, '
+                   'compressed at this level (0 for no copy)')
+@click.option('--brotli-level', type=click.IntRange(0, 11),
+              help='also write a Brotli-compressed copy of each output file, '
+                   'compressed at this level (0 for no copy). Requires the '
+                   'brotli package. [default: 11 if brotli is installed, '
+                   'otherwise 0]')
+def main(counties: Tuple[str], from_: datetime, format: str, output: str,
+         timings: bool, timings_output: str, profile: str,
+         compact: bool, gzip_level: int, brotli_level: int) -> None:
     if len(counties) == 0:
         counties = COUNTY_NAMES
+    if timings or timings_output:
+        instrumentation.enable()
+    compression = (artifacts.compression_levels(gzip_level, brotli_level)
+                   if output else None)
 
     # Do the work!
     for county in counties:
-        feed = news.scrapers[county].get_news(from_date=from_)
+        with instrumentation.labels(county=county), \
+                profiling.profile_run(profile, county):
+            feed = news.scrapers[county].get_news(from_date=from_)
+            write_feed(feed, county, format, output, not compact, compression)
+
+    if timings:
+        click.echo(instrumentation.summary_table(instrumentation.get_spans()),
+                   err=True)
+    if timings_output:
+        instrumentation.write_spans(timings_output, instrumentation.get_spans())
 
-        for format_name in format:
-            if format_name == 'json_simple':
-                data = feed.format_json_simple()
-                extension = '.simple.json'
-            elif format_name == 'json_feed':
-                data = feed.format_json_feed()
-                extension = '.json'
-            else:
-                data = feed.format_rss()
-                extension = '.rss'
 
-            if output:
-                parent = Path(output)
-                parent.mkdir(exist_ok=True)
-                with parent.joinpath(f'{county}{extension}').open('wb') as f:
-                    f.write(data)
-            else:
-                print(data)
+def write_feed(feed: NewsFeed, county: str, formats: Iterable[str],
+               output: str, pretty: bool = True,
+               compression: Mapping[str, int] = None) -> None:
+    if output:
+        parent = Path(output)
+        parent.mkdir(exist_ok=True)
+        # Write all the formats in one pass over the feed.
+        with ExitStack() as stack:
+            streams = {
+                format_name: stack.enter_context(artifacts.open_artifact(
+                    parent / f'{county}{WRITERS[format_name].extension}',
+                    compression))
+                for format_name in formats
+            }
+            feed.write(streams, pretty)
+    else:
+        for format_name in formats:
+            feed.write({format_name: sys.stdout.buffer}, pretty)
+            sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
 
 
 if __name__ == '__main__':
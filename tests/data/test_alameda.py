@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in alameda.py
+"""
+
+from covid19_sfbayarea.data import alameda
+from covid19_sfbayarea.data.demographics import DEMOGRAPHICS
+from covid19_sfbayarea.data.utils import get_data_model
+
+
+class FakeResponse:
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'features': [{'attributes': self.attributes}]}
+
+
+class FakeMetadata:
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'editingInfo': {'lastEditDate': self.timestamp}}
+
+
+def test_get_update_time_includes_demographics(monkeypatch):
+    responses = {alameda.cases_meta: FakeMetadata(1590969600000),
+                 alameda.demographics_meta: FakeMetadata(1591056000000)}
+    monkeypatch.setattr(alameda.transport, 'get',
+                        lambda url, **kwargs: responses[url])
+    assert alameda.get_update_time() == ('2020-06-01T00:00:00+00:00',
+                                         '2020-06-02T00:00:00+00:00')
+
+
+def demographics_source():
+    cases = {'Geography': 'Alameda County'}
+    deaths = {'Geography': 'Alameda County'}
+    for label_map in DEMOGRAPHICS['alameda'].values():
+        for label in label_map.labels:
+            cases[label] = 20
+            if label not in ('MTF', 'FTM'):
+                deaths[f'Deaths_{label}'] = 11
+    return cases, deaths
+
+
+def get_demographics(monkeypatch, cases, deaths):
+    responses = {alameda.demographics_cases: FakeResponse(cases),
+                 alameda.demographics_deaths: FakeResponse(deaths)}
+    monkeypatch.setattr(alameda.transport, 'get',
+                        lambda url, **kwargs: responses[url])
+    return alameda.get_demographics(get_data_model())
+
+
+def test_get_demographics(monkeypatch):
+    cases, deaths = demographics_source()
+    cases.update(Female=7, Asian=None)
+    demo_totals, counts_lt_10 = get_demographics(monkeypatch, cases, deaths)
+
+    assert counts_lt_10 == []
+    assert demo_totals['case_totals']['gender']['female'] == 7
+    assert demo_totals['case_totals']['race_eth']['Asian'] == -1
+    assert demo_totals['death_totals']['race_eth']['Asian'] == 11
+    assert demo_totals['case_totals']['age_group'][0] == {
+        'group': '18_and_under', 'raw_count': 20}
+
+
+def test_counts_under_10_are_listed_by_category(monkeypatch):
+    cases, deaths = demographics_source()
+    cases.update(Female='<10', Asian='<10', Age_18_30='<10', New_Label='<10')
+    deaths.update(Deaths_Male='<10', Deaths_Multirace='<10',
+                  Deaths_Unknown_Age='<10')
+    _, counts_lt_10 = get_demographics(monkeypatch, cases, deaths)
+
+    assert counts_lt_10 == [
+        'case_totals.gender.Female',
+        'case_totals.race.Asian',
+        'case_totals.age_group.Age_18_30',
+        'case_totals.other.New_Label',
+        'death_totals.gender.Deaths_Male',
+        'death_totals.race.Deaths_Multirace',
+        'death_totals.age_group.Deaths_Unknown_Age',
+    ]
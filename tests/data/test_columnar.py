@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in columnar.py
+"""
+
+from datetime import date, datetime, timezone
+import pytest
+from covid19_sfbayarea.data.columnar import (Column, export_tables,
+                                             get_columns, get_tables,
+                                             read_table)
+
+
+OUTPUT = {
+    'name': 'Fake County',
+    'update_time': '2020-06-01T12:00:00-07:00',
+    'series': {
+        'cases': [{'date': '2020-05-31', 'cases': 3, 'cumul_cases': 7},
+                  {'date': '2020-06-01', 'cases': 1, 'cumul_cases': 8}],
+        'tests': [],
+    },
+    'case_totals': {
+        'gender': {'female': 5, 'male': '<10'},
+        'age_group': [{'group': '18_to_30', 'raw_count': 4.0}],
+    },
+}
+UPDATE_TIME = datetime(2020, 6, 1, 19, tzinfo=timezone.utc)
+
+
+def test_tables_follow_data_model():
+    tables = get_tables()
+    assert tables['series_cases'].columns == (
+        Column('date', 'date'), Column('cases', 'count'),
+        Column('cumul_cases', 'count'))
+    assert not tables['case_totals_gender'].is_list
+    # Empty lists in the template borrow their columns from other lists.
+    assert tables['case_totals_age_group'].columns == (
+        Column('group', 'string'), Column('raw_count', 'count'))
+    assert list(get_tables('hospitals_data_model')) == ['series']
+
+
+def test_get_columns():
+    columns = get_columns(OUTPUT, county='fake')
+    assert list(columns) == ['series_cases', 'case_totals_gender',
+                             'case_totals_age_group']
+    assert {column.name: values for column, values in columns['series_cases'].items()} == {
+        'county': ['fake', 'fake'],
+        'update_time': [UPDATE_TIME, UPDATE_TIME],
+        'date': [date(2020, 5, 31), date(2020, 6, 1)],
+        'cases': [3, 1],
+        'cumul_cases': [7, 8],
+    }
+    gender = {column.name: values for column, values in columns['case_totals_gender'].items()}
+    assert gender['female'] == [5]
+    assert gender['male'] == [None]
+    assert gender['unknown'] == [None]
+
+
+@pytest.mark.parametrize('format', ['arrow', 'parquet'])
+def test_export_tables(tmp_path, format):
+    pytest.importorskip('pyarrow')
+    paths = export_tables(OUTPUT, tmp_path, format, county='fake')
+    assert paths[0] == (tmp_path / 'series_cases' / 'snapshot_date=2020-06-01'
+                        / f'fake-20200601T190000Z.{format}')
+    # Exporting the same data again overwrites the same files.
+    assert export_tables(OUTPUT, tmp_path, format, county='fake') == paths
+
+    cases = read_table(tmp_path, 'series_cases', format).to_pydict()
+    assert cases['cumul_cases'] == [7, 8]
+    assert cases['date'] == [date(2020, 5, 31), date(2020, 6, 1)]
+    assert cases['snapshot_date'] == [date(2020, 6, 1)] * 2
+
+
+def test_export_tables_partitions_by_utc_date(tmp_path):
+    pytest.importorskip('pyarrow')
+    # 8 PM Pacific time is the next day in UTC.
+    output = {**OUTPUT, 'update_time': '2020-06-01T20:00:00-07:00'}
+    paths = export_tables(output, tmp_path, 'arrow', county='fake')
+    assert paths[0] == (tmp_path / 'series_cases' / 'snapshot_date=2020-06-02'
+                        / 'fake-20200602T030000Z.arrow')
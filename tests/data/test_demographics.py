@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in demographics.py
+"""
+
+import pytest
+from covid19_sfbayarea.data.demographics import DEMOGRAPHICS, get_category, LabelMap
+from covid19_sfbayarea.errors import FormatError
+
+
+def test_rekey_adds_up_labels_with_the_same_target():
+    genders = DEMOGRAPHICS['san_francisco']['gender']
+    counts = [('Female', 10), ('Trans Female', 1), ('Male', 12)]
+    assert genders.rekey(counts) == {'female': 11, 'male': 12}
+    assert genders.rekey(counts, initial=0) == {'female': 11, 'male': 12, 'unknown': 0}
+
+
+def test_unknown_labels_are_reported_together():
+    genders = DEMOGRAPHICS['san_francisco']['gender']
+    with pytest.raises(FormatError, match='"Nonbinary", "Agender"'):
+        genders.rekey([('Female', 1), ('Nonbinary', 2), ('Agender', 3)])
+
+    with_default = LabelMap('gender', {'female': 'female'}, default='unknown')
+    assert with_default.rekey([('female', 1), (None, 2)]) == {'female': 1, 'unknown': 2}
+
+
+def test_table():
+    ages = LabelMap('age_group', {'under 18': '18_and_under', '18+': '18_and_older'})
+    assert ages.table({'under 18': 5, '18+': 7}) == [
+        {'group': '18_and_under', 'raw_count': 5},
+        {'group': '18_and_older', 'raw_count': 7},
+    ]
+    assert ages.table({'Deaths_under 18': 1}, 'Deaths_', required=False) == [
+        {'group': '18_and_under', 'raw_count': 1},
+        {'group': '18_and_older', 'raw_count': None},
+    ]
+    with pytest.raises(FormatError, match='"Deaths_18\\+"'):
+        ages.table({'Deaths_under 18': 1}, 'Deaths_')
+
+
+def test_get_category():
+    assert get_category('alameda', 'Unknown_Sex') == 'gender'
+    assert get_category('alameda', 'Age_LT18') == 'age_group'
+    assert get_category('alameda', 'Geography') is None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in history.py
+"""
+
+from covid19_sfbayarea.data.history import (HistoryStore, Record, cds_records,
+                                            county_records, hospital_records)
+
+
+COUNTY_OUTPUT = {
+    'update_time': '2020-06-01T12:00:00-07:00',
+    'series': {
+        'cases': [{'date': '2020-05-31', 'cases': 3, 'cumul_cases': 7}],
+    },
+    'case_totals': {
+        'gender': {'female': 5, 'other': -1},
+        'age_group': [{'group': '18_to_30', 'raw_count': '<10'}],
+    },
+    'population_totals': {'total_pop': 1000},
+}
+UPDATE_TIME = '2020-06-01T19:00:00+00:00'
+
+
+def test_county_records():
+    assert list(county_records('alameda', COUNTY_OUTPUT)) == [
+        Record('alameda', 'cases', '2020-05-31', 'cases', 3, UPDATE_TIME),
+        Record('alameda', 'cases', '2020-05-31', 'cumul_cases', 7, UPDATE_TIME),
+        Record('alameda', 'case_totals.gender', '2020-06-01', 'female', 5, UPDATE_TIME),
+        Record('alameda', 'case_totals.gender', '2020-06-01', 'other', None, UPDATE_TIME),
+        Record('alameda', 'case_totals.age_group', '2020-06-01', '18_to_30', None, UPDATE_TIME),
+        Record('alameda', 'population_totals', '2020-06-01', 'total_pop', 1000, UPDATE_TIME),
+    ]
+
+
+def test_county_records_date_totals_in_utc():
+    # 8 PM Pacific time is the next day in UTC.
+    output = {**COUNTY_OUTPUT, 'update_time': '2020-06-01T20:00:00-07:00'}
+    totals = [record for record in county_records('alameda', output)
+              if record.series == 'population_totals']
+    assert totals == [Record('alameda', 'population_totals', '2020-06-02',
+                             'total_pop', 1000, '2020-06-02T03:00:00+00:00')]
+
+
+def test_hospital_and_cds_records():
+    hospitals = {'update_time': '2020-06-01T19:00+00:00', 'series': [
+        {'_id': 1, 'county': 'San Francisco', 'report_date': '2020-05-31',
+         'icu_available_beds': 20},
+    ]}
+    assert list(hospital_records(hospitals)) == [
+        Record('san_francisco', 'hospitals', '2020-05-31', 'icu_available_beds', 20, UPDATE_TIME),
+    ]
+
+    cds = {'Marin County': {'name': 'Marin County', 'cases': [
+        {'date': '2020-05-31', 'cases': 10},
+    ]}}
+    assert list(cds_records(cds, UPDATE_TIME)) == [
+        Record('marin', 'cds', '2020-05-31', 'cases', 10, UPDATE_TIME),
+    ]
+
+
+def test_upsert_and_query(tmp_path):
+    path = tmp_path / 'history.db'
+    with HistoryStore(path) as history:
+        mode = history.connection.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+        history.upsert(county_records('alameda', COUNTY_OUTPUT))
+        history.upsert([
+            Record('marin', 'hospitals', f'2020-05-{day:02}', 'icu_available_beds',
+                   day, UPDATE_TIME)
+            for day in range(1, 32)
+        ])
+        # Newer values replace older ones, but not the other way around.
+        history.upsert([
+            Record('alameda', 'cases', '2020-05-31', 'cases', 4, '2020-06-02T00:00:00+00:00'),
+            Record('alameda', 'cases', '2020-05-31', 'cumul_cases', 1, '2020-05-01T00:00:00+00:00'),
+        ])
+
+    with HistoryStore(path) as history:
+        cases = history.query(county='alameda', series='cases')
+        assert [(row['field'], row['value']) for row in cases] == [('cases', 4), ('cumul_cases', 7)]
+
+        beds = history.query('marin', 'hospitals', 'icu_available_beds',
+                             since='2020-05-20', until='2020-05-22')
+        assert [row['value'] for row in beds] == [20, 21, 22]
+
+        summary = {(row['county'], row['series'], row['field']): row
+                   for row in history.summary()}
+        assert summary['marin', 'hospitals', 'icu_available_beds']['count'] == 31
+        assert summary['marin', 'hospitals', 'icu_available_beds']['last_date'] == '2020-05-31'
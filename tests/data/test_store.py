@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in store.py
+"""
+
+import pytest
+from types import SimpleNamespace
+from covid19_sfbayarea import data
+from covid19_sfbayarea.data.store import (CountyStore, retry_in_background,
+                                          scrape_county)
+from covid19_sfbayarea.errors import FormatError
+
+
+GOOD_OUTPUT = {'name': 'Fake County', 'update_time': '2020-06-01T00:00:00+00:00'}
+
+
+def failing_county():
+    raise FormatError('The age groups changed!')
+
+
+def test_scrape_county_saves_output(tmp_path, monkeypatch):
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(get_county=lambda: GOOD_OUTPUT))
+    store = CountyStore(tmp_path)
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+    assert store.load('fake') == GOOD_OUTPUT
+
+
+def test_scrape_county_uses_stored_output_when_scraper_fails(tmp_path, monkeypatch):
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(get_county=failing_county))
+    store = CountyStore(tmp_path)
+    store.save('fake', GOOD_OUTPUT)
+    assert scrape_county('fake', store) == {**GOOD_OUTPUT, 'stale': True}
+
+    with pytest.raises(FormatError):
+        scrape_county('fake', CountyStore(tmp_path / 'empty'))
+
+
+def test_retry_in_background(tmp_path, monkeypatch):
+    results = [FormatError('Still broken'), GOOD_OUTPUT]
+
+    def get_county():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(get_county=get_county))
+    store = CountyStore(tmp_path)
+    succeeded = {}
+    thread = retry_in_background(['fake'], store, succeeded.__setitem__,
+                                 delays=(0, 0, 0))
+    # Retries must not keep the process running unless someone waits for them.
+    assert thread.daemon
+    thread.join()
+    assert succeeded == {'fake': GOOD_OUTPUT}
+    assert store.load('fake') == GOOD_OUTPUT
+
+
+def test_scrape_county_skips_unchanged_counties(tmp_path, monkeypatch):
+    update_times = [GOOD_OUTPUT['update_time']]
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(
+        get_county=failing_county, get_update_time=lambda: update_times[0]))
+    store = CountyStore(tmp_path)
+    store.save('fake', GOOD_OUTPUT)
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+
+    # Forcing or an update upstream runs the scraper (which fails here).
+    assert scrape_county('fake', store, force=True) == {**GOOD_OUTPUT, 'stale': True}
+    update_times[0] = '2020-06-02T00:00:00+00:00'
+    assert scrape_county('fake', store) == {**GOOD_OUTPUT, 'stale': True}
+
+
+def test_scrape_county_checks_every_update_time(tmp_path, monkeypatch):
+    scraped = []
+    def get_county():
+        scraped.append(True)
+        return GOOD_OUTPUT
+    # The county's update_time is the earliest, so it doesn't change when
+    # only the later dataset is updated.
+    update_times = [('2020-06-01T00:00:00+00:00', '2020-06-01T12:00:00+00:00')]
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(
+        get_county=get_county, get_update_time=lambda: update_times[0]))
+    store = CountyStore(tmp_path)
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+    assert store.load_update_time('fake') == list(update_times[0])
+
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+    assert len(scraped) == 1
+
+    update_times[0] = ('2020-06-01T00:00:00+00:00', '2020-06-02T12:00:00+00:00')
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+    assert len(scraped) == 2
+    assert store.load_update_time('fake') == list(update_times[0])
+
+    # Output saved without an update time can't be compared to one.
+    store.save('fake', GOOD_OUTPUT)
+    assert store.load_update_time('fake') is None
+    assert scrape_county('fake', store) == GOOD_OUTPUT
+    assert len(scraped) == 3
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in utils.py
+"""
+
+from io import BytesIO
+import json
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from covid19_sfbayarea import transport
+from covid19_sfbayarea.data.utils import SocrataApi
+from covid19_sfbayarea.transport import (CircuitOpenError, MissingRecording,
+                                         use_cassette)
+
+
+RECORDED_RESPONSE = {
+    'method': 'GET',
+    'url': 'https://data.example.gov/resource/abcd-1234?%24limit=1',
+    'status': 200,
+    'reason': 'OK',
+    'headers': {'Content-Type': 'application/json'},
+    'elapsed': 0.5,
+    'body': '[{"cases": "12"}]'
+}
+
+
+def write_cassette(path):
+    path.write_text(json.dumps({
+        'options': {},
+        'responses': [RECORDED_RESPONSE],
+        'pages': {}
+    }))
+
+
+def test_socrata_api_replays_cassette(tmp_path):
+    cassette_path = tmp_path / 'cassette.json'
+    write_cassette(cassette_path)
+
+    with use_cassette(cassette_path, 'replay'):
+        session = SocrataApi('https://data.example.gov/')
+        assert session.resource('abcd-1234', params={'$limit': 1}) == [{'cases': '12'}]
+
+        with pytest.raises(MissingRecording):
+            session.resource('abcd-1234', params={'$limit': 2})
+
+
+def fake_send(monkeypatch, outcomes):
+    """
+    Make live requests return or raise each of ``outcomes`` in turn, and
+    return a list of the requests that were sent.
+    """
+    sent = []
+    monkeypatch.setattr(transport.time, 'sleep', lambda seconds: None)
+    transport._breakers.clear()
+
+    def send(adapter, request, *args, **kwargs):
+        sent.append(kwargs.get('timeout', args[1] if len(args) > 1 else None))
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.raw = BytesIO(b'[]')
+        response.url = request.url
+        response.request = request
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+    return sent
+
+
+def test_socrata_api_retries_server_errors(monkeypatch):
+    sent = fake_send(monkeypatch, [503, requests.exceptions.ConnectionError(), 200])
+    session = SocrataApi('https://data.example.gov/')
+    assert session.resource('abcd-1234') == []
+    assert len(sent) == 3
+    assert sent[0] == transport.TransportAdapter.timeout
+
+
+def test_circuit_opens_after_repeated_failures(monkeypatch):
+    threshold = transport.TransportAdapter.breaker_threshold
+    attempts = transport.TransportAdapter.retries + 1
+    sent = fake_send(monkeypatch, [requests.exceptions.ConnectTimeout()] *
+                                  (threshold * attempts))
+    session = SocrataApi('https://data.example.gov/')
+    for _ in range(threshold):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.resource('abcd-1234')
+
+    with pytest.raises(CircuitOpenError):
+        session.resource('abcd-1234')
+    assert len(sent) == threshold * attempts
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in validation.py
+"""
+
+import json
+from pathlib import Path
+import pytest
+from types import SimpleNamespace
+from covid19_sfbayarea import data
+from covid19_sfbayarea.data.store import CountyStore, scrape_county
+from covid19_sfbayarea.data.validation import (ValidationError, check,
+                                               validate)
+
+
+MODELS_PATH = Path(__file__).parent.parent.parent / 'data_models'
+
+GOOD_OUTPUT = {
+    'name': 'Fake County',
+    'update_time': '2020-06-01T12:00:00-07:00',
+    'source_url': 'https://example.com/',
+    'meta_from_source': '',
+    'meta_from_baypd': '',
+    'series': {
+        'cases': [{'date': '2020-06-01', 'cases': 3, 'cumul_cases': 10}],
+        'deaths': [],
+        'tests': [],
+    },
+    'case_totals': {
+        'gender': {'female': 5, 'male': 5},
+        'age_group': [{'group': '18_to_30', 'raw_count': 10}],
+        'race_eth': {'Asian': 4, 'Unknown': -1},
+    },
+    'death_totals': {},
+    'population_totals': {},
+}
+
+
+def test_templates_only_fail_on_placeholders():
+    for model in ('data_model', 'hospitals_data_model'):
+        template = json.loads((MODELS_PATH / f'{model}.json').read_text())
+        errors = validate(template, model)
+        assert errors
+        assert all(error.endswith(('not "yyyy-mm-dd"', 'not "yyyy-mm-ddThh:mmz"'))
+                   for error in errors)
+
+
+def test_validate_good_output():
+    assert validate(GOOD_OUTPUT) == []
+    assert validate({**GOOD_OUTPUT, 'stale': True}) == []
+
+
+def test_validate_lists_every_error():
+    bad_output = json.loads(json.dumps(GOOD_OUTPUT))
+    del bad_output['source_url']
+    bad_output['update_time'] = 'June 1st'
+    bad_output['series']['cases'][0].update(cases='<10', cumul_cases=-2)
+    bad_output['case_totals']['gender']['nonbinary'] = 1
+    bad_output['case_totals']['age_group'].append({'group': None, 'raw_count': True})
+    assert sorted(validate(bad_output)) == [
+        'case_totals.age_group[1].group: expected a string, not null',
+        'case_totals.age_group[1].raw_count: expected a count, not true',
+        'case_totals.gender.nonbinary: not in the data model',
+        'series.cases[0].cases: expected a count, not "<10"',
+        'series.cases[0].cumul_cases: expected -1 or more, not -2',
+        'source_url: missing',
+        'update_time: expected an ISO 8601 timestamp, not "June 1st"',
+    ]
+
+    with pytest.raises(ValidationError) as error:
+        check(bad_output)
+    assert len(error.value.errors) == 7
+
+
+def test_scrape_county_rejects_invalid_output(tmp_path, monkeypatch):
+    invalid = {**GOOD_OUTPUT, 'series': []}
+    monkeypatch.setitem(data.scrapers, 'fake', SimpleNamespace(get_county=lambda: invalid))
+    store = CountyStore(tmp_path)
+    assert scrape_county('fake', store) == invalid
+
+    store.save('fake', GOOD_OUTPUT)
+    assert scrape_county('fake', store, validate=True) == {**GOOD_OUTPUT, 'stale': True}
+    assert store.load('fake') == GOOD_OUTPUT
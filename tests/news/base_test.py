@@ -0,0 +1,134 @@
+from covid19_sfbayarea import instrumentation
+from covid19_sfbayarea.news.base import NewsScraper
+from covid19_sfbayarea.news.feed import NewsItem
+from datetime import datetime, timedelta, timezone
+import pytest
+import requests
+from typing import Iterable, List, Optional
+
+
+NOW = datetime.now(timezone.utc)
+
+
+class PaginatedNews(NewsScraper):
+    FEED_INFO = dict(title='Paginated News')
+    URL = 'https://example.gov/news'
+    MAX_PAGES = 10
+    PAGE_CONCURRENCY = 2
+    ITEMS_PER_PAGE = 3
+
+    def __init__(self, from_date: datetime = None) -> None:
+        super().__init__(from_date)
+        self.loaded: List[str] = []
+
+    def page_url(self, page: int) -> Optional[str]:
+        return f'{self.URL}?page={page}'
+
+    def load_html(self, url: str) -> str:
+        self.loaded.append(url)
+        return url
+
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
+        page = int(url.split('=')[1]) if '=' in url else 1
+        for index in range(self.ITEMS_PER_PAGE):
+            days_ago = (page - 1) * self.ITEMS_PER_PAGE + index
+            yield NewsItem(id=f'{page}-{index}', url=url, title='News',
+                           date_published=NOW - timedelta(days=days_ago))
+
+
+def test_scrape_loads_pages_until_from_date() -> None:
+    scraper = PaginatedNews(from_date=NOW - timedelta(days=7, hours=1))
+    feed = scraper.scrape()
+
+    assert len(feed.items) == 8
+    assert feed.items[-1].id == '3-1'
+    assert scraper.loaded == [PaginatedNews.URL,
+                              f'{PaginatedNews.URL}?page=2',
+                              f'{PaginatedNews.URL}?page=3']
+
+
+def test_scrape_stops_at_max_pages() -> None:
+    scraper = PaginatedNews()
+    feed = scraper.scrape()
+
+    assert len(scraper.loaded) == PaginatedNews.MAX_PAGES
+    assert len(feed.items) == PaginatedNews.MAX_PAGES * PaginatedNews.ITEMS_PER_PAGE
+
+
+def test_scrape_pages_parses_lazily() -> None:
+    parsed = []
+
+    class LazyNews(PaginatedNews):
+        def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
+            for item in super().parse_page(html, url):
+                parsed.append(item.id)
+                yield item
+
+    scraper = LazyNews(from_date=NOW - timedelta(days=4, hours=1))
+    pages = scraper.scrape_pages()
+    first_page = next(pages)
+    assert parsed == []
+    assert next(first_page).id == '1-0'
+    assert parsed == ['1-0']
+
+    # The rest of a page is parsed before moving on to the next one, even if
+    # it wasn't used.
+    assert [item.id for item in next(pages)] == ['2-0', '2-1', '2-2']
+    assert parsed == ['1-0', '1-1', '1-2', '2-0', '2-1', '2-2']
+    assert list(pages) == []
+
+
+def test_scrape_records_spans() -> None:
+    scraper = PaginatedNews()
+    instrumentation.enable()
+    try:
+        with instrumentation.labels(county='paginated'):
+            scraper.scrape()
+        spans = instrumentation.get_spans()
+    finally:
+        instrumentation.disable()
+        instrumentation.clear()
+
+    for name in ('load_html', 'parse_page'):
+        urls = sorted(span.url or '' for span in spans if span.name == name)
+        assert urls == sorted(scraper.loaded)
+    assert all(span.labels == {'county': 'paginated'} for span in spans)
+    assert all(span.bytes == len(span.url or '') for span in spans)
+
+
+class RepeatingNews(PaginatedNews):
+    """A source that ignores the page number and always sends page 1."""
+
+    def parse_page(self, html: str, url: str) -> Iterable[NewsItem]:
+        return super().parse_page(html, self.URL)
+
+
+def test_scrape_stops_when_pages_repeat() -> None:
+    scraper = RepeatingNews()
+    feed = scraper.scrape()
+
+    assert [item.id for item in feed.items] == ['1-0', '1-1', '1-2']
+    # Only the first batch of concurrent pages is loaded.
+    assert len(scraper.loaded) == 1 + PaginatedNews.PAGE_CONCURRENCY
+
+
+class BrokenPageNews(PaginatedNews):
+    """A source where pages from ``broken_page`` on don't exist."""
+    broken_page = 3
+
+    def load_html(self, url: str) -> str:
+        html = super().load_html(url)
+        page = int(url.split('=')[1]) if '=' in url else 1
+        if page >= self.broken_page:
+            raise requests.HTTPError(f'404 Client Error: Not Found for url: {url}')
+        return html
+
+
+def test_scrape_stops_at_pages_that_fail_to_load() -> None:
+    feed = BrokenPageNews().scrape()
+    assert len(feed.items) == 2 * PaginatedNews.ITEMS_PER_PAGE
+
+    scraper = BrokenPageNews()
+    scraper.broken_page = 1
+    with pytest.raises(requests.HTTPError):
+        scraper.scrape()
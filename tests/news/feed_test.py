@@ -1,5 +1,13 @@
-from covid19_sfbayarea.news.feed import NewsFeed, NewsItem
-from datetime import datetime, timezone
+from covid19_sfbayarea import serialization
+from covid19_sfbayarea.news.feed import (FeedWriter, FormattedItem, JsonWriter,
+                                         NewsFeed, NewsItem, format_datetime_2822)
+from dataclasses import fields, replace
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+import json
+import lxml.etree as ElementTree  # type: ignore
+import pytest
+from typing import Any, Dict
 
 
 def test_feed_items_sort_latest_first() -> None:
@@ -31,3 +39,130 @@ def test_feed_items_sort_stable() -> None:
     feed2 = NewsFeed(title='Test Feed 2')
     feed2.append(b, a)
     assert feed.items == [b, a]
+
+
+def test_format_datetime_2822() -> None:
+    date = datetime(2020, 6, 2, 9, 5, 3, tzinfo=timezone(timedelta(hours=-7)))
+    assert format_datetime_2822(date) == 'Tue, 02 Jun 2020 09:05:03 -0700'
+
+    utc_date = datetime(2020, 12, 25, 18, 0, tzinfo=timezone.utc)
+    assert format_datetime_2822(utc_date) == 'Fri, 25 Dec 2020 18:00:00 +0000'
+
+
+def test_feed_write_multiple_formats() -> None:
+    feed = NewsFeed(title='Test Feed', home_page_url='https://example.gov/')
+    feed.append(
+        NewsItem(id='a', title='a', url='https://example.gov/a',
+                 summary='About a', tags=['health'],
+                 date_published=datetime(2020, 6, 2, tzinfo=timezone.utc)),
+        NewsItem(id='b', title='b', url='https://example.gov/b',
+                 date_published=datetime(2020, 6, 3, tzinfo=timezone.utc)))
+
+    streams = {'json_feed': BytesIO(), 'json_simple': BytesIO(),
+               'rss': BytesIO()}
+    feed.write(streams)
+
+    assert json.loads(streams['json_feed'].getvalue()) == feed.format_json_feed_dict()
+    assert json.loads(streams['json_simple'].getvalue()) == feed.format_json_simple_dict()
+    assert streams['rss'].getvalue() == feed.format_rss()
+    rss = ElementTree.fromstring(streams['rss'].getvalue())
+    assert [guid.text for guid in rss.iter('guid')] == ['b', 'a']
+
+
+def test_feed_write_json_matches_serialization_dumps() -> None:
+    feed = NewsFeed(title='Test Feed')
+    feed.append(NewsItem(id='a', title='a', url='a', tags=['x', 'y'],
+                         date_published=datetime(2020, 6, 2, tzinfo=timezone.utc)))
+
+    for pretty in (True, False):
+        expected = serialization.dumps(feed.format_json_feed_dict(), pretty)
+        assert feed.format_json_feed(pretty=pretty) == expected
+
+    expected_text = json.dumps(feed.format_json_feed_dict(), indent=2)
+    assert feed.format_json_feed() == expected_text.encode('utf-8')
+
+
+def test_news_items_and_feeds_are_slotted() -> None:
+    item = NewsItem(id='a', title='a', url='a')
+    feed = NewsFeed(title='Test Feed')
+    for instance in (item, feed):
+        assert not hasattr(instance, '__dict__')
+        with pytest.raises(AttributeError):
+            instance.not_a_field = 'value'  # type: ignore
+    assert [field.name for field in fields(NewsItem)] == [
+        'id', 'url', 'title', 'date_published', 'summary', 'date_modified',
+        'author', 'tags']
+
+
+def test_defaults() -> None:
+    before = datetime.utcnow()
+    item = NewsItem(id='a', title='a', url='a')
+    assert before <= item.date_published <= datetime.utcnow()
+    assert item.summary is None
+    assert item.tags == ()
+
+    # Mutable defaults are new for every instance.
+    feed = NewsFeed(title='Test Feed')
+    other_feed = NewsFeed(title='Other Feed')
+    assert feed.items == [] and feed.items is not other_feed.items
+    assert feed.expired is False
+    with pytest.raises(TypeError):
+        NewsFeed(title='Test Feed', items=[])  # type: ignore
+
+
+def test_equality_ordering_and_mutation() -> None:
+    date = datetime(2020, 6, 2, tzinfo=timezone.utc)
+    item = NewsItem(id='a', title='a', url='a', date_published=date)
+    assert item == NewsItem(id='a', title='a', url='a', date_published=date)
+    assert item != NewsItem(id='b', title='a', url='a', date_published=date)
+    assert repr(item).startswith("NewsItem(id='a', url='a', title='a'")
+    # Like any non-frozen dataclass with equality, items are not hashable or
+    # orderable.
+    with pytest.raises(TypeError):
+        hash(item)
+    with pytest.raises(TypeError):
+        item < item  # type: ignore
+
+    item.title = 'changed'
+    item.tags = ['tag']
+    assert (item.title, item.tags) == ('changed', ['tag'])
+    assert replace(item, id='b').id == 'b'
+
+    feed = NewsFeed(title='Test Feed')
+    feed.title = 'Changed Feed'
+    assert feed == NewsFeed(title='Changed Feed')
+    # Items aren't an argument to `__init__`, but are still compared.
+    feed.append(item)
+    assert feed != NewsFeed(title='Changed Feed')
+    assert feed.items == [item]
+
+
+def test_subclasses_can_use_super() -> None:
+    class TaggedItem(NewsItem):
+        __slots__ = ()
+
+        def __init__(self, id: str, url: str, title: str) -> None:
+            super().__init__(id, url, title, tags=('tagged',))
+
+        def format_json_simple(self, formatted: FormattedItem = None) -> Dict:
+            return {**super().format_json_simple(formatted), 'tagged': True}
+
+    item = TaggedItem(id='a', title='a', url='a')
+    assert isinstance(item, NewsItem)
+    assert item.tags == ('tagged',)
+    assert item.format_json_simple()['tagged'] is True
+    assert not hasattr(item, '__dict__')
+
+
+def test_incomplete_feed_writers_cannot_be_created() -> None:
+    class NoItemsWriter(JsonWriter):
+        list_key = 'items'
+
+        def header(self) -> Dict[str, Any]:
+            return {}
+
+    feed = NewsFeed(title='Test Feed')
+    with pytest.raises(TypeError):
+        NoItemsWriter(feed, BytesIO())  # type: ignore
+    with pytest.raises(TypeError):
+        FeedWriter(feed, BytesIO())  # type: ignore
@@ -0,0 +1,53 @@
+from covid19_sfbayarea.news.san_mateo import SanMateoNews
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from io import BytesIO
+
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def rss_item(index: int, days_ago: int) -> str:
+    date = format_datetime(NOW - timedelta(days=days_ago))
+    return f'''
+        <item>
+            <title>June 1, 2020 - Item {index}</title>
+            <link>https://example.gov/news/{index}</link>
+            <description><![CDATA[REDWOOD CITY, Calif. – Item <b>{index}</b>]]></description>
+            <pubDate>{date}</pubDate>
+            <guid isPermaLink="false">{index} at https://example.gov</guid>
+        </item>
+    '''
+
+
+def rss_feed(*items: str) -> BytesIO:
+    return BytesIO(f'''<?xml version="1.0" encoding="utf-8"?>
+        <rss version="2.0">
+            <channel>
+                <title>Example News</title>
+                {''.join(items)}
+            </channel>
+        </rss>
+    '''.encode('utf-8'))
+
+
+def test_parse_feed() -> None:
+    scraper = SanMateoNews()
+    items = list(scraper.parse_feed(rss_feed(rss_item(1, 0)), SanMateoNews.URL))
+
+    assert len(items) == 1
+    assert items[0].id == '1 at https://example.gov'
+    assert items[0].url == 'https://example.gov/news/1'
+    assert items[0].title == 'Item 1'
+    assert items[0].summary == 'Item 1'
+    assert items[0].date_published == NOW
+
+
+def test_parse_feed_stops_at_from_date() -> None:
+    scraper = SanMateoNews(from_date=NOW - timedelta(days=5))
+    source = rss_feed(rss_item(1, 1), rss_item(2, 3), rss_item(3, 7),
+                      '<item>Not a valid item</item>')
+    items = list(scraper.parse_feed(source, SanMateoNews.URL))
+
+    # If the scraper didn't stop at item 3, it would fail on the invalid item.
+    assert [item.title for item in items] == ['Item 1', 'Item 2']
@@ -0,0 +1,146 @@
+from covid19_sfbayarea.news import utils
+from covid19_sfbayarea.news.feed import NewsItem
+from covid19_sfbayarea.news.utils import (CURRENT_YEAR, DETECTED_ENCODINGS,
+                                          PACIFIC_TIME, SNIFF_LENGTH,
+                                          KeyTermMatcher,
+                                          decode_html_body, is_covid_related,
+                                          parse_datetime)
+from datetime import datetime, timezone
+import dateutil.parser
+import pytest
+import requests
+
+
+# Examples of the date formats each county's news page uses.
+DATE_STRINGS = [
+    f'6/15/{CURRENT_YEAR}',                         # Alameda, Contra Costa
+    f'06/01/{CURRENT_YEAR}',                        # Santa Clara
+    f'06/15/{CURRENT_YEAR} at 4:30 PM',             # Sonoma
+    f'06/15/{CURRENT_YEAR} at 12:05 AM',
+    f'June 15, {CURRENT_YEAR}',                     # Napa, Marin
+    f'Sept 5, {CURRENT_YEAR}',
+    f'{CURRENT_YEAR}-06-15T19:11:56Z',              # San Francisco
+    f'{CURRENT_YEAR}-06-15T12:11:56-07:00',
+    f'{CURRENT_YEAR}-06-15T12:11:56.123-0700',
+    f'{CURRENT_YEAR}-06-15',
+    f'Mon, 15 Jun {CURRENT_YEAR} 16:18:06 +0000',   # San Mateo
+    f'15 Jun {CURRENT_YEAR} 16:18:06 GMT',
+]
+
+
+@pytest.mark.parametrize('date_string', DATE_STRINGS)
+def test_parse_datetime_matches_dateutil(date_string: str) -> None:
+    expected = dateutil.parser.parse(date_string)
+    if expected.tzinfo is None:
+        expected = expected.replace(tzinfo=PACIFIC_TIME)
+
+    parsed = parse_datetime(date_string)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+def test_parse_datetime_falls_back_to_dateutil() -> None:
+    parsed = parse_datetime(f'June 15th, {CURRENT_YEAR} at 4pm')
+    assert parsed == datetime(CURRENT_YEAR, 6, 15, 16, tzinfo=PACIFIC_TIME)
+
+
+def test_parse_datetime_uses_timezone_argument() -> None:
+    parsed = parse_datetime(f'6/15/{CURRENT_YEAR}', timezone=timezone.utc)
+    assert parsed == datetime(CURRENT_YEAR, 6, 15, tzinfo=timezone.utc)
+
+
+def test_parse_datetime_rejects_unreasonable_years() -> None:
+    with pytest.raises(ValueError):
+        parse_datetime(f'6/15/{CURRENT_YEAR - 10}')
+
+
+def test_is_covid_related() -> None:
+    assert is_covid_related(NewsItem(id='a', url='https://example.gov/a',
+                                     title='New COVID-19 testing sites'))
+    assert is_covid_related(NewsItem(id='b', url='https://example.gov/b',
+                                     title='County update',
+                                     tags=['Public Health']))
+    assert is_covid_related(NewsItem(id='c', url='https://example.gov/c',
+                                     title='County update',
+                                     summary='The Shelter-In-Place order...'))
+    assert not is_covid_related(NewsItem(id='d', url='https://example.gov/d',
+                                         title='Road closures this weekend'))
+
+
+def test_key_term_matcher_weights() -> None:
+    matcher = KeyTermMatcher({'covid': 1, 'health': 0.5, 'mental': -0.5})
+    item = NewsItem(id='a', url='https://example.gov/health',
+                    title='Mental health resources')
+    assert matcher.find(item) == {'health': 0.5, 'mental': -0.5}
+    assert matcher.score(item) == 0
+    assert not matcher.matches(item)
+
+    item.summary = 'Health officials discuss COVID vaccines.'
+    assert matcher.find(item) == {'covid': 1, 'health': 0.5, 'mental': -0.5}
+    assert matcher.matches(item)
+
+
+
+def test_key_term_matcher_counts_longest_overlapping_term() -> None:
+    matcher = KeyTermMatcher({'covid': 1, 'covid-19': 0.5}, threshold=1)
+    item = NewsItem(id='a', url='https://example.gov/a',
+                    title='COVID-19 testing sites')
+    assert matcher.find(item) == {'covid-19': 0.5}
+    assert not matcher.matches(item)
+
+    item.summary = 'Get tested for covid this weekend.'
+    assert matcher.find(item) == {'covid': 1, 'covid-19': 0.5}
+    assert matcher.matches(item)
+
+def make_response(content: bytes, url: str = 'https://example.gov/news',
+                  content_type: str = 'text/html') -> requests.Response:
+    response = requests.Response()
+    response._content = content
+    response.url = url
+    response.headers['Content-Type'] = content_type
+    return response
+
+
+def test_decode_html_body_uses_declared_encoding() -> None:
+    text = '<p>Café</p>'
+    response = make_response(text.encode('latin-1'),
+                             content_type='text/html; charset=ISO-8859-1')
+    assert decode_html_body(response) == text
+
+    response = make_response(b'<meta charset="iso-8859-1">' + text.encode('latin-1'))
+    assert decode_html_body(response) == '<meta charset="iso-8859-1">' + text
+
+    response = make_response(text.encode('utf-16'))
+    assert decode_html_body(response) == text
+
+
+def test_decode_html_body_detects_undeclared_encoding(
+        monkeypatch: pytest.MonkeyPatch) -> None:
+    text = '<p>Café</p>'
+    response = make_response(text.encode('utf-8'), url='https://utf8.example.gov/')
+    assert decode_html_body(response) == text
+    assert 'utf8.example.gov' not in DETECTED_ENCODINGS
+
+    # How confident chardet is varies a lot between versions, so pin it.
+    detection = {'encoding': 'Windows-1252', 'confidence': 0.73}
+    monkeypatch.setattr(utils.chardet, 'detect', lambda content: detection)
+    response = make_response(text.encode('windows-1252'),
+                             url='https://legacy.example.gov/')
+    assert decode_html_body(response) == text
+    assert DETECTED_ENCODINGS['legacy.example.gov'] == 'Windows-1252'
+
+    detection = {'encoding': 'ISO-8859-7', 'confidence': 0.2}
+    response = make_response(text.encode('windows-1252'),
+                             url='https://unsure.example.gov/')
+    assert decode_html_body(response) == text
+    assert 'unsure.example.gov' not in DETECTED_ENCODINGS
+
+
+def test_decode_html_body_does_not_trust_ascii_detection() -> None:
+    # Only the first SNIFF_LENGTH bytes are used for detection, and they are
+    # all ASCII here.
+    text = '<p>' + 'a' * SNIFF_LENGTH + ' Café</p>'
+    response = make_response(text.encode('windows-1252'),
+                             url='https://late.example.gov/')
+    assert decode_html_body(response) == text
+    assert 'late.example.gov' not in DETECTED_ENCODINGS
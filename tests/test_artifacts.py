@@ -0,0 +1,72 @@
+import gzip
+import logging
+import os
+import pytest
+from covid19_sfbayarea import artifacts
+from covid19_sfbayarea.artifacts import (FILE_MODE, atomic_open,
+                                         compression_levels, open_artifact)
+
+
+def test_atomic_open_leaves_file_alone_on_error(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'old')
+    with pytest.raises(ValueError):
+        with atomic_open(path) as stream:
+            stream.write(b'half')
+            raise ValueError('Scraper broke')
+    assert path.read_bytes() == b'old'
+    assert list(tmp_path.iterdir()) == [path]
+
+    with atomic_open(path) as stream:
+        stream.write(b'new')
+        assert path.read_bytes() == b'old'
+    assert path.read_bytes() == b'new'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_open_uses_unique_temporary_files(tmp_path):
+    path = tmp_path / 'data.json'
+    with atomic_open(path) as first, atomic_open(path) as second:
+        assert first.name != second.name
+        first.write(b'first')
+        second.write(b'second')
+    # The last one to finish wins.
+    assert path.read_bytes() == b'first'
+    assert list(tmp_path.iterdir()) == [path]
+    # Files get the usual permissions, not the temporary file's.
+    assert os.stat(path).st_mode & 0o777 == FILE_MODE
+
+
+def test_compression_levels_only_warn_about_explicit_brotli(monkeypatch, caplog):
+    monkeypatch.delitem(artifacts.COMPRESSORS, 'br', raising=False)
+    with caplog.at_level(logging.WARNING):
+        assert compression_levels(9) == {'gz': 9, 'br': 0}
+        assert caplog.records == []
+        assert compression_levels(9, 11) == {'gz': 9, 'br': 0}
+        assert 'brotli' in caplog.text
+
+    monkeypatch.setitem(artifacts.COMPRESSORS, 'br', artifacts.BrotliCompressor)
+    assert compression_levels(9) == {'gz': 9, 'br': 11}
+    assert compression_levels(9, 0) == {'gz': 9, 'br': 0}
+
+
+def test_open_artifact_writes_compressed_copies(tmp_path):
+    path = tmp_path / 'data.json'
+    with open_artifact(path, {'gz': 6}) as stream:
+        stream.write(b'{"a": ')
+        stream.write(b'1}')
+    assert path.read_bytes() == b'{"a": 1}'
+    assert gzip.decompress((tmp_path / 'data.json.gz').read_bytes()) == b'{"a": 1}'
+
+    # Copies that are turned off are removed, rather than left out of date.
+    with open_artifact(path, {'gz': 0}) as stream:
+        stream.write(b'{}')
+    assert sorted(tmp_path.iterdir()) == [path]
+
+
+def test_open_artifact_writes_brotli(tmp_path):
+    brotli = pytest.importorskip('brotli')
+    path = tmp_path / 'feed.rss'
+    with open_artifact(path, {'br': 5, 'gz': 9}) as stream:
+        stream.write(b'<rss/>')
+    assert brotli.decompress((tmp_path / 'feed.rss.br').read_bytes()) == b'<rss/>'
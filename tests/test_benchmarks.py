@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the scraper benchmarks and their fixtures.
+"""
+
+import json
+from click.testing import CliRunner
+import pytest
+from benchmarks import run, synthetic
+
+
+@pytest.mark.parametrize('name', list(run.BENCHMARKS))
+def test_every_benchmark_has_a_fixture_and_baseline(name):
+    assert run.cassette_path(name).exists()
+    baseline = json.loads(run.BASELINE.read_text())
+    assert set(baseline[name]) == {'scrape_time', 'serialize_time',
+                                   'peak_kib', 'output_kib'}
+
+
+@pytest.mark.parametrize('name', list(run.BENCHMARKS))
+def test_fixtures_replay(name):
+    result = run.measure(name, repeat=1)
+    assert result['scrape_seconds'] > 0
+    assert result['output_kib'] > 1
+
+
+def test_synthetic_fixtures_can_be_regenerated(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, 'FIXTURES', tmp_path)
+    result = CliRunner().invoke(synthetic.main, ['news.napa', 'data'])
+    assert result.exit_code == 0, result.output
+    assert sorted(path.relative_to(tmp_path).as_posix()
+                  for path in tmp_path.glob('*/*.json')) == [
+        'data/alameda.json', 'data/san_francisco.json', 'data/solano.json',
+        'news/napa.json',
+    ]
+    for name in ('news.napa', 'data.alameda', 'data.san_francisco',
+                 'data.solano'):
+        assert run.measure(name, repeat=1)['output_kib'] > 1
+
+
+def test_fails_on_regressions(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    result = CliRunner().invoke(run.main, ['news.san_mateo', '--repeat', '1',
+                                           '--baseline', str(baseline),
+                                           '--save-baseline'])
+    assert result.exit_code == 0, result.output
+    saved = json.loads(baseline.read_text())
+    assert list(saved) == ['news.san_mateo']
+
+    saved['news.san_mateo']['output_kib'] /= 2
+    baseline.write_text(json.dumps(saved))
+    result = CliRunner().invoke(run.main, ['news.san_mateo', '--repeat', '1',
+                                           '--baseline', str(baseline)])
+    assert result.exit_code == 1
+    assert 'news.san_mateo output_kib' in result.output
+
+
+def test_relative_times():
+    measurements = {'scrape_seconds': 0.5, 'serialize_seconds': 0.1,
+                    'peak_kib': 100, 'output_kib': 10}
+    assert run.relative_times(measurements, 0.05) == {
+        'scrape_time': 10, 'serialize_time': 2, 'peak_kib': 100,
+        'output_kib': 10}
+
+
+def test_find_regressions_ignores_small_changes():
+    baseline = {'news.napa': {'scrape_seconds': 1.0, 'peak_kib': 100}}
+    results = {'news.napa': {'scrape_seconds': 1.2, 'peak_kib': 150}}
+    assert run.find_regressions(results, baseline, 0.25) == [
+        'news.napa peak_kib: 150.0000 (baseline 100.0000, +50%)'
+    ]
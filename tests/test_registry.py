@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in registry.py
+"""
+
+import sys
+from covid19_sfbayarea.registry import LazyRegistry
+
+
+def test_lazy_registry_imports_on_lookup(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'covid19_sfbayarea.news.napa', raising=False)
+    scrapers = LazyRegistry('covid19_sfbayarea.news', {'napa': '.napa:NapaNews'})
+    assert list(scrapers) == ['napa']
+    assert 'covid19_sfbayarea.news.napa' not in sys.modules
+
+    assert scrapers['napa'].__name__ == 'NapaNews'
+    assert 'covid19_sfbayarea.news.napa' in sys.modules
+
+    scrapers['fake'] = 'Fake scraper'
+    assert scrapers['fake'] == 'Fake scraper'
+    del scrapers['fake']
+    assert list(scrapers) == ['napa']
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in scheduler.py
+"""
+
+from threading import Lock
+from covid19_sfbayarea.scheduler import Job, Scheduler
+
+
+def test_scheduler_runs_jobs_on_their_intervals():
+    runs = {'fast': 0, 'failing': 0}
+    lock = Lock()
+    scheduler = None
+
+    def job(name):
+        def run():
+            with lock:
+                runs[name] += 1
+                if runs['fast'] >= 5:
+                    scheduler.stop()
+            if name == 'failing':
+                raise ValueError('Nope')
+        return run
+
+    statuses = []
+    scheduler = Scheduler([Job('fast', job('fast'), 0.01),
+                           Job('failing', job('failing'), 10)],
+                          workers=2, jitter=0, on_status=statuses.append)
+    scheduler.run()
+
+    status = {job['name']: job for job in scheduler.status()}
+    assert status['fast']['runs'] >= 5
+    assert status['fast']['failures'] == 0
+    assert status['failing']['runs'] == 1
+    assert status['failing']['failures'] == 1
+    assert status['failing']['last_error'] == 'ValueError: Nope'
+    assert statuses
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Tests for scraper_data.py
+"""
+
+import json
+from click.testing import CliRunner
+from threading import Event, Thread
+from types import SimpleNamespace
+from covid19_sfbayarea import data
+from covid19_sfbayarea.data.store import CountyStore, retry_in_background
+import scraper_data
+
+
+STORED = {'name': 'Alameda County', 'update_time': '2020-06-01T00:00:00+00:00'}
+RETRIED = {'name': 'Alameda County', 'update_time': '2020-06-02T00:00:00+00:00'}
+
+
+def flaky_county(results):
+    def get_county():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return SimpleNamespace(get_county=get_county)
+
+
+def test_failed_counties_are_retried_without_waiting(tmp_path, monkeypatch):
+    results = [ValueError('Down'), RETRIED]
+    monkeypatch.setitem(data.scrapers, 'alameda', flaky_county(results))
+    retried = []
+    def fake_retry(counties, *args, **kwargs):
+        retried.extend(counties)
+        # A retry that is never going to finish.
+        thread = Thread(target=Event().wait, daemon=True)
+        thread.start()
+        return thread
+    monkeypatch.setattr(scraper_data, 'retry_in_background', fake_retry)
+    CountyStore(tmp_path).save('alameda', STORED)
+
+    result = CliRunner().invoke(scraper_data.main,
+                                ['alameda', '--store', str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout) == {'alameda': {**STORED, 'stale': True}}
+    assert retried == ['alameda']
+
+
+def test_retry_wait_prints_retried_data(tmp_path, monkeypatch):
+    results = [ValueError('Down'), ValueError('Still down'), RETRIED]
+    monkeypatch.setitem(data.scrapers, 'alameda', flaky_county(results))
+    monkeypatch.setattr(scraper_data, 'retry_in_background',
+                        lambda *args, **kwargs: retry_in_background(
+                            *args, delays=(0, 0), **kwargs))
+    CountyStore(tmp_path).save('alameda', STORED)
+
+    result = CliRunner().invoke(scraper_data.main,
+                                ['alameda', '--store', str(tmp_path), '--retry-wait'])
+    assert result.exit_code == 0, result.output
+    # The output is only printed once, with the data from the retry.
+    assert json.loads(result.stdout) == {'alameda': RETRIED}
+    assert CountyStore(tmp_path).load('alameda') == RETRIED
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+"""
+Tests for scraper_faq_sheet.py
+"""
+
+from io import BytesIO
+import json
+import click
+import pytest
+import requests
+from covid19_sfbayarea import transport
+import scraper_faq_sheet
+
+
+SYMPTOMS = [['Section Head', 'Symptoms'],
+            ['Q', 'What are the symptoms?'],
+            ['A', 'Coughing and shortness of breath.'],
+            ['link', 'https://www.cdc.gov/']]
+TESTING = [['Section Head', 'Testing'],
+           ['Q', 'Where can I get tested?'],
+           ['A', 'At a testing site.']]
+
+
+def csv_text(rows):
+    return ''.join(f'"{rowtype}","{value}"\r\n' for rowtype, value in rows)
+
+
+def fake_response(status, rows=(), headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = BytesIO(csv_text(rows).encode('utf-8'))
+    return response
+
+
+class FakeSheet:
+    """
+    Stands in for `transport.get()`, and records the headers it got.
+    Responses for specific tabs can be added to ``tab_responses``, keyed by
+    (sheet, gid).
+    """
+
+    def __init__(self, monkeypatch):
+        self.responses = []
+        self.tab_responses = {}
+        self.requests = []
+        monkeypatch.setattr(transport, 'get', self.get)
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.requests.append(headers)
+        tab = (params['id'], params['gid'])
+        if tab in self.tab_responses:
+            return self.tab_responses[tab].pop(0)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    return FakeSheet(monkeypatch)
+
+
+def export(output):
+    return scraper_faq_sheet.export_faq('sheet', 'gid', output)
+
+
+def set_dates(output, date):
+    faq = json.loads(output.read_text())
+    for section in faq['faqItems']:
+        section['lastUpdatedAt'] = date
+    output.write_text(json.dumps(faq, indent=2))
+
+
+def test_export_faq_writes_output_and_validators(sheet, tmp_path):
+    output = tmp_path / 'faq.json'
+    sheet.responses.append(fake_response(200, SYMPTOMS + TESTING,
+                                         {'ETag': '"v1"'}))
+    assert export(output)
+
+    faq = json.loads(output.read_text())
+    assert [section['title'] for section in faq['faqItems']] == ['Symptoms', 'Testing']
+    assert faq['faqItems'][0]['qa'] == [{'q': 'What are the symptoms?',
+                                         'a': 'Coughing and shortness of breath.',
+                                         'url': 'https://www.cdc.gov/'}]
+    assert json.loads((tmp_path / 'faq.json.http.json').read_text()) == {'ETag': '"v1"'}
+    assert sheet.requests == [{}]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'faq.json', 'faq.json.http.json']
+
+
+def test_export_faq_leaves_unchanged_faq_alone(sheet, tmp_path):
+    output = tmp_path / 'faq.json'
+    sheet.responses.append(fake_response(200, SYMPTOMS, {'ETag': '"v1"'}))
+    export(output)
+    set_dates(output, '2020-06-01')
+    before = output.read_text()
+
+    # The sheet changed, but not in a way that affects the FAQ.
+    sheet.responses.append(fake_response(200, SYMPTOMS, {'ETag': '"v2"'}))
+    assert not export(output)
+    assert output.read_text() == before
+    assert sheet.requests[-1] == {'If-None-Match': '"v1"'}
+    assert json.loads((tmp_path / 'faq.json.http.json').read_text()) == {'ETag': '"v2"'}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'faq.json', 'faq.json.http.json']
+
+
+def test_export_faq_only_dates_changed_sections(sheet, tmp_path):
+    output = tmp_path / 'faq.json'
+    sheet.responses.append(fake_response(200, SYMPTOMS + TESTING,
+                                         {'Last-Modified': 'Mon, 01 Jun 2020 00:00:00 GMT'}))
+    export(output)
+    set_dates(output, '2020-06-01')
+
+    changed_testing = TESTING[:2] + [['A', 'At a pharmacy or testing site.']]
+    sheet.responses.append(fake_response(200, SYMPTOMS + changed_testing))
+    assert export(output)
+    assert sheet.requests[-1] == {'If-Modified-Since': 'Mon, 01 Jun 2020 00:00:00 GMT'}
+
+    symptoms, testing = json.loads(output.read_text())['faqItems']
+    assert symptoms['lastUpdatedAt'] == '2020-06-01'
+    assert testing['lastUpdatedAt'] != '2020-06-01'
+    assert testing['qa'][0]['a'] == 'At a pharmacy or testing site.'
+    # The new response had no validators, so there is nothing to send next time.
+    assert json.loads((tmp_path / 'faq.json.http.json').read_text()) == {}
+
+
+def test_export_faq_does_nothing_when_sheet_is_not_modified(sheet, tmp_path):
+    output = tmp_path / 'faq.json'
+    sheet.responses.append(fake_response(200, SYMPTOMS, {'ETag': '"v1"'}))
+    export(output)
+    before = output.read_text()
+
+    sheet.responses.append(fake_response(304))
+    assert not export(output)
+    assert output.read_text() == before
+    assert sheet.requests[-1] == {'If-None-Match': '"v1"'}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'faq.json', 'faq.json.http.json']
+
+
+def test_date_sections_keeps_dates_of_unchanged_sections():
+    sections = list(scraper_faq_sheet.parse_sections(SYMPTOMS + TESTING))
+    previous = [{**sections[0], 'lastUpdatedAt': '2020-06-01'},
+                {'title': 'Testing', 'qa': [], 'lastUpdatedAt': '2020-06-01'}]
+    hashes = []
+    dated = list(scraper_faq_sheet.date_sections(sections, previous, hashes))
+
+    assert dated[0]['lastUpdatedAt'] == '2020-06-01'
+    assert dated[1]['lastUpdatedAt'] != '2020-06-01'
+    assert hashes == [scraper_faq_sheet.section_hash(section) for section in sections]
+
+
+def test_cli_tab():
+    assert scraper_faq_sheet.cli_tab('es=123') == ('es', scraper_faq_sheet.FAQ_SHEET, '123')
+    assert scraper_faq_sheet.cli_tab('es=other:123') == ('es', 'other', '123')
+    for value in ('es', '=123', 'es=', 'es=other:'):
+        with pytest.raises(click.BadParameter):
+            scraper_faq_sheet.cli_tab(value)
+
+
+TABS = [scraper_faq_sheet.Tab('en', 'sheet', '1'),
+        scraper_faq_sheet.Tab('es', 'sheet', '2'),
+        scraper_faq_sheet.Tab('zh', 'other', '1')]
+
+
+def test_get_tabs(sheet):
+    sheet.tab_responses = {('sheet', '1'): [fake_response(200, SYMPTOMS)],
+                           ('sheet', '2'): [fake_response(200, TESTING)],
+                           ('other', '1'): [fake_response(200, SYMPTOMS + TESTING)]}
+    faqs = scraper_faq_sheet.get_tabs(TABS)
+    assert list(faqs) == ['en', 'es', 'zh']
+    assert [[section['title'] for section in faq['faqItems']]
+            for faq in faqs.values()] == [['Symptoms'], ['Testing'],
+                                          ['Symptoms', 'Testing']]
+
+
+def test_export_tabs(sheet, tmp_path):
+    sheet.tab_responses = {('sheet', '1'): [fake_response(200, SYMPTOMS, {'ETag': '"en"'})],
+                           ('sheet', '2'): [fake_response(200, TESTING, {'ETag': '"es"'})],
+                           ('other', '1'): [fake_response(200, SYMPTOMS + TESTING)]}
+    changed = scraper_faq_sheet.export_tabs(TABS, tmp_path, index=True)
+    assert changed == ['en', 'es', 'zh']
+    index = json.loads((tmp_path / 'index.json').read_text())
+    assert list(index) == ['en', 'es', 'zh']
+    for name in index:
+        assert index[name] == json.loads((tmp_path / f'{name}.json').read_text())
+
+    # One tab is not modified, one is modified but has the same content, and
+    # one has changed content.
+    index['es']['faqItems'][0]['lastUpdatedAt'] = '2020-06-01'
+    (tmp_path / 'es.json').write_text(json.dumps(index['es']))
+    (tmp_path / 'index.json').write_text(json.dumps(index))
+    sheet.tab_responses = {('sheet', '1'): [fake_response(304)],
+                           ('sheet', '2'): [fake_response(200, TESTING, {'ETag': '"es2"'})],
+                           ('other', '1'): [fake_response(200, SYMPTOMS)]}
+    changed = scraper_faq_sheet.export_tabs(TABS, tmp_path, index=True)
+    assert changed == ['zh']
+
+    new_index = json.loads((tmp_path / 'index.json').read_text())
+    assert new_index['en'] == index['en']
+    assert new_index['es']['faqItems'][0]['lastUpdatedAt'] == '2020-06-01'
+    assert [section['title'] for section in new_index['zh']['faqItems']] == ['Symptoms']
+    # zh never had validators, so there is no file for them.
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'en.json', 'en.json.http.json', 'es.json', 'es.json.http.json',
+        'index.json', 'zh.json']
+
+
+def test_export_tabs_leaves_index_alone_when_nothing_changed(sheet, tmp_path):
+    sheet.tab_responses = {tab[1:]: [fake_response(200, SYMPTOMS), fake_response(304)]
+                           for tab in TABS}
+    scraper_faq_sheet.export_tabs(TABS, tmp_path, index=True)
+    (tmp_path / 'index.json').write_text('{}')
+
+    assert scraper_faq_sheet.export_tabs(TABS, tmp_path, index=True) == []
+    assert (tmp_path / 'index.json').read_text() == '{}'
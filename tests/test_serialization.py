@@ -0,0 +1,43 @@
+from io import BytesIO
+import json
+import pytest
+from covid19_sfbayarea import serialization
+
+
+VALUES = [
+    {},
+    [],
+    'Ñapa',
+    {'name': 'Fake County', 'empty': {}, 'none': None, 'series': {
+        'cases': [{'date': '2020-06-01', 'cases': 3}, {'date': '2020-06-02', 'cases': 1.5}],
+        'tests': [],
+    }, 'nested': [[1, [2, {'a': []}]], {}]},
+    [{'alameda': {'update_time': '2020-06-01'}}, [[]], 'x'],
+]
+
+
+@pytest.fixture(params=list(serialization.ENCODERS))
+def encoder(request, monkeypatch):
+    monkeypatch.setattr(serialization, 'encoder_name', request.param)
+    return request.param
+
+
+@pytest.mark.parametrize('value', VALUES)
+def test_output_matches_json_module(encoder, value):
+    pretty = json.dumps(value, indent=2, ensure_ascii=False).encode('utf-8')
+    compact = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    assert serialization.dumps(value) == pretty
+    assert serialization.dumps(value, pretty=False) == compact
+
+    for expected, is_pretty in ((pretty, True), (compact, False)):
+        stream = BytesIO()
+        serialization.dump(value, stream, is_pretty)
+        assert stream.getvalue() == expected
+
+
+def test_set_encoder(monkeypatch):
+    monkeypatch.setattr(serialization, 'encoder_name', 'json')
+    with pytest.raises(ValueError):
+        serialization.set_encoder('not_an_encoder')
+    serialization.set_encoder('json')
+    assert serialization.encoder_name == 'json'
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Tests for functions in webdriver.py
+"""
+
+import gc
+import pytest
+from selenium.common.exceptions import TimeoutException  # type: ignore
+from covid19_sfbayarea import webdriver
+from covid19_sfbayarea.data import alameda
+from covid19_sfbayarea.webdriver import BrowserPool, use_browser_pool
+
+
+class FakeFirefox:
+    def __init__(self):
+        self.page_source = '<html><body><p>No notes here</p></body></html>'
+        self.quit_count = 0
+
+    def get(self, url):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_count += 1
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    started = []
+
+    def start_firefox():
+        started.append(FakeFirefox())
+        return started[-1]
+
+    monkeypatch.setattr(webdriver, 'start_firefox', start_firefox)
+    return started
+
+
+def test_pool_reuses_browsers(browsers):
+    pool = BrowserPool(1, timeout=0.01)
+    with pool.acquire() as driver:
+        driver.get('https://example.com/')
+    with pool.acquire():
+        pass
+    assert len(browsers) == 1
+
+    pool.close()
+    assert browsers[0].quit_count == 1
+
+
+def test_pool_acquire_times_out(browsers):
+    pool = BrowserPool(1, timeout=0.01)
+    driver = pool.acquire()
+    with pytest.raises(TimeoutException):
+        pool.acquire()
+    driver.quit()
+    pool.acquire().quit()
+
+
+def test_pool_releases_leaked_browsers(browsers):
+    pool = BrowserPool(1, timeout=0.01)
+    driver = pool.acquire()
+    del driver
+    gc.collect()
+    pool.acquire().quit()
+    assert len(browsers) == 1
+
+
+def test_get_notes_returns_browser_on_error(browsers):
+    with use_browser_pool(1, timeout=0.01):
+        for _ in range(3):
+            with pytest.raises(FutureWarning):
+                alameda.get_notes()
+    assert len(browsers) == 1